@@ -51,7 +51,9 @@ __all__ = [
     "XMLParsedAsHTMLWarning",
 ]
 
+from array import array
 from collections import Counter
+import mmap
 import sys
 import warnings
 
@@ -73,6 +75,7 @@ from ._deprecation import (
     _deprecated,
 )
 from .element import (
+    AttributeDict,
     CData,
     Comment,
     DEFAULT_OUTPUT_ENCODING,
@@ -86,9 +89,18 @@ from .element import (
     Script,
     Stylesheet,
     Tag,
+    TagProfile,
     TemplateString,
+    _roots_with_caches,
 )
 from .formatter import Formatter
+from .incremental import IncrementalParser
+from .session import (
+    ParserSession,
+    _session_for_fragments,
+)
+from ._cache import LRUCache
+from ._index import TreeIndex
 from .filter import (
     ElementFilter,
     SoupStrainer,
@@ -96,9 +108,11 @@ from .filter import (
 )
 from typing import (
     Any,
+    Callable,
     cast,
     Counter as CounterType,
     Dict,
+    Iterable,
     Iterator,
     List,
     Sequence,
@@ -115,6 +129,9 @@ from bs4._typing import (
     _RawAttributeValue,
     _RawAttributeValues,
     _RawMarkup,
+    _StartTagCache,
+    _TagDetails,
+    _TreeStructure,
 )
 
 # Import all warnings and exceptions into the main package.
@@ -192,6 +209,44 @@ class BeautifulSoup(Tag):
     preserve_whitespace_tag_stack: List[Tag]  #: :meta private:
     string_container_stack: List[Tag]  #: :meta private:
     _most_recent_element: Optional[PageElement]  #: :meta private:
+    _namespaces: Dict[str, str]  #: :meta private:
+
+    # If this is set, it's called with each Tag as the Tag is closed
+    # during parsing. `IncrementalParser` uses this to pull matching
+    # tags out of the tree.
+    _tag_closed_handler: Optional[Callable[[Tag], None]] = None  #: :meta private:
+
+    # While parsing, if `parse_only` has rejected a tag along with
+    # everything inside it, this is the number of tags with the same
+    # name and prefix that are open in the skipped markup (counting
+    # the rejected tag itself). Tree builders can check it to avoid
+    # doing work that will be thrown away.
+    _skip_depth: int = 0  #: :meta private:
+    _skipped_tag_name: Optional[str] = None  #: :meta private:
+    _skipped_tag_nsprefix: Optional[str] = None  #: :meta private:
+
+    #: Whether to keep an index of the tags in this document, keyed by
+    #: tag name.
+    index_tag_names: bool = False
+
+    #: Whether to keep an index of the tags in this document, keyed by
+    #: the values of their id and class attributes.
+    index_attributes: bool = False
+
+    #: The maximum number of search results to cache. If this is 0,
+    #: search results are not cached.
+    search_cache_size: int = 0
+
+    #: Whether to remember how each tag's start tag was rendered, so
+    #: that rendering the document again is faster.
+    cache_start_tags: bool = False
+
+    # This number goes up every time the parse tree is modified. It's
+    # part of the key for every entry in the search cache.
+    _version: int = 0  #: :meta private:
+
+    # The value of _version when the start tag cache was last emptied.
+    _start_tag_cache_version: int = 0  #: :meta private:
 
     #: Beautiful Soup's best guess as to the character encoding of the
     #: original document.
@@ -218,12 +273,20 @@ class BeautifulSoup(Tag):
         from_encoding: Optional[_Encoding] = None,
         exclude_encodings: Optional[_Encodings] = None,
         element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        index_tag_names: bool = False,
+        index_attributes: bool = False,
+        search_cache_size: int = 0,
+        cache_start_tags: bool = False,
         **kwargs: Any,
     ):
         """Constructor.
 
         :param markup: A string or a file-like object representing
-         markup to be parsed.
+         markup to be parsed. This may also be a `memoryview`,
+         `bytearray` or `mmap.mmap` object, so that a very large file
+         can be parsed without first being read into memory. If the
+         tree builder can't handle one of these, it will be copied into
+         a bytestring.
 
         :param features: Desirable features of the parser to be
          used. This may be the name of a specific parser ("lxml",
@@ -263,6 +326,44 @@ class BeautifulSoup(Tag):
          built. This is useful for subclassing Tag or NavigableString
          to modify default behavior.
 
+        :param index_tag_names: If this is True, Beautiful Soup will
+         keep an index of the tags in the document, keyed by tag name.
+         Searches like ``soup.find_all("td")`` or
+         ``soup.find("a", href=True)`` will use the index instead of
+         looking at every element in the document. This costs some
+         memory and makes parsing a little slower, so it's only
+         worthwhile if you're going to search the same document many
+         times.
+
+        :param index_attributes: If this is True, Beautiful Soup will
+         keep an index of the tags in the document, keyed by the
+         values of their ``id`` and ``class`` attributes. Searches
+         like ``soup.find(id="main")``, ``soup.find_all(class_="x")``
+         and `BeautifulSoup.get_element_by_id` will use the index.
+
+        :param search_cache_size: If this is a positive number,
+         Beautiful Soup will remember the results of up to that many
+         `Tag.find_all` and `Tag.select` calls (and the methods built
+         on them, like `Tag.find`). Repeating a search on a document
+         that hasn't changed will return the same results without
+         looking at the tree again. Modifying the tree through
+         methods like `Tag.insert` or `PageElement.extract`, or
+         changing a tag's `Tag.name` or `Tag.attrs`, invalidates
+         the cache; see
+         `BeautifulSoup.reindex` for the changes it can't detect.
+         Searches that use a function or an `ElementFilter` are
+         never cached.
+
+        :param cache_start_tags: If this is True, Beautiful Soup will
+         remember the rendered start tag (name and attributes) of
+         every tag it outputs, for each `Formatter` it's output
+         with. This speeds up rendering the same document more than
+         once, e.g. with `Tag.decode` and then `Tag.prettify`, at the
+         cost of keeping the strings in memory. Any modification to
+         the tree empties the cache, and a cached start tag isn't
+         used if the tag's name or attributes have changed since it
+         was rendered, however they were changed.
+
         :param kwargs: For backwards compatibility purposes, the
          constructor accepts certain keyword arguments used in
          Beautiful Soup 3. None of these arguments do anything in
@@ -349,6 +450,10 @@ class BeautifulSoup(Tag):
             )
             from_encoding = None
 
+        self.index_tag_names = index_tag_names
+        self.index_attributes = index_attributes
+        self.search_cache_size = search_cache_size
+        self.cache_start_tags = cache_start_tags
         self.element_classes = element_classes or dict()
 
         # We need this information to track whether or not the builder
@@ -445,7 +550,13 @@ class BeautifulSoup(Tag):
         self.parse_only = parse_only
         self.replacer = replacer
 
-        if hasattr(markup, "read"):  # It's a file-type object.
+        if isinstance(markup, (memoryview, bytearray, mmap.mmap)):
+            # It's a buffer, probably a memory-mapped file. Don't
+            # make a copy of it unless the tree builder needs one.
+            markup = memoryview(markup).cast("B")
+            if not self.builder.supports_buffer_markup:
+                markup = markup.tobytes()
+        elif hasattr(markup, "read"):  # It's a file-type object.
             markup = markup.read()
         elif not isinstance(markup, (bytes, str)) and not hasattr(markup, "__len__"):
             raise TypeError(
@@ -462,8 +573,8 @@ class BeautifulSoup(Tag):
             if not self._markup_is_url(markup):
                 self._markup_resembles_filename(markup)
 
-        # At this point we know markup is a string or bytestring.  If
-        # it was a file-type object, we've read from it.
+        # At this point we know markup is a string, bytestring or
+        # memoryview. If it was a file-type object, we've read from it.
         markup = cast(_RawMarkup, markup)
 
         rejections = []
@@ -498,13 +609,207 @@ class BeautifulSoup(Tag):
         self.markup = None
         self.builder.soup = None
 
+    @classmethod
+    def incremental(
+        cls,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        replacer: Optional[SoupReplacer] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        match: Optional[Union[ElementFilter, str]] = None,
+        **kwargs: Any,
+    ) -> IncrementalParser:
+        """Prepare to parse a document that will arrive a chunk at a time.
+
+        Call `IncrementalParser.feed` with each chunk of the document as
+        it becomes available, then `IncrementalParser.close` to get the
+        finished `BeautifulSoup` object.
+
+        The arguments are the same as for the `BeautifulSoup`
+        constructor, except that there's no markup.
+
+        :param match: An `ElementFilter` or CSS selector. Tags that
+         match will be removed from the tree as soon as they're
+         closed, and made available through
+         `IncrementalParser.read_tags`.
+        """
+        soup = cls(
+            "",
+            features,
+            builder,
+            parse_only=parse_only,
+            replacer=replacer,
+            element_classes=element_classes,
+            **kwargs,
+        )
+        return IncrementalParser(
+            soup,
+            from_encoding=from_encoding,
+            exclude_encodings=exclude_encodings,
+            match=match,
+        )
+
+    @classmethod
+    def iterparse(
+        cls,
+        source: Union[_IncomingMarkup, Iterable[_RawMarkup]],
+        match: Union[ElementFilter, str],
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        replacer: Optional[SoupReplacer] = None,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        chunk_size: int = 65536,
+        **kwargs: Any,
+    ) -> Iterator[Tag]:
+        """Parse a document, yielding each tag that matches ``match``
+        as soon as its end tag is seen.
+
+        Every matching tag is removed from the parse tree before it's
+        yielded, so memory use is bounded by the size of a single
+        match rather than the size of the document. If one matching
+        tag contains another, the inner tag is yielded (and removed)
+        first. Since earlier matches have been removed by the time a
+        tag is checked, CSS selectors that look at a tag's siblings
+        may not behave as they would on the complete document.
+
+        :param source: A string, a bytestring, an open filehandle, or
+         an iterable of strings or bytestrings.
+
+        :param match: An `ElementFilter` (such as a `SoupStrainer`) or
+         a CSS selector.
+
+        :param chunk_size: When reading from a string or filehandle,
+         feed this much of it into the parser at a time.
+
+        The other arguments are the same as for the `BeautifulSoup`
+        constructor.
+        """
+        parser = cls.incremental(
+            features,
+            builder,
+            parse_only=parse_only,
+            replacer=replacer,
+            from_encoding=from_encoding,
+            exclude_encodings=exclude_encodings,
+            element_classes=element_classes,
+            match=match,
+            **kwargs,
+        )
+        return parser.iterfeed(source, chunk_size)
+
+    @classmethod
+    def session(
+        cls,
+        features: Optional[Union[str, Sequence[str]]] = None,
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        replacer: Optional[SoupReplacer] = None,
+        element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
+        **kwargs: Any,
+    ) -> ParserSession:
+        """Prepare to parse a number of documents with the same
+        settings, reusing the same `TreeBuilder` for all of them.
+
+        Call `ParserSession.parse` with each document to get a
+        `BeautifulSoup` object for it. This is much faster than
+        calling the `BeautifulSoup` constructor for each document,
+        when the documents are small.
+
+        The arguments are the same as for the `BeautifulSoup`
+        constructor, except that there's no markup.
+        """
+        soup = cls(
+            "",
+            features,
+            builder,
+            parse_only=parse_only,
+            replacer=replacer,
+            element_classes=element_classes,
+            **kwargs,
+        )
+        return ParserSession(soup)
+
+    @classmethod
+    def fragment(
+        cls, markup: str, features: Union[str, Sequence[str]]
+    ) -> "BeautifulSoup":
+        """Parse a small piece of markup as quickly as possible.
+
+        This is meant for code that parses a lot of tiny fragments,
+        like templating code. It skips the checks the constructor
+        makes for common beginner mistakes, like passing in a URL or
+        a filename instead of markup, and it reuses the same
+        `TreeBuilder` every time it's called with the same
+        ``features`` (in the same thread). It's equivalent to
+        `ParserSession.fragment`.
+
+        :param markup: A string to parse. Anything else, such as a
+            bytestring that needs its encoding detected, is passed on
+            to the constructor.
+        :param features: The parser to use, as for the constructor.
+            Unlike with the constructor, there's no default.
+        """
+        session = _session_for_fragments(cls, features)
+        if session.busy:
+            # The session's tree builder is busy; this call must have
+            # come from inside another call to this method.
+            return cls(markup, features)
+        return session.fragment(markup)
+
+    @classmethod
+    def _parse_fragment(
+        cls, markup: str, builder: TreeBuilder, settings: Dict[str, Any]
+    ) -> "BeautifulSoup":
+        """Create a `BeautifulSoup` object without going through the
+        constructor. See `ParserSession.fragment`.
+
+        :param settings: Values for the attributes the constructor
+            would set from its keyword arguments, like ``parse_only``.
+        :raise ParserRejectedMarkup: If the tree builder's first
+            strategy for parsing the markup didn't work.
+        """
+        soup = cls.__new__(cls)
+        for name, value in settings.items():
+            setattr(soup, name, value)
+        soup.builder = builder
+        soup.is_xml = soup.known_xml = builder.is_xml
+        soup._namespaces = dict()
+        (
+            soup.markup,
+            soup.original_encoding,
+            soup.declared_html_encoding,
+            soup.contains_replacement_characters,
+        ) = next(iter(builder.prepare_markup(markup)))
+        soup.reset()
+        builder.initialize_soup(soup)
+        try:
+            soup._feed()
+        finally:
+            soup.markup = None
+            builder.soup = None
+        return soup
+
     def copy_self(self) -> "BeautifulSoup":
         """Create a new BeautifulSoup object with the same TreeBuilder,
         but not associated with any markup.
 
         This is the first step of the deepcopy process.
         """
-        clone = type(self)("", None, self.builder)
+        clone = type(self)(
+            "",
+            None,
+            self.builder,
+            index_tag_names=self.index_tag_names,
+            index_attributes=self.index_attributes,
+            search_cache_size=self.search_cache_size,
+            cache_start_tags=self.cache_start_tags,
+        )
 
         # Keep track of the encoding of the original document,
         # since we won't be parsing it again.
@@ -516,15 +821,28 @@ class BeautifulSoup(Tag):
         d = dict(self.__dict__)
         if "builder" in d and d["builder"] is not None and not self.builder.picklable:
             d["builder"] = type(self.builder)
-        # Store the contents as a Unicode string.
+        # Store the parse tree as a set of flat lists, so it can be
+        # rebuilt without being parsed again.
         d["contents"] = []
-        d["markup"] = self.decode()
+        d["markup"] = None
+        d["_structure"] = self._tree_structure()
 
         # If _most_recent_element is present, it's a Tag object left
         # over from initial parse. It might not be picklable and we
         # don't need it.
         if "_most_recent_element" in d:
             del d["_most_recent_element"]
+
+        # The index will be rebuilt when the document is parsed again.
+        if "_tree_index" in d:
+            del d["_tree_index"]
+
+        # Cached results are keyed by the identity of the objects in
+        # the tree, so they'd be useless after unpickling.
+        if "_search_cache" in d:
+            del d["_search_cache"]
+        if "_start_tag_cache" in d:
+            del d["_start_tag_cache"]
         return d
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
@@ -538,7 +856,127 @@ class BeautifulSoup(Tag):
             self.builder = HTMLParserTreeBuilder()
         self.builder.soup = self
         self.reset()
-        self._feed()
+        structure = state.pop("_structure", None)
+        if structure is None:
+            # This was pickled by an older version of Beautiful Soup,
+            # which stored the document as markup.
+            self._feed()
+        else:
+            self._rebuild_tree_structure(structure)
+
+    def _tree_structure(self) -> _TreeStructure:
+        """Describe the parse tree as a set of flat lists.
+
+        The elements are listed in document order. For each one we
+        store the position of its class in a table of classes, the
+        position of its parent in the list (-1 for the `BeautifulSoup`
+        object itself), and either its name (for a `Tag`) or its
+        text. Each `Tag` also has an entry in a separate list of
+        details: prefix, namespace, attributes and so on.
+
+        This is much faster to pickle and unpickle than the
+        equivalent markup, since unpickling doesn't involve a parser.
+        """
+        classes: List[Type[PageElement]] = []
+        class_numbers: Dict[Type[PageElement], int] = {}
+        kinds = array("H")
+        parents = array("i")
+        values: List[str] = []
+        tags: List[_TagDetails] = []
+        positions: Dict[int, int] = {id(self): -1}
+        for i, element in enumerate(self.descendants):
+            cls = type(element)
+            number = class_numbers.get(cls)
+            if number is None:
+                number = class_numbers[cls] = len(classes)
+                classes.append(cls)
+            kinds.append(number)
+            parents.append(positions[id(element.parent)])
+            if isinstance(element, Tag):
+                positions[id(element)] = i
+                values.append(element.name)
+                attrs = element.attrs
+                tags.append(
+                    (
+                        element.prefix,
+                        element.namespace,
+                        type(attrs),
+                        # Any attributes of the attribute dictionary
+                        # itself (such as a reference to a search
+                        # index) don't need to be preserved.
+                        dict(attrs),
+                        element._namespaces or None,
+                        element.sourceline,
+                        element.sourcepos,
+                    )
+                )
+            else:
+                values.append(str(element))
+        return classes, kinds, parents, values, tags
+
+    def _rebuild_tree_structure(self, structure: _TreeStructure) -> None:
+        """Rebuild a parse tree described by `BeautifulSoup._tree_structure`.
+
+        This object must be empty.
+        """
+        classes, kinds, parents, values, tags = structure
+        is_tag = [issubclass(cls, Tag) for cls in classes]
+        details = iter(tags)
+        elements: List[PageElement] = []
+        previous: PageElement = self
+        element: PageElement
+        for kind, parent_position, value in zip(kinds, parents, values):
+            cls = classes[kind]
+            if is_tag[kind]:
+                (
+                    prefix,
+                    namespace,
+                    attribute_dict_class,
+                    attrs,
+                    namespaces,
+                    sourceline,
+                    sourcepos,
+                ) = next(details)
+                tag = cast(Type[Tag], cls)(
+                    self,
+                    self.builder,
+                    value,
+                    namespace,
+                    prefix,
+                    sourceline=sourceline,
+                    sourcepos=sourcepos,
+                    namespaces=namespaces,
+                )
+                # The attribute values were processed when the
+                # document was first parsed; use them as-is. The tag
+                # isn't in the tree yet, so there's no index to update.
+                tag_attrs = tag._attrs = attribute_dict_class()
+                dict.update(tag_attrs, attrs)
+                if isinstance(tag_attrs, AttributeDict):
+                    tag_attrs._tag = tag
+                    tag_attrs._claim_values()
+                element = tag
+            else:
+                element = cls(value)  # type:ignore
+
+            if parent_position < 0:
+                parent: Tag = self
+            else:
+                parent = cast(Tag, elements[parent_position])
+            element.parent = parent
+            element.previous_element = previous
+            previous.next_element = element
+            siblings = parent.contents
+            if siblings:
+                last_sibling = siblings[-1]
+                last_sibling.next_sibling = element
+                element.previous_sibling = last_sibling
+            siblings.append(element)
+            elements.append(element)
+            previous = element
+        self._most_recent_element = previous
+        if self._tree_index is not None:
+            self._tree_index.invalidate()
 
     @classmethod
     @_deprecated(
@@ -665,6 +1103,12 @@ class BeautifulSoup(Tag):
 
         if self.markup is not None:
             self.builder.feed(self.markup)
+        self._finish_feed()
+
+    def _finish_feed(self) -> None:
+        """Internal method called once the parser has seen the end of
+        the document.
+        """
         # Close out any unfinished strings and close all the open tags.
         self.endData()
         while (
@@ -676,8 +1120,36 @@ class BeautifulSoup(Tag):
         """Reset this object to a state as though it had never parsed any
         markup.
         """
+        TagProfile.check_cache(self.builder)
         Tag.__init__(self, self, self.builder, self.ROOT_TAG_NAME)
         self.hidden = True
+        # Unlike a Tag, the BeautifulSoup object collects namespace
+        # prefixes as they're found, so it needs its own dictionary.
+        self._namespaces = dict()
+        if self.index_tag_names or self.index_attributes:
+            self._tree_index = TreeIndex(
+                self, self.index_tag_names, self.index_attributes
+            )
+        else:
+            self._tree_index = None
+        if self.search_cache_size > 0:
+            self._search_cache = LRUCache(self.search_cache_size)
+        else:
+            self._search_cache = None
+        if self.cache_start_tags:
+            self._start_tag_cache = {}
+        else:
+            self._start_tag_cache = None
+        if (
+            self._tree_index is not None
+            or self._search_cache is not None
+            or self._start_tag_cache is not None
+        ):
+            _roots_with_caches[id(self)] = self
+        else:
+            _roots_with_caches.pop(id(self), None)
+        self._version = 0
+        self._start_tag_cache_version = 0
         self.builder.reset()
         self.current_data = []
         self.currentTag = None
@@ -686,8 +1158,54 @@ class BeautifulSoup(Tag):
         self.preserve_whitespace_tag_stack = []
         self.string_container_stack = []
         self._most_recent_element = None
+        self._skip_depth = 0
         self.pushTag(self)
 
+    def reindex(self) -> None:
+        """Rebuild the search index from scratch, and forget any
+        cached search results.
+
+        This is only necessary if the document was parsed with
+        ``index_tag_names=True``, ``index_attributes=True``,
+        ``search_cache_size`` or ``cache_start_tags=True``, and
+        you've modified a plain list used as the value of a
+        multi-valued attribute, replaced `Tag.attrs` with something
+        other than an `AttributeDict` and then modified it, or
+        modified some `Tag.contents` directly
+        instead of using methods like `Tag.insert` and
+        `PageElement.extract`. (For ``cache_start_tags=True``, only
+        the last of these matters.)
+        """
+        self._note_modification()
+        if self._tree_index is not None:
+            self._tree_index.invalidate()
+
+    def _note_modification(self) -> None:
+        """Called whenever the parse tree is modified."""
+        self._version += 1
+
+    def _current_start_tag_cache(self) -> Optional[_StartTagCache]:
+        """Find the cache of rendered start tags, emptying it first if
+        the tree has been modified since it was filled.
+
+        :meta private:
+        """
+        cache = self._start_tag_cache
+        if cache is not None and self._start_tag_cache_version != self._version:
+            cache.clear()
+            self._start_tag_cache_version = self._version
+        return cache
+
+    def get_element_by_id(self, element_id: str) -> Optional[Tag]:
+        """Find the first tag in the document whose ``id`` attribute
+        is ``element_id``.
+
+        If the document was parsed with ``index_attributes=True``,
+        this is a dictionary lookup. Otherwise it's the same as
+        ``soup.find(id=element_id)``.
+        """
+        return cast(Optional[Tag], self.find(id=element_id))
+
     def new_tag(
         self,
         name: str,
@@ -801,8 +1319,9 @@ class BeautifulSoup(Tag):
             # Nothing to pop. This shouldn't happen.
             return None
         tag = self.tagStack.pop()
-        if tag.name in self.open_tag_counter:
-            self.open_tag_counter[tag.name] -= 1
+        name = tag._name
+        if name in self.open_tag_counter:
+            self.open_tag_counter[name] -= 1
         if (
             self.preserve_whitespace_tag_stack
             and tag == self.preserve_whitespace_tag_stack[-1]
@@ -813,6 +1332,8 @@ class BeautifulSoup(Tag):
         # print("Pop", tag.name)
         if self.tagStack:
             self.currentTag = self.tagStack[-1]
+        if self._tag_closed_handler is not None:
+            self._tag_closed_handler(tag)
         return self.currentTag
 
     def pushTag(self, tag: Tag) -> None:
@@ -825,11 +1346,15 @@ class BeautifulSoup(Tag):
             self.currentTag.contents.append(tag)
         self.tagStack.append(tag)
         self.currentTag = self.tagStack[-1]
-        if tag.name != self.ROOT_TAG_NAME:
-            self.open_tag_counter[tag.name] += 1
-        if tag.name in self.builder.preserve_whitespace_tags:
+        name = tag._name
+        if name != self.ROOT_TAG_NAME:
+            self.open_tag_counter[name] += 1
+        self._version += 1
+        if self._tree_index is not None and tag is not self:
+            self._tree_index.added(tag)
+        if name in self.builder.preserve_whitespace_tags:
             self.preserve_whitespace_tag_stack.append(tag)
-        if tag.name in self.builder.string_containers:
+        if name in self.builder.string_containers:
             self.string_container_stack.append(tag)
 
     def endData(self, containerClass: Optional[Type[NavigableString]] = None) -> None:
@@ -912,6 +1437,10 @@ class BeautifulSoup(Tag):
         if fix:
             self._linkage_fixer(parent)
 
+        self._version += 1
+        if self._tree_index is not None and isinstance(o, Tag):
+            self._tree_index.added(o)
+
     def _linkage_fixer(self, el: Tag) -> None:
         """Make sure linkage of this fragment is sound."""
 
@@ -1025,6 +1554,17 @@ class BeautifulSoup(Tag):
             :meta private:
             """
             # print("Start tag %s: %s" % (name, attrs))
+            if self._skip_depth:
+                # We're inside a tag that parse_only rejected along
+                # with all of its contents. All we need to know is
+                # when that tag is closed.
+                if (
+                    name == self._skipped_tag_name
+                    and nsprefix == self._skipped_tag_nsprefix
+                ):
+                    self._skip_depth += 1
+                return None
+
             self.endData()
 
             if (
@@ -1032,6 +1572,20 @@ class BeautifulSoup(Tag):
                 and len(self.tagStack) <= 1
                 and not self.parse_only.allow_tag_creation(nsprefix, name, attrs)
             ):
+                void_tags = self.builder.empty_element_tags
+                if (
+                    self.builder.closes_every_tag
+                    and (void_tags is None or name not in void_tags)
+                    and not self.parse_only.allow_descendant_creation(
+                        nsprefix, name, attrs
+                    )
+                ):
+                    # Skip everything up to the matching end tag. (A
+                    # tag like <br> may never get an end tag, so
+                    # there's nothing to skip.)
+                    self._skipped_tag_name = name
+                    self._skipped_tag_nsprefix = nsprefix
+                    self._skip_depth = 1
                 return None
 
             tag_class = self.element_classes.get(Tag, Tag)
@@ -1093,6 +1647,10 @@ class BeautifulSoup(Tag):
         :meta private:
         """
         # print("End tag: " + name)
+        if self._skip_depth:
+            if name == self._skipped_tag_name and nsprefix == self._skipped_tag_nsprefix:
+                self._skip_depth -= 1
+            return
         self.endData()
         self._popToTag(name, nsprefix)
 
@@ -1102,7 +1660,8 @@ class BeautifulSoup(Tag):
 
         :meta private:
         """
-        self.current_data.append(data)
+        if not self._skip_depth:
+            self.current_data.append(data)
 
     def decode(
         self,
@@ -1128,21 +1687,6 @@ class BeautifulSoup(Tag):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        if self.is_xml:
-            # Print the XML declaration
-            encoding_part = ""
-            declared_encoding: Optional[str] = eventual_encoding
-            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
-                # This is a special Python encoding; it can't actually
-                # go into an XML document because it means nothing
-                # outside of Python.
-                declared_encoding = None
-            if declared_encoding is not None:
-                encoding_part = ' encoding="%s"' % declared_encoding
-            prefix = '<?xml version="1.0"%s?>\n' % encoding_part
-        else:
-            prefix = ""
-
         # Prior to 4.13.0, the first argument to this method was a
         # bool called pretty_print, which gave the method a different
         # signature from its superclass implementation, Tag.decode.
@@ -1172,7 +1716,35 @@ class BeautifulSoup(Tag):
             warnings.warn(warning, DeprecationWarning, stacklevel=2)
         elif indent_level is False or pretty_print is False:
             indent_level = None
-        return prefix + super(BeautifulSoup, self).decode(
+        return super(BeautifulSoup, self).decode(
+            indent_level, eventual_encoding, formatter, iterator
+        )
+
+    def _iter_decode(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: Optional[_Encoding] = DEFAULT_OUTPUT_ENCODING,
+        formatter: Union[Formatter, str] = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Render the document as a series of strings, starting with
+        the XML declaration if this is an XML document.
+
+        :meta private:
+        """
+        if self.is_xml:
+            # Print the XML declaration
+            encoding_part = ""
+            declared_encoding: Optional[str] = eventual_encoding
+            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
+                # This is a special Python encoding; it can't actually
+                # go into an XML document because it means nothing
+                # outside of Python.
+                declared_encoding = None
+            if declared_encoding is not None:
+                encoding_part = ' encoding="%s"' % declared_encoding
+            yield '<?xml version="1.0"%s?>\n' % encoding_part
+        yield from super(BeautifulSoup, self)._iter_decode(
             indent_level, eventual_encoding, formatter, iterator
         )
 
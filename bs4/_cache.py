@@ -0,0 +1,135 @@
+"""Small caches used to avoid repeating expensive work.
+
+You don't need to use this module directly; pass
+``search_cache_size`` into the `BeautifulSoup` constructor to cache
+the results of repeated searches.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import re
+from typing import (
+    Any,
+    Generic,
+    Hashable,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about an `LRUCache`, in the style of
+    `functools.lru_cache`.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[_K, _V]):
+    """A dictionary that holds at most ``maxsize`` items, discarding
+    the least recently used item when it fills up.
+
+    :param maxsize: The maximum number of items to keep.
+    """
+
+    maxsize: int
+    hits: int
+    misses: int
+    _data: OrderedDict[_K, _V]
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: _K) -> Optional[_V]:
+        """Look up an item, marking it as recently used.
+
+        :return: The item, or None if it's not in the cache.
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: _K, value: _V) -> None:
+        """Add an item to the cache, discarding the least recently
+        used item if the cache is full.
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Empty the cache and reset its statistics."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        """Report how well the cache is working."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+
+class _Uncacheable(Exception):
+    """A search argument can't be turned into part of a cache key."""
+
+
+def query_key(*args: Any) -> Optional[Hashable]:
+    """Turn the arguments to a search method into a cache key.
+
+    Strings, numbers, booleans, None and compiled regular expressions
+    are used as-is. Lists, tuples and dictionaries of those things are
+    converted into tuples.
+
+    :return: A hashable key, or None if the arguments include
+        something whose behavior might change from one call to the
+        next (such as a function or an `ElementFilter`), meaning the
+        results of the search must not be cached.
+    """
+    try:
+        return tuple(_key_part(arg) for arg in args)
+    except _Uncacheable:
+        return None
+
+
+def _key_part(value: Any) -> Hashable:
+    if value is None or isinstance(value, (str, bytes, bool, int, float, re.Pattern)):
+        # Tag the value with its type so that, e.g., True and 1
+        # don't share a cache entry.
+        return (type(value), value)
+    if isinstance(value, (list, tuple)):
+        return (tuple, tuple(_key_part(x) for x in value))
+    if isinstance(value, dict):
+        return (
+            dict,
+            tuple(
+                sorted(
+                    ((str(k), _key_part(v)) for k, v in value.items()),
+                    key=lambda item: item[0],
+                )
+            ),
+        )
+    raise _Uncacheable()
@@ -0,0 +1,368 @@
+"""Keep track of the tags in a parse tree, so that common searches
+don't have to look at every element in the tree.
+
+You don't need to use this module directly; pass
+``index_tag_names=True`` and/or ``index_attributes=True`` into the
+`BeautifulSoup` constructor and searches like ``soup.find_all("a")``
+or ``soup.find(id="main")`` will start using the index automatically.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from bs4.element import Tag
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4.element import PageElement
+    from bs4.filter import SoupStrainer
+    from bs4._typing import _AttributeValue
+
+# A set of tags, keyed by id(tag), in the order they were added.
+_TagBucket = Dict[int, Tag]
+
+
+class TreeIndex(object):
+    """An index of the tags in a `BeautifulSoup` object's parse tree,
+    keyed by tag name and/or by the values of the ``id`` and ``class``
+    attributes.
+
+    While a document is being parsed, tags are added to the index
+    in document order. After that, `Tag.insert`,
+    `PageElement.extract` and the methods built on them keep the
+    index up to date. If a `Tag` is inserted anywhere other than at
+    the very end of the document, the index can no longer be kept in
+    document order; it's marked as stale and rebuilt, with a single
+    pass over the tree, the next time it's needed.
+
+    Changes to a tag's `Tag.name` are also tracked, as are changes
+    made to an ``id`` or ``class`` attribute through
+    ``tag[attribute] = value``, ``del tag[attribute]``, any method
+    that modifies `Tag.attrs` or an `AttributeValueList` in it (such
+    as ``tag["class"].append("x")``), or by replacing `Tag.attrs`
+    altogether.
+
+    The index doesn't notice when a tag's `Tag.contents` is replaced
+    or modified directly, when a multi-valued attribute is stored in
+    a plain list rather than an `AttributeValueList` and the list is
+    modified in place, or when `Tag.attrs` has been replaced with
+    something other than an `AttributeDict` and that is then
+    modified. Call `BeautifulSoup.reindex` after doing any of those
+    things.
+
+    :param root: The `BeautifulSoup` object whose tags will be indexed.
+    :param tag_names: Index tags by name.
+    :param attributes: Index tags by the values of the attributes
+        named in `TreeIndex.INDEXED_ATTRIBUTES`.
+    """
+
+    #: The attributes indexed when ``attributes`` is True.
+    INDEXED_ATTRIBUTES: Tuple[str, ...] = ("id", "class")
+
+    root: BeautifulSoup
+    tag_names: bool
+    attributes: bool
+
+    # Maps tag name to the tags with that name, in document order.
+    _by_name: Dict[str, _TagBucket]
+
+    # Maps attribute name to attribute value to the tags with that
+    # value. These aren't necessarily in document order, since an
+    # attribute can be changed at any time. If a multi-valued
+    # attribute is modified in place, a bucket may also contain tags
+    # that have been removed from the tree; those are filtered out
+    # using _positions.
+    _by_attribute: Dict[str, Dict[str, _TagBucket]]
+
+    # Maps id(tag) to the position in the document of every tag in
+    # the tree. Only the relative order matters.
+    _positions: Dict[int, int]
+    _next_position: int
+    _stale: bool
+
+    def __init__(
+        self, root: BeautifulSoup, tag_names: bool = True, attributes: bool = False
+    ):
+        self.root = root
+        self.tag_names = tag_names
+        self.attributes = attributes
+        self.clear()
+
+    def clear(self) -> None:
+        """Empty out the index."""
+        self._by_name = {}
+        self._by_attribute = {}
+        for attribute in self.INDEXED_ATTRIBUTES:
+            self._by_attribute[attribute] = {}
+        self._positions = {}
+        self._next_position = 0
+        self._stale = False
+
+    def invalidate(self) -> None:
+        """Mark the index as stale. It will be rebuilt the next time
+        it's used.
+        """
+        if not self._stale:
+            self.clear()
+            self._stale = True
+
+    def added(self, element: PageElement) -> None:
+        """Record that an element (and everything beneath it) has just
+        been added to the tree.
+        """
+        if self._stale:
+            return
+        if isinstance(element, Tag) and not element.contents:
+            # This is the common case while a document is being parsed.
+            last = element
+        else:
+            last = element._last_descendant()
+        if last.next_element is not None:
+            # The new element isn't at the end of the document, so we
+            # don't know where it fits in relation to the tags we've
+            # already indexed.
+            self.invalidate()
+            return
+        if last is element:
+            if isinstance(element, Tag):
+                self._add(element)
+            return
+        for descendant in element.self_and_descendants:
+            if isinstance(descendant, Tag):
+                self._add(descendant)
+
+    def removed(self, element: PageElement) -> None:
+        """Record that an element (and everything beneath it) has just
+        been removed from the tree.
+        """
+        if self._stale:
+            return
+        for descendant in element.self_and_descendants:
+            if not isinstance(descendant, Tag):
+                continue
+            key = id(descendant)
+            if self._positions.pop(key, None) is None:
+                continue
+            if self.attributes:
+                for attribute in self.INDEXED_ATTRIBUTES:
+                    self._unfile(descendant, attribute)
+            if not self.tag_names:
+                continue
+            bucket = self._by_name.get(descendant._name)
+            if bucket is None or bucket.pop(key, None) is None:
+                # The index has lost track of this tag somehow.
+                self.invalidate()
+                return
+
+    def renamed(self, tag: Tag, old_name: str) -> None:
+        """Record that a tag's `Tag.name` has just been changed from
+        ``old_name``.
+        """
+        key = id(tag)
+        if self._stale or not self.tag_names or key not in self._positions:
+            return
+        old_bucket = self._by_name.get(old_name)
+        if old_bucket is None or old_bucket.pop(key, None) is None:
+            self.invalidate()
+            return
+        if not old_bucket:
+            del self._by_name[old_name]
+
+        name = tag._name
+        bucket = self._by_name.get(name)
+        if bucket is None:
+            bucket = self._by_name[name] = {}
+        positions = self._positions
+        if bucket and positions[next(reversed(bucket))] > positions[key]:
+            # The tag belongs somewhere in the middle of the bucket,
+            # which has to stay in document order.
+            bucket[key] = tag
+            self._by_name[name] = dict(
+                sorted(bucket.items(), key=lambda item: positions[item[0]])
+            )
+        else:
+            bucket[key] = tag
+
+    def attribute_changing(self, tag: Tag, attribute: str) -> None:
+        """Record that one of a tag's indexed attributes is about to be
+        changed or removed.
+
+        Once the change is made, `TreeIndex.attribute_changed` must
+        be called.
+        """
+        if self._stale or not self.attributes or id(tag) not in self._positions:
+            return
+        self._unfile(tag, attribute)
+
+    def attribute_changed(self, tag: Tag, attribute: str) -> None:
+        """Record that one of a tag's indexed attributes has just been
+        changed or removed.
+        """
+        if self._stale or not self.attributes or id(tag) not in self._positions:
+            return
+        self._file(tag, attribute)
+
+    def tags_named(self, names: Iterable[str]) -> List[Tag]:
+        """Find every indexed tag whose `Tag.name` is one of ``names``.
+
+        :return: A list of `Tag` objects, in document order.
+        """
+        if self._stale:
+            self._rebuild()
+        return self._in_order(
+            [self._by_name.get(name) for name in names], already_sorted=True
+        )
+
+    def tags_with_attribute(self, attribute: str, values: Iterable[str]) -> List[Tag]:
+        """Find every indexed tag which has one of ``values`` as a
+        value for ``attribute``.
+
+        :param attribute: One of the attribute names in
+            `TreeIndex.INDEXED_ATTRIBUTES`.
+        :return: A list of `Tag` objects, in document order.
+        """
+        if self._stale:
+            self._rebuild()
+        by_value = self._by_attribute[attribute]
+        return self._in_order([by_value.get(value) for value in values])
+
+    def search(self, strainer: SoupStrainer) -> Optional[List[Tag]]:
+        """Find the tags that might match a `SoupStrainer`.
+
+        :return: A list of `Tag` objects, in document order, which
+           is guaranteed to contain every tag that matches
+           ``strainer``. (It may contain other tags as well; the
+           `SoupStrainer` still needs to be checked against each
+           one.) If the index can't narrow things down, None is
+           returned.
+        """
+        if self._stale:
+            self._rebuild()
+
+        # Find every way this index could narrow down the search,
+        # and use whichever one narrows it down the most.
+        best: Optional[List[Optional[_TagBucket]]] = None
+        best_size = 0
+        already_sorted = False
+        if self.tag_names:
+            names = strainer._indexable_tag_names()
+            if names is not None:
+                best = [self._by_name.get(name) for name in names]
+                best_size = sum(len(bucket) for bucket in best if bucket)
+                already_sorted = True
+        if self.attributes:
+            for attribute in self.INDEXED_ATTRIBUTES:
+                values = strainer._indexable_attribute_values(attribute)
+                if values is None:
+                    continue
+                by_value = self._by_attribute[attribute]
+                buckets = [by_value.get(value) for value in values]
+                size = sum(len(bucket) for bucket in buckets if bucket)
+                if best is None or size < best_size:
+                    best = buckets
+                    best_size = size
+                    already_sorted = False
+        if best is None:
+            return None
+        return self._in_order(best, already_sorted)
+
+    def _in_order(
+        self, buckets: List[Optional[_TagBucket]], already_sorted: bool = False
+    ) -> List[Tag]:
+        """Combine some buckets of tags into a single list in document
+        order.
+
+        :param already_sorted: Each individual bucket is known to be
+            in document order.
+        """
+        buckets = [bucket for bucket in buckets if bucket]
+        if not buckets:
+            return []
+        if len(buckets) == 1:
+            bucket = buckets[0]
+            if already_sorted:
+                return list(bucket.values())
+        else:
+            # A tag may show up in more than one bucket.
+            bucket = {}
+            for b in buckets:
+                bucket.update(b)
+        positions = self._positions
+        tags = [tag for key, tag in bucket.items() if key in positions]
+        if len(tags) > 1:
+            tags.sort(key=lambda tag: positions[id(tag)])
+        return tags
+
+    def _add(self, tag: Tag) -> None:
+        key = id(tag)
+        self._positions[key] = self._next_position
+        self._next_position += 1
+        if self.tag_names:
+            bucket = self._by_name.get(tag._name)
+            if bucket is None:
+                bucket = self._by_name[tag._name] = {}
+            bucket[key] = tag
+        if self.attributes:
+            attrs = tag._attrs
+            for attribute in self.INDEXED_ATTRIBUTES:
+                if attribute in attrs:
+                    self._file(tag, attribute)
+
+    def _file(self, tag: Tag, attribute: str) -> None:
+        """Index a tag under the current value of one of its attributes."""
+        value = tag.attrs.get(attribute)
+        if value is None:
+            return
+        by_value = self._by_attribute[attribute]
+        for indexed_value in self._indexed_values(value):
+            bucket = by_value.get(indexed_value)
+            if bucket is None:
+                bucket = by_value[indexed_value] = {}
+            bucket[id(tag)] = tag
+
+    def _unfile(self, tag: Tag, attribute: str) -> None:
+        """Remove a tag from the index for the current value of one of
+        its attributes.
+        """
+        value = tag.attrs.get(attribute)
+        if value is None:
+            return
+        by_value = self._by_attribute[attribute]
+        for indexed_value in self._indexed_values(value):
+            bucket = by_value.get(indexed_value)
+            if bucket is not None:
+                bucket.pop(id(tag), None)
+                if not bucket:
+                    del by_value[indexed_value]
+
+    @classmethod
+    def _indexed_values(cls, value: _AttributeValue) -> List[str]:
+        """Find all the strings an attribute value should be indexed
+        under, so that any `SoupStrainer` that matches the value on
+        a plain string comparison will find it.
+        """
+        if isinstance(value, list):
+            values = [x for x in value if isinstance(x, str)]
+            if len(values) > 1:
+                # A SoupStrainer will also try matching the whole
+                # value as a single string.
+                values.append(" ".join(values))
+            return values
+        if isinstance(value, str):
+            return [value]
+        return []
+
+    def _rebuild(self) -> None:
+        """Rebuild the index from scratch by walking the tree."""
+        self.clear()
+        for descendant in self.root.descendants:
+            if isinstance(descendant, Tag):
+                self._add(descendant)
@@ -24,15 +24,22 @@ from typing import (
     Dict,
     IO,
     Iterable,
+    List,
     Mapping,
     Optional,
     Pattern,
+    Tuple,
+    Type,
     TYPE_CHECKING,
     Union,
 )
 
 if TYPE_CHECKING:
+    from array import array
+    from mmap import mmap
+    from bs4.formatter import Formatter
     from bs4.element import (
+        AttributeDict,
         AttributeValueList,
         NamespacedAttribute,
         NavigableString,
@@ -59,8 +66,11 @@ class _RegularExpressionProtocol(Protocol):
 
 # Aliases for markup in various stages of processing.
 #
-#: The rawest form of markup: either a string, bytestring, or an open filehandle.
-_IncomingMarkup: TypeAlias = Union[str, bytes, IO[str], IO[bytes]]
+#: The rawest form of markup: either a string, bytestring, an open
+#: filehandle, or a buffer such as a memory-mapped file.
+_IncomingMarkup: TypeAlias = Union[
+    str, bytes, IO[str], IO[bytes], memoryview, bytearray, "mmap"
+]
 
 #: Markup that is in memory but has (potentially) yet to be converted
 #: to Unicode.
@@ -194,3 +204,38 @@ _StrainableAttributes: TypeAlias = Dict[str, _StrainableAttribute]
 _OneElement: TypeAlias = Union["PageElement", "Tag", "NavigableString"]
 _AtMostOneElement: TypeAlias = Optional[_OneElement]
 _QueryResults: TypeAlias = "ResultSet[_OneElement]"
+
+#: The details of a single `Tag`, as stored when a `BeautifulSoup`
+#: object is pickled: prefix, namespace, attribute dictionary class,
+#: attributes, namespace mappings, source line and source position.
+_TagDetails: TypeAlias = Tuple[
+    Optional[str],
+    Optional[str],
+    Type["AttributeDict"],
+    Dict[Any, Any],
+    Optional[Dict[str, str]],
+    Optional[int],
+    Optional[int],
+]
+
+#: A parse tree flattened into lists, as stored when a `BeautifulSoup`
+#: object is pickled: element classes, the class of each element, the
+#: parent of each element, each element's name or text, and the
+#: details of each `Tag`.
+_TreeStructure: TypeAlias = Tuple[
+    List[Type["PageElement"]],
+    "array[int]",
+    "array[int]",
+    List[str],
+    List[_TagDetails],
+]
+
+#: A document's rendered start tags, keyed by the id of the `Tag`, the
+#: id of the `Formatter` and the eventual encoding. The `Formatter`
+#: is stored with each string so that its id can't be reused. A copy
+#: of the `Tag`'s attributes, and its name, prefix and `Tag.hidden`,
+#: are also stored, so that changes to them are noticed.
+_StartTagCache: TypeAlias = Dict[
+    Tuple[int, int, Optional[_Encoding]],
+    Tuple["Formatter", Dict[str, Any], Tuple[str, Optional[str], bool], str],
+]
@@ -0,0 +1,135 @@
+"""Parse a large number of documents using a pool of worker
+processes.
+
+`parse_many` sends the documents to a
+`concurrent.futures.ProcessPoolExecutor`. Each worker parses its
+documents, runs your extraction function on each parse tree, and
+sends back only the result::
+
+ from bs4.batch import parse_many
+
+ def titles(soup):
+     return soup.title.string if soup.title else None
+
+ for title in parse_many(pages, features="lxml", extract=titles):
+     print(title)
+
+Everything that crosses the process boundary has to be pickled. This
+includes the documents, ``extract``, ``parse_only`` and the results.
+In particular, ``extract`` has to be a module-level function, not a
+lambda or a nested function.
+
+Whether this is any faster than parsing the documents one at a time
+depends on the number of CPUs, the size of the documents and how
+much has to be sent between processes. Use
+`bs4.diagnose.benchmark_batch` to find out for your own documents.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+import os
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+
+_T = TypeVar("_T")
+
+# The markup types that can be sent to a worker process.
+_PicklableMarkup = Union[str, bytes]
+
+
+def parse_many(
+    documents: Iterable[_PicklableMarkup],
+    features: Optional[Union[str, Sequence[str]]] = None,
+    parse_only: Optional[ElementFilter] = None,
+    extract: Optional[Callable[[BeautifulSoup], _T]] = None,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    **kwargs: Any,
+) -> List[Any]:
+    """Parse many documents in parallel and extract something from
+    each one.
+
+    :param documents: The markup to parse, as strings or bytestrings.
+    :param features: Passed into the `BeautifulSoup` constructor for
+        every document.
+    :param parse_only: Passed into the `BeautifulSoup` constructor for
+        every document.
+    :param extract: A function that's called on each `BeautifulSoup`
+        object, in the worker process that parsed it. Its return
+        value is sent back. If this is None, the `BeautifulSoup`
+        objects themselves are sent back: each one is pickled in the
+        worker process, and its parse tree is rebuilt from the
+        pickle in this process.
+    :param workers: The number of worker processes to start. The
+        default is the number of CPUs. If this is 1, the documents
+        are parsed one at a time in this process, with no pool.
+    :param chunksize: The number of documents sent to a worker at a
+        time. By default, the documents are split into about four
+        chunks per worker.
+    :param executor: An existing `concurrent.futures.Executor` to use
+        instead of starting a new process pool, so the same worker
+        processes can be used for several calls. If this is
+        provided, ``workers`` is only used to choose a chunk size, so
+        pass in the size of your pool.
+    :param kwargs: Passed into the `BeautifulSoup` constructor for
+        every document.
+
+    :return: A list containing the result of ``extract`` for each
+        document, in the same order as ``documents``. If any call
+        fails, the exception is raised here.
+    """
+    task = partial(
+        _parse_and_extract,
+        features=features,
+        parse_only=parse_only,
+        extract=extract,
+        constructor_kwargs=kwargs,
+    )
+    if executor is None and workers is None:
+        workers = os.cpu_count() or 1
+    if executor is None and workers is not None and workers <= 1:
+        return [task(document) for document in documents]
+
+    if not isinstance(documents, Sequence):
+        # We need to know how many documents there are to choose a
+        # chunk size.
+        documents = list(documents)
+    if chunksize is None:
+        pool_size = workers or os.cpu_count() or 1
+        chunksize = max(1, len(documents) // (pool_size * 4))
+
+    if executor is not None:
+        return list(executor.map(task, documents, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, documents, chunksize=chunksize))
+
+
+def _parse_and_extract(
+    markup: _PicklableMarkup,
+    features: Optional[Union[str, Sequence[str]]],
+    parse_only: Optional[ElementFilter],
+    extract: Optional[Callable[[BeautifulSoup], Any]],
+    constructor_kwargs: Dict[str, Any],
+) -> Any:
+    """Parse one document and run the extraction function on it. This
+    runs in a worker process.
+    """
+    soup = BeautifulSoup(markup, features, parse_only=parse_only, **constructor_kwargs)
+    if extract is None:
+        return soup
+    return extract(soup)
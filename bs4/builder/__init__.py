@@ -50,6 +50,7 @@ if TYPE_CHECKING:
     from bs4.element import (
         NavigableString,
         Tag,
+        TagProfile,
     )
     from bs4._typing import (
         _AttributeValue,
@@ -203,6 +204,13 @@ class TreeBuilder(object):
       `AttributeValueList`, which is a normal Python list, and you
       will probably never need to change it.
 
+    :param encoding_detection_window: If a bytestring's encoding has
+      to be guessed, only look at this many bytes at the start of it,
+      and try out each guess on that many bytes before using it to
+      decode the whole document. This makes guessing much cheaper for
+      very large documents. See
+      `UnicodeDammit`. The default is to look at the whole document.
+
     """
 
     USE_DEFAULT: Any = object()  #: :meta private:
@@ -216,6 +224,7 @@ class TreeBuilder(object):
         empty_element_tags: Set[str] = USE_DEFAULT,
         attribute_dict_class: Type[AttributeDict] = AttributeDict,
         attribute_value_list_class: Type[AttributeValueList] = AttributeValueList,
+        encoding_detection_window: Optional[int] = None,
     ):
         self.soup = None
         if multi_valued_attributes is self.USE_DEFAULT:
@@ -239,6 +248,7 @@ class TreeBuilder(object):
         self.string_containers = string_containers
         self.attribute_dict_class = attribute_dict_class
         self.attribute_value_list_class = attribute_value_list_class
+        self.encoding_detection_window = encoding_detection_window
 
     NAME: str = "[Unknown tree builder]"
     ALTERNATE_NAMES: Iterable[str] = []
@@ -247,6 +257,25 @@ class TreeBuilder(object):
     is_xml: bool = False
     picklable: bool = False
 
+    #: Whether this TreeBuilder can drive its parser one chunk at a
+    #: time, through `TreeBuilder.start_incremental`,
+    #: `TreeBuilder.feed_incremental` and
+    #: `TreeBuilder.close_incremental`.
+    supports_incremental_feed: bool = False
+
+    #: Whether `TreeBuilder.prepare_markup` and `TreeBuilder.feed` can
+    #: handle markup in a `memoryview` (such as a memory-mapped file)
+    #: without it being copied into a bytestring first.
+    supports_buffer_markup: bool = False
+
+    #: Whether the parser reports a closing tag for every tag it
+    #: opens, even when the markup itself is unbalanced. Only then can
+    #: the contents of a tag rejected by ``parse_only`` be skipped
+    #: (see `ElementFilter.allow_descendant_creation`), since there's
+    #: no danger of a tag that's never closed taking the rest of the
+    #: document with it.
+    closes_every_tag: bool = False
+
     soup: Optional[BeautifulSoup]  #: :meta private:
 
     #: A tag will be considered an empty-element
@@ -256,6 +285,11 @@ class TreeBuilder(object):
     preserve_whitespace_tags: Set[str]  #: :meta private:
     string_containers: Dict[str, Type[NavigableString]]  #: :meta private:
     tracks_line_numbers: bool  #: :meta private:
+    encoding_detection_window: Optional[int] = None  #: :meta private:
+
+    # Maintained by TagProfile.for_builder and TagProfile.check_cache.
+    _tag_profiles: Optional[Dict[str, TagProfile]] = None  #: :meta private:
+    _tag_profile_basis: Optional[Tuple[Any, ...]] = None  #: :meta private:
 
     #: A value for these tag/attribute combinations is a space- or
     #: comma-separated list of CDATA, rather than a single CDATA.
@@ -320,6 +354,32 @@ class TreeBuilder(object):
         """Run incoming markup through some parsing process."""
         raise NotImplementedError()
 
+    def start_incremental(self, encoding: Optional[_Encoding]) -> None:
+        """Get ready to receive a document one chunk at a time through
+        `TreeBuilder.feed_incremental`.
+
+        This is only called if `TreeBuilder.supports_incremental_feed`
+        is True. `TreeBuilder.initialize_soup` and `TreeBuilder.reset`
+        will already have been called.
+
+        :param encoding: The encoding of the bytestring chunks that
+           will be fed in, or None if the chunks will be Unicode
+           strings.
+        """
+        raise NotImplementedError()
+
+    def feed_incremental(self, markup: _RawMarkup) -> None:
+        """Run one chunk of a document through the underlying parser.
+
+        The chunk may end anywhere, including in the middle of a tag
+        or a multi-byte character.
+        """
+        raise NotImplementedError()
+
+    def close_incremental(self) -> None:
+        """Tell the underlying parser that the document is complete."""
+        raise NotImplementedError()
+
     def prepare_markup(
         self,
         markup: _RawMarkup,
@@ -743,6 +803,8 @@ class DetectsXMLParsedAsHTML(object):
         if markup is None:
             return False
         markup = markup[:500]
+        if isinstance(markup, memoryview):
+            markup = markup.tobytes()
         if isinstance(markup, bytes):
             markup_b: bytes = markup
             looks_like_xml = markup_b.startswith(
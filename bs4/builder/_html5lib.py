@@ -10,6 +10,7 @@ from typing import (
     cast,
     Dict,
     Iterable,
+    List,
     Optional,
     Sequence,
     TYPE_CHECKING,
@@ -175,6 +176,10 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
     soup: "BeautifulSoup"  #: :meta private:
     parser: Optional[html5lib.HTMLParser]  #: :meta private:
 
+    # Elements that are holding on to text that hasn't been added to
+    # the tree yet. See `Element.flushPendingText`.
+    elements_with_pending_text: List["Element"]  #: :meta private:
+
     def __init__(
         self,
         namespaceHTMLElements: bool,
@@ -207,10 +212,11 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
         # which we can use to track the current line number.
         self.parser = None
         self.store_line_numbers = store_line_numbers
+        self.elements_with_pending_text = []
 
     def documentClass(self) -> "Element":
         self.soup.reset()
-        return Element(self.soup, self.soup, None)
+        return Element(self.soup, self.soup, None, self)
 
     def insertDoctype(self, token: Dict[str, Any]) -> None:
         name: str = cast(str, token["name"])
@@ -234,7 +240,7 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
             name, namespace, sourceline=sourceline, sourcepos=sourcepos
         )
 
-        return Element(tag, self.soup, namespace)
+        return Element(tag, self.soup, namespace, self)
 
     def commentClass(self, data: str) -> "TextNode":
         return TextNode(Comment(data), self.soup)
@@ -264,6 +270,11 @@ class TreeBuilderForHtml5lib(treebuilder_base.TreeBuilder):
         self.soup.append(node.element)
 
     def getDocument(self) -> "BeautifulSoup":
+        # html5lib calls this once it's done parsing, so this is
+        # the last chance to put any pending text into the tree.
+        for element in self.elements_with_pending_text:
+            element.flushPendingText()
+        self.elements_with_pending_text = []
         return self.soup
 
     def testSerializer(self, element: "Element") -> str:
@@ -344,14 +355,43 @@ class BeautifulSoupNode(treebuilder_base.Node):
 class Element(BeautifulSoupNode):
     element: Tag
     namespace: Optional[_NamespaceURL]
+    treebuilder: Optional[TreeBuilderForHtml5lib]
+
+    # When html5lib appends several strings in a row to this element,
+    # the first one goes into the tree and the rest are collected
+    # here, to be combined with it in `flushPendingText`.
+    _pending_string: Optional[NavigableString]
+    _pending_text: List[str]
 
     def __init__(
-        self, element: Tag, soup: "BeautifulSoup", namespace: Optional[_NamespaceURL]
+        self,
+        element: Tag,
+        soup: "BeautifulSoup",
+        namespace: Optional[_NamespaceURL],
+        treebuilder: Optional[TreeBuilderForHtml5lib] = None,
     ):
         treebuilder_base.Node.__init__(self, element.name)
         self.element = element
         self.soup = soup
         self.namespace = namespace
+        self.treebuilder = treebuilder
+        self._pending_string = None
+        self._pending_text = []
+
+    def flushPendingText(self) -> None:
+        """Replace the last string in this element with a string that
+        also contains any text appended since, and which is still
+        being held in this object.
+        """
+        old_element = self._pending_string
+        if old_element is None:
+            return
+        self._pending_string = None
+        new_element = self.soup.new_string(old_element + "".join(self._pending_text))
+        self._pending_text = []
+        old_element.replace_with(new_element)
+        if self.soup._most_recent_element is old_element:
+            self.soup._most_recent_element = new_element
 
     def appendChild(self, node: "BeautifulSoupNode") -> None:
         string_child: Optional[NavigableString] = None
@@ -374,14 +414,23 @@ class Element(BeautifulSoupNode):
             and self.element.contents
             and type(self.element.contents[-1]) is NavigableString
         ):
-            # We are appending a string onto another string.
-            # TODO This has O(n^2) performance, for input like
-            # "a</a>a</a>a</a>..."
-            old_element = self.element.contents[-1]
-            new_element = self.soup.new_string(old_element + string_child)
-            old_element.replace_with(new_element)
-            self.soup._most_recent_element = new_element
+            # We are appending a string onto another string. Building
+            # a new string every time this happens has O(n^2)
+            # performance, for input like "a</a>a</a>a</a>...", so
+            # hold on to the new text until something else happens to
+            # this element.
+            if self._pending_string is None:
+                self._pending_string = cast(
+                    NavigableString, self.element.contents[-1]
+                )
+                if self.treebuilder is not None:
+                    self.treebuilder.elements_with_pending_text.append(self)
+            self._pending_text.append(string_child)
+            if self.treebuilder is None:
+                # Nothing will remind us to flush the text later.
+                self.flushPendingText()
         else:
+            self.flushPendingText()
             if isinstance(node, str):
                 # Create a brand new NavigableString from this string.
                 child = self.soup.new_string(node)
@@ -389,14 +438,16 @@ class Element(BeautifulSoupNode):
             # Tell Beautiful Soup to act as if it parsed this element
             # immediately after the parent's last descendant. (Or
             # immediately after the parent, if it has no children.)
+            #
+            # If the parent has no children but does have a
+            # next_element, something from further ahead in the parse
+            # tree is being inserted into this earlier element.
+            # object_was_parsed() will notice this and call
+            # _linkage_fixer(), which links the new child directly to
+            # its parent, so there's no need to search the whole tree
+            # for its last element.
             if self.element.contents:
                 most_recent_element = self.element._last_descendant(False)
-            elif self.element.next_element is not None:
-                # Something from further ahead in the parse tree is
-                # being inserted into this earlier element. This is
-                # very annoying because it means an expensive search
-                # for the last element in the tree.
-                most_recent_element = self.soup._last_descendant()
             else:
                 most_recent_element = self.element
 
@@ -462,6 +513,7 @@ class Element(BeautifulSoupNode):
     def insertBefore(
         self, node: "BeautifulSoupNode", refNode: "BeautifulSoupNode"
     ) -> None:
+        self.flushPendingText()
         index = self.element.index(refNode.element)
         if (
             type(node.element) is NavigableString
@@ -478,6 +530,7 @@ class Element(BeautifulSoupNode):
             node.parent = self
 
     def removeChild(self, node: "Element") -> None:
+        self.flushPendingText()
         node.element.extract()
 
     def reparentChildren(self, new_parent: "Element") -> None:
@@ -486,6 +539,8 @@ class Element(BeautifulSoupNode):
         # print("FROM", self.element)
         # print("TO", new_parent.element)
 
+        self.flushPendingText()
+        new_parent.flushPendingText()
         element = self.element
         new_parent_element = new_parent.element
         # Determine what this tag's next_element will be once all the children
@@ -558,6 +613,10 @@ class Element(BeautifulSoupNode):
         element.contents = []
         element.next_element = final_next_element
 
+        # The moved tags are now in a different place in the
+        # document, so any search index needs to be rebuilt.
+        self.soup.reindex()
+
         # print("DONE WITH MOVE")
         # print("FROM", self.element)
         # print("TO", new_parent_element)
@@ -571,7 +630,7 @@ class Element(BeautifulSoupNode):
     # cloneNode returns a new Node, not None.
     def cloneNode(self) -> treebuilder_base.Node:
         tag = self.soup.new_tag(self.element.name, self.namespace)
-        node = Element(tag, self.soup, self.namespace)
+        node = Element(tag, self.soup, self.namespace, self.treebuilder)
         for key, value in self.attributes:
             node.attributes[key] = value
         return node
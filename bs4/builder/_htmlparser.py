@@ -9,6 +9,7 @@ __all__ = [
     "HTMLParserTreeBuilder",
 ]
 
+import codecs
 from html.parser import HTMLParser
 
 from typing import (
@@ -93,6 +94,15 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         self.attribute_dict_class = soup.builder.attribute_dict_class
         HTMLParser.__init__(self, *args, **kwargs)
 
+    def reset(self) -> None:
+        """Get ready to parse a new document.
+
+        `HTMLParser.__init__` calls this method, and
+        `HTMLParserTreeBuilder` calls it again when it reuses this
+        object for another document.
+        """
+        HTMLParser.reset(self)
+
         # Keep a list of empty-element tags that were encountered
         # without an explicit closing tag. If we encounter a closing tag
         # of this type, we'll associate it with one of those entries.
@@ -344,6 +354,24 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
     #: original file is the source of an element.
     TRACKS_LINE_NUMBERS: bool = True
 
+    #: html.parser is a push parser, so a document can be fed to it
+    #: in chunks as the chunks become available.
+    supports_incremental_feed: bool = True
+
+    #: Unicode, Dammit decodes a memoryview directly, without copying
+    #: it into a bytestring first.
+    supports_buffer_markup: bool = True
+
+    _incremental_parser: Optional[BeautifulSoupHTMLParser] = None
+    _incremental_decoder: Optional[codecs.IncrementalDecoder] = None
+
+    #: If this is True, the `BeautifulSoupHTMLParser` that parsed one
+    #: document is reset and used again for the next document, rather
+    #: than being thrown away. `bs4.session.ParserSession` turns this
+    #: on.
+    reuse_parser: bool = False
+    _idle_parser: Optional[BeautifulSoupHTMLParser] = None
+
     def __init__(
         self,
         parser_args: Optional[Iterable[Any]] = None,
@@ -426,6 +454,7 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             user_encodings=user_encodings,
             is_html=True,
             exclude_encodings=exclude_encodings,
+            detection_window=self.encoding_detection_window,
         )
 
         if dammit.unicode_markup is None:
@@ -461,7 +490,13 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
         # before calling feed(), so we can assume self.soup
         # is set.
         assert self.soup is not None
-        parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+        parser = self._idle_parser
+        if parser is None:
+            parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+        else:
+            self._idle_parser = None
+            parser.soup = self.soup
+            parser.reset()
 
         try:
             parser.feed(markup)
@@ -472,3 +507,70 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
         parser.already_closed_empty_element = []
+        if self.reuse_parser:
+            # Keep the parser for the next document, but don't let
+            # it keep this document alive.
+            del parser.soup
+            self._idle_parser = parser
+
+    def start_incremental(self, encoding: Optional[_Encoding]) -> None:
+        """See `TreeBuilder`."""
+        args, kwargs = self.parser_args
+        assert self.soup is not None
+        self._incremental_parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+        if encoding is None:
+            self._incremental_decoder = None
+        else:
+            self._incremental_decoder = codecs.getincrementaldecoder(encoding)()
+
+    def feed_incremental(self, markup: _RawMarkup) -> None:
+        """See `TreeBuilder`."""
+        assert self._incremental_parser is not None
+        if isinstance(markup, bytes):
+            markup = self._decode_incremental(markup)
+        try:
+            self._incremental_parser.feed(markup)
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+
+    def close_incremental(self) -> None:
+        """See `TreeBuilder`."""
+        parser = self._incremental_parser
+        assert parser is not None
+        try:
+            if self._incremental_decoder is not None:
+                parser.feed(self._decode_incremental(b"", final=True))
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        parser.already_closed_empty_element = []
+        self._incremental_parser = None
+        self._incremental_decoder = None
+
+    def _decode_incremental(self, data: bytes, final: bool = False) -> str:
+        """Convert one chunk of a bytestring document to Unicode.
+
+        A multi-byte character split across two chunks is held back
+        until the rest of it arrives. If a chunk can't be decoded,
+        the undecodable bytes become REPLACEMENT CHARACTER, just as
+        they would if `UnicodeDammit` had been given the whole
+        document.
+        """
+        decoder = self._incremental_decoder
+        if decoder is None:
+            raise ParserRejectedMarkup(
+                "Bytestring chunk received, but the document encoding is unknown."
+            )
+        state = decoder.getstate()
+        try:
+            return decoder.decode(data, final)
+        except UnicodeDecodeError:
+            # Back up and decode the chunk again, this time
+            # substituting REPLACEMENT CHARACTER for bad bytes. This
+            # decoder will go on doing that for the rest of the
+            # document.
+            decoder.setstate(state)
+            decoder.errors = "replace"
+            assert self.soup is not None
+            self.soup.contains_replacement_characters = True
+            return decoder.decode(data, final)
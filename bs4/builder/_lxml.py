@@ -89,6 +89,24 @@ class LXMLTreeBuilderForXML(TreeBuilder):
 
     CHUNK_SIZE: int = 512
 
+    #: lxml's feed() won't accept a memoryview, so markup in a
+    #: memoryview is copied into bytestrings this size, one at a time.
+    BUFFER_CHUNK_SIZE: int = 64 * 1024
+
+    #: lxml's parsers have a feed() interface, so a document can be
+    #: fed to them in chunks as the chunks become available.
+    supports_incremental_feed: bool = True
+
+    #: A memoryview is fed to lxml in chunks, so it's never copied
+    #: in its entirety.
+    supports_buffer_markup: bool = True
+
+    #: lxml builds a balanced tree, so every start() is followed by
+    #: a matching end().
+    closes_every_tag: bool = True
+
+    _incremental_first_chunk: bool = False
+
     # This namespace mapping is specified in the XML Namespace
     # standard.
     DEFAULT_NSMAPS: _NamespaceMapping = dict(xml="http://www.w3.org/XML/1998/namespace")
@@ -270,17 +288,35 @@ class LXMLTreeBuilderForXML(TreeBuilder):
             # lower-priority user encoding.
             user_encodings.append(document_declared_encoding)
 
+        # The bytestring is given to lxml as-is, along with the name
+        # of each encoding that might work; lxml decodes it
+        # itself. EncodingDetector is given a view of the bytestring,
+        # so that stripping a byte-order mark doesn't make a copy of
+        # the whole thing.
+        original_markup = markup
+        if isinstance(markup, bytes):
+            markup = memoryview(markup)
         detector = EncodingDetector(
             markup,
             known_definite_encodings=known_definite_encodings,
             user_encodings=user_encodings,
             is_html=is_html,
             exclude_encodings=exclude_encodings,
+            detection_window=self.encoding_detection_window,
         )
+        has_bom = len(detector.markup) != len(markup)
         for encoding in detector.encodings:
-            yield (detector.markup, encoding, document_declared_encoding, False)
+            if not has_bom or encoding == detector.sniffed_encoding:
+                # lxml skips over a byte-order mark that matches the
+                # encoding it's been told to use.
+                yield (original_markup, encoding, document_declared_encoding, False)
+            else:
+                yield (detector.markup, encoding, document_declared_encoding, False)
 
     def feed(self, markup: _RawMarkup) -> None:
+        if isinstance(markup, memoryview):
+            self._feed_buffer(markup)
+            return
         io: Union[BytesIO, StringIO]
         if isinstance(markup, bytes):
             io = BytesIO(markup)
@@ -306,6 +342,61 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
             raise ParserRejectedMarkup(e)
 
+    def _feed_buffer(self, markup: memoryview) -> None:
+        """Feed markup from a memoryview (such as a memory-mapped
+        file) to lxml, one chunk at a time.
+        """
+        assert self.soup is not None
+        chunk_size = self.BUFFER_CHUNK_SIZE
+        try:
+            self.parser = self.parser_for(self.soup.original_encoding)
+            # Call feed() at least once, even if the markup is empty,
+            # or the parser won't be initialized.
+            self.parser.feed(markup[:chunk_size].tobytes())
+            for start in range(chunk_size, len(markup), chunk_size):
+                self.parser.feed(markup[start : start + chunk_size].tobytes())
+            self.parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+    def start_incremental(self, encoding: Optional[_Encoding]) -> None:
+        """See `TreeBuilder`."""
+        assert self.soup is not None
+        if self.is_xml:
+            self.processing_instruction_class = XMLProcessingInstruction
+        else:
+            self.processing_instruction_class = ProcessingInstruction
+        try:
+            self.parser = self.parser_for(encoding)
+        except LookupError as e:
+            raise ParserRejectedMarkup(e)
+        self._incremental_first_chunk = True
+
+    def feed_incremental(self, markup: _RawMarkup) -> None:
+        """See `TreeBuilder`."""
+        if self._incremental_first_chunk:
+            self._incremental_first_chunk = False
+            if not self.is_xml:
+                # We're in HTML mode, so if we're given XML, that's
+                # worth noting.
+                DetectsXMLParsedAsHTML.warn_if_markup_looks_like_xml(
+                    markup, stacklevel=4
+                )
+            if isinstance(markup, str) and markup[:1] == "\N{BYTE ORDER MARK}":
+                # See the corresponding workaround in prepare_markup().
+                markup = markup[1:]
+        try:
+            self.parser.feed(markup)
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+    def close_incremental(self) -> None:
+        """See `TreeBuilder`."""
+        try:
+            self.parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
     def close(self) -> None:
         self.nsmaps = [self.DEFAULT_NSMAPS_INVERTED]
 
@@ -321,6 +412,10 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         assert self.soup is not None
         assert isinstance(tag, str)
 
+        if self.soup._skip_depth:
+            self._skipped_start(tag, nsmap)
+            return
+
         # We need to recreate the attribute dict for three
         # reasons. First, for type checking, so we can assert there
         # are no bytestrings in the keys or values. Second, because we
@@ -398,6 +493,23 @@ class LXMLTreeBuilderForXML(TreeBuilder):
             namespaces=self.active_namespace_prefixes[-1],
         )
 
+    def _skipped_start(self, tag: str, nsmap: _NamespaceMapping) -> None:
+        """Handle a start tag that's inside a tag that parse_only
+        rejected along with its contents.
+
+        The attributes don't matter, but the namespace stack has to
+        be kept up to date so that `end` can find the tag's prefix.
+        """
+        assert self.soup is not None
+        if len(nsmap) > 0:
+            self.nsmaps.append(_invert(nsmap))
+            self.active_namespace_prefixes.append(self.active_namespace_prefixes[-1])
+        elif len(self.nsmaps) > 1:
+            self.nsmaps.append(None)
+        namespace, tag = self._getNsTag(tag)
+        nsprefix = self._prefix_for_namespace(namespace)
+        self.soup.handle_starttag(tag, namespace, nsprefix, {})
+
     def _prefix_for_namespace(
         self, namespace: Optional[_NamespaceURL]
     ) -> Optional[_NamespacePrefix]:
@@ -475,6 +587,9 @@ class LXMLTreeBuilder(HTMLTreeBuilder, LXMLTreeBuilderForXML):
         return etree.HTMLParser
 
     def feed(self, markup: _RawMarkup) -> None:
+        if isinstance(markup, memoryview):
+            self._feed_buffer(markup)
+            return
         # We know self.soup is set by the time feed() is called.
         assert self.soup is not None
         encoding = self.soup.original_encoding
@@ -18,17 +18,26 @@ from types import ModuleType
 from typing import (
     Any,
     cast,
+    Dict,
+    Hashable,
     Iterable,
     Iterator,
     Optional,
+    Tuple,
     TYPE_CHECKING,
 )
+import threading
 import warnings
+from bs4._cache import (
+    CacheInfo,
+    LRUCache,
+    query_key,
+)
 from bs4._typing import _NamespaceMapping
 
 if TYPE_CHECKING:
     from soupsieve import SoupSieve
-    from bs4 import element
+    from bs4 import BeautifulSoup, element
     from bs4.element import ResultSet, Tag
 
 soupsieve: Optional[ModuleType]
@@ -55,6 +64,14 @@ class CSS(object):
         intended for use in unit tests.
     """
 
+    #: The default size of the process-wide cache of compiled
+    #: selectors. Use `CSS.set_cache_size` to change it.
+    DEFAULT_CACHE_SIZE: int = 256
+
+    # Compiled selectors, shared by every CSS object in the process.
+    _selector_cache: LRUCache[Hashable, SoupSieve] = LRUCache(DEFAULT_CACHE_SIZE)
+    _selector_cache_lock: threading.Lock = threading.Lock()
+
     def __init__(self, tag: element.Tag, api: Optional[ModuleType] = None):
         if api is None:
             api = soupsieve
@@ -126,7 +143,75 @@ class CSS(object):
         :return: A precompiled selector object.
         :rtype: soupsieve.SoupSieve
         """
-        return self.api.compile(select, self._ns(namespaces, select), flags, **kwargs)
+        return self._compile(select, namespaces, flags, kwargs)
+
+    def _compile(
+        self,
+        select: str,
+        namespaces: Optional[_NamespaceMapping],
+        flags: int,
+        kwargs: Dict[str, Any],
+    ) -> SoupSieve:
+        """Compile a selector, using a process-wide cache of compiled
+        selectors so the same selector string isn't parsed over and
+        over.
+        """
+        ns = self._ns(namespaces, select)
+        key: Optional[Hashable] = None
+        if isinstance(select, str):
+            # Most calls have no extra keyword arguments, so there's
+            # no need for the full query_key() treatment.
+            extra = query_key(kwargs) if kwargs else ()
+            if extra is not None:
+                key = (self.api, select, flags, tuple(ns.items()) if ns else None, extra)
+                try:
+                    hash(key)
+                except TypeError:
+                    key = None
+        if key is None:
+            # This is a precompiled selector, or one of the arguments
+            # can't be used in a cache key.
+            return self.api.compile(select, ns, flags, **kwargs)
+
+        with CSS._selector_cache_lock:
+            compiled = CSS._selector_cache.get(key)
+        if compiled is None:
+            compiled = self.api.compile(select, ns, flags, **kwargs)
+            with CSS._selector_cache_lock:
+                CSS._selector_cache.put(key, compiled)
+        return compiled
+
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
+        """Report how well the process-wide cache of compiled
+        selectors is working.
+
+        :return: A `CacheInfo` with the number of hits and misses,
+            the maximum size of the cache, and its current size.
+        """
+        with CSS._selector_cache_lock:
+            return CSS._selector_cache.cache_info()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Empty the process-wide cache of compiled selectors and reset
+        its statistics.
+        """
+        with CSS._selector_cache_lock:
+            CSS._selector_cache.clear()
+
+    @classmethod
+    def set_cache_size(cls, maxsize: int) -> None:
+        """Change the number of compiled selectors kept in the
+        process-wide cache. This empties the cache.
+        """
+        with CSS._selector_cache_lock:
+            CSS._selector_cache = LRUCache(maxsize)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # A module can't be pickled, so a CSS object is always
+        # unpickled with the default API.
+        return (CSS, (self.tag,))
 
     def select_one(
         self,
@@ -154,9 +239,7 @@ class CSS(object):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            `soupsieve.select_one() <https://facelessuser.github.io/soupsieve/api/#soupsieveselect_one>`_ method.
         """
-        return self.api.select_one(
-            select, self.tag, self._ns(namespaces, select), flags, **kwargs
-        )
+        return self._compile(select, namespaces, flags, kwargs).select_one(self.tag)
 
     def select(
         self,
@@ -189,10 +272,55 @@ class CSS(object):
         if limit is None:
             limit = 0
 
-        return self._rs(
-            self.api.select(
-                select, self.tag, self._ns(namespaces, select), limit, flags, **kwargs
-            )
+        # Import here to avoid circular import
+        from bs4.element import _roots_with_caches
+
+        cache = None
+        key = None
+        if _roots_with_caches:
+            root = self.tag._find_root()
+            cache = root._search_cache
+        if cache is not None:
+            key = self._cache_key(root, select, namespaces, limit, flags, kwargs)
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return self._rs(cached)
+
+        results = self._rs(
+            self._compile(select, namespaces, flags, kwargs).select(self.tag, limit)
+        )
+        if cache is not None and key is not None:
+            cache.put(key, results)
+            # Return a copy, so the caller can't modify the cached list.
+            return self._rs(results)
+        return results
+
+    def _cache_key(
+        self,
+        root: element.PageElement,
+        select: str,
+        namespaces: Optional[_NamespaceMapping],
+        limit: int,
+        flags: int,
+        kwargs: Dict[str, Any],
+    ) -> Optional[Hashable]:
+        """Find the key under which the results of a `CSS.select` call
+        are stored in the search cache.
+
+        :return: A key, or None if the results can't be cached.
+        """
+        if not isinstance(select, (str, self.api.SoupSieve)):
+            return None
+        query = query_key(namespaces, limit, flags, kwargs)
+        if query is None:
+            return None
+        return (
+            id(self.tag),
+            "select",
+            select,
+            query,
+            cast("BeautifulSoup", root)._version,
         )
 
     def iselect(
@@ -226,8 +354,8 @@ class CSS(object):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            `soupsieve.iselect() <https://facelessuser.github.io/soupsieve/api/#soupsieveiselect>`_ method.
         """
-        return self.api.iselect(
-            select, self.tag, self._ns(namespaces, select), limit, flags, **kwargs
+        return self._compile(select, namespaces, flags, kwargs).iselect(
+            self.tag, limit
         )
 
     def closest(
@@ -258,9 +386,7 @@ class CSS(object):
            `soupsieve.closest() <https://facelessuser.github.io/soupsieve/api/#soupsieveclosest>`_ method.
 
         """
-        return self.api.closest(
-            select, self.tag, self._ns(namespaces, select), flags, **kwargs
-        )
+        return self._compile(select, namespaces, flags, kwargs).closest(self.tag)
 
     def match(
         self,
@@ -295,9 +421,7 @@ class CSS(object):
         """
         return cast(
             bool,
-            self.api.match(
-                select, self.tag, self._ns(namespaces, select), flags, **kwargs
-            ),
+            self._compile(select, namespaces, flags, kwargs).match(self.tag),
         )
 
     def filter(
@@ -332,7 +456,5 @@ class CSS(object):
             method.
         """
         return self._rs(
-            self.api.filter(
-                select, self.tag, self._ns(namespaces, select), flags, **kwargs
-            )
+            self._compile(select, namespaces, flags, kwargs).filter(self.tag)
         )
@@ -21,6 +21,7 @@ from logging import Logger, getLogger
 from types import ModuleType
 from typing import (
     Dict,
+    FrozenSet,
     Iterator,
     List,
     Optional,
@@ -72,6 +73,9 @@ def _chardet_dammit(s: bytes) -> Optional[str]:
     """Try as hard as possible to detect the encoding of a bytestring."""
     if chardet_module is None or isinstance(s, str):
         return None
+    if isinstance(s, memoryview):
+        # The character set detection libraries want a bytestring.
+        s = s.tobytes()
     module = chardet_module
     return module.detect(s)["encoding"]
 
@@ -125,6 +129,26 @@ class EntitySubstitution(object):
     #: :meta hide-value:
     CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str]
 
+    # The single characters and the two-character sequences matched
+    # by CHARACTER_TO_HTML_ENTITY_RE. Every two-character sequence
+    # ends with a non-ASCII character.
+    _HTML_ENTITY_CHARACTERS: FrozenSet[str]
+    _HTML_ENTITY_CHARACTERS_WITH_AMPERSAND: FrozenSet[str]
+    _HTML_ENTITY_PAIRS: FrozenSet[str]
+
+    # Matches everything that CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE
+    # might match: a run of non-ASCII characters (along with the
+    # character before it, which might start a two-character
+    # sequence), an ampersand, or an angle bracket.
+    #
+    # CHARACTER_TO_HTML_ENTITY_RE is very slow to search, because it
+    # has so many alternatives. Finding the parts of a string that
+    # might need to change, and looking them up character by
+    # character, is much faster.
+    _HTML_ENTITY_CANDIDATES_RE: Pattern[str] = re.compile(
+        "[\x00-\x7f]?[^\x00-\x7f]+|[&<>]"
+    )
+
     @classmethod
     def _populate_class_variables(cls) -> None:
         """Initialize variables used by this class to manage the plethora of
@@ -252,6 +276,13 @@ class EntitySubstitution(object):
 
         cls.CHARACTER_TO_HTML_ENTITY = unicode_to_name
         cls.HTML_ENTITY_TO_CHARACTER = name_to_unicode
+        cls._HTML_ENTITY_CHARACTERS = frozenset(short_entities)
+        cls._HTML_ENTITY_CHARACTERS_WITH_AMPERSAND = frozenset(short_entities | {"&"})
+        cls._HTML_ENTITY_PAIRS = frozenset(
+            long_entity
+            for long_entities in long_entities_by_first_character.values()
+            for long_entity in long_entities
+        )
         cls.CHARACTER_TO_HTML_ENTITY_RE = re.compile(re_definition)
         cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE = re.compile(
             re_definition_with_ampersand
@@ -288,7 +319,12 @@ class EntitySubstitution(object):
     def _substitute_html_entity(cls, matchobj: re.Match) -> str:
         """Used with a regular expression to substitute the
         appropriate HTML entity for a special character string."""
-        original_entity = matchobj.group(0)
+        return cls._substitute_html_entity_string(matchobj.group(0))
+
+    @classmethod
+    def _substitute_html_entity_string(cls, original_entity: str) -> str:
+        """Find the appropriate HTML entity for a special character
+        string."""
         entity = cls.CHARACTER_TO_HTML_ENTITY.get(original_entity)
         if entity is None:
             return "&amp;%s;" % original_entity
@@ -301,6 +337,16 @@ class EntitySubstitution(object):
         entity = cls.CHARACTER_TO_XML_ENTITY[matchobj.group(0)]
         return "&%s;" % entity
 
+    @classmethod
+    def _escape_ampersand_and_brackets(cls, value: str) -> str:
+        """Replace ampersands and angle brackets with named entities.
+
+        This does the same thing as substituting AMPERSAND_OR_BRACKET
+        with _substitute_xml_entity, but much faster. The ampersands
+        have to be replaced first.
+        """
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
     @classmethod
     def _escape_entity_name(cls, matchobj: re.Match) -> str:
         return "&amp;%s;" % matchobj.group(1)
@@ -370,8 +416,11 @@ class EntitySubstitution(object):
         :return: A version of ``value`` with special characters replaced
          with named entities.
         """
-        # Escape angle brackets and ampersands.
-        value = cls.AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        # Escape angle brackets and ampersands. Most strings don't
+        # contain any, and checking for them is much faster than
+        # replacing them.
+        if "&" in value or "<" in value or ">" in value:
+            value = cls._escape_ampersand_and_brackets(value)
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -393,7 +442,10 @@ class EntitySubstitution(object):
         """
         # Escape angle brackets, and ampersands that aren't part of
         # entities.
-        value = cls.BARE_AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        if "&" in value or "<" in value or ">" in value:
+            value = cls.BARE_AMPERSAND_OR_BRACKET.sub(
+                cls._substitute_xml_entity, value
+            )
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -416,9 +468,7 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # Convert any appropriate characters to HTML entities.
-        return cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
-            cls._substitute_html_entity, s
-        )
+        return cls._substitute_html_characters(s, escape_ampersands=True)
 
     @classmethod
     def substitute_html5(cls, s: str) -> str:
@@ -447,10 +497,11 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # First, escape any HTML entities found in the markup.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
 
         # Next, convert any appropriate characters to unescaped HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
+        s = cls._substitute_html_characters(s)
 
         return s
 
@@ -470,14 +521,65 @@ class EntitySubstitution(object):
         # First, escape the ampersand for anything that looks like an
         # entity but isn't in the list of recognized entities. All other
         # ampersands can be left alone.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
 
         # Then, convert a range of Unicode characters to unescaped
         # HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
+        s = cls._substitute_html_characters(s)
 
         return s
 
+    @classmethod
+    def _substitute_html_characters(
+        cls, s: str, escape_ampersands: bool = False
+    ) -> str:
+        """Replace the characters matched by CHARACTER_TO_HTML_ENTITY_RE
+        (or CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE, if
+        ``escape_ampersands`` is True) with named HTML entities.
+        """
+        if s.isascii():
+            # Ampersands and angle brackets are the only ASCII
+            # characters that might need to be replaced.
+            if escape_ampersands:
+                if "&" in s or "<" in s or ">" in s:
+                    s = cls._escape_ampersand_and_brackets(s)
+            elif "<" in s or ">" in s:
+                s = s.replace("<", "&lt;").replace(">", "&gt;")
+            return s
+
+        if escape_ampersands:
+            characters = cls._HTML_ENTITY_CHARACTERS_WITH_AMPERSAND
+        else:
+            characters = cls._HTML_ENTITY_CHARACTERS
+        pairs = cls._HTML_ENTITY_PAIRS
+        substitute = cls._substitute_html_entity_string
+
+        def replace(matchobj: re.Match) -> str:
+            candidates = matchobj.group(0)
+            if len(candidates) == 1:
+                if candidates in characters:
+                    return substitute(candidates)
+                return candidates
+            pieces = []
+            i = 0
+            end = len(candidates)
+            while i < end:
+                pair = candidates[i : i + 2]
+                if pair in pairs:
+                    pieces.append(substitute(pair))
+                    i += 2
+                    continue
+                character = candidates[i]
+                if character in characters:
+                    pieces.append(substitute(character))
+                else:
+                    pieces.append(character)
+                i += 1
+            return "".join(pieces)
+
+        return cls._HTML_ENTITY_CANDIDATES_RE.sub(replace, s)
+
 
 EntitySubstitution._populate_class_variables()
 
@@ -509,7 +611,9 @@ class EncodingDetector:
 
     7. Windows-1252.
 
-    :param markup: Some markup in an unknown encoding.
+    :param markup: Some markup in an unknown encoding. This may be a
+        `memoryview` (such as a view of a memory-mapped file); it will
+        be examined without being copied.
 
     :param known_definite_encodings: When determining the encoding
         of ``markup``, these encodings will be tried first, in
@@ -535,6 +639,13 @@ class EncodingDetector:
     :param exclude_encodings: These encodings will not be tried,
         even if they otherwise would be.
 
+    :param detection_window: If this is set, only this many bytes at
+        the start of the document are searched for an encoding
+        declaration or passed into the character set detection
+        library. Otherwise, the declaration search looks at up to 5%
+        of the document and character set detection looks at the
+        whole thing, which is slow for very large documents.
+
     """
 
     def __init__(
@@ -545,6 +656,7 @@ class EncodingDetector:
         exclude_encodings: Optional[_Encodings] = None,
         user_encodings: Optional[_Encodings] = None,
         override_encodings: Optional[_Encodings] = None,
+        detection_window: Optional[int] = None,
     ):
         self.known_definite_encodings = list(known_definite_encodings or [])
         if override_encodings:
@@ -560,6 +672,7 @@ class EncodingDetector:
         self.chardet_encoding = None
         self.is_html = False if is_html is None else is_html
         self.declared_encoding: Optional[str] = None
+        self.detection_window = detection_window
 
         # First order of business: strip a byte-order mark.
         self.markup, self.sniffed_encoding = self.strip_byte_order_mark(markup)
@@ -570,9 +683,19 @@ class EncodingDetector:
     chardet_encoding: Optional[_Encoding]
     is_html: bool
     declared_encoding: Optional[_Encoding]
+    detection_window: Optional[int]
     markup: bytes
     sniffed_encoding: Optional[_Encoding]
 
+    @property
+    def _window(self) -> bytes:
+        """The part of the markup that's examined when looking for an
+        encoding declaration or guessing the encoding.
+        """
+        if self.detection_window is None:
+            return self.markup
+        return self.markup[: self.detection_window]
+
     def _usable(self, encoding: Optional[_Encoding], tried: Set[_Encoding]) -> bool:
         """Should we even bother to try this encoding?
 
@@ -621,7 +744,9 @@ class EncodingDetector:
         # declaration.
         if self.declared_encoding is None:
             self.declared_encoding = self.find_declared_encoding(
-                self.markup, self.is_html
+                self._window,
+                self.is_html,
+                search_entire_document=self.detection_window is not None,
             )
         if self.declared_encoding is not None and self._usable(
             self.declared_encoding, tried
@@ -631,7 +756,7 @@ class EncodingDetector:
         # Use third-party character set detection to guess at the
         # encoding.
         if self.chardet_encoding is None:
-            self.chardet_encoding = _chardet_dammit(self.markup)
+            self.chardet_encoding = _chardet_dammit(self._window)
         if self.chardet_encoding is not None and self._usable(
             self.chardet_encoding, tried
         ):
@@ -647,7 +772,9 @@ class EncodingDetector:
         """If a byte-order mark is present, strip it and return the encoding it implies.
 
         :param data: A bytestring that may or may not begin with a
-           byte-order mark.
+           byte-order mark. This may also be a `memoryview`, in which
+           case the return value is a view of the same buffer, not a
+           copy.
 
         :return: A 2-tuple (data stripped of byte-order mark, encoding implied by byte-order mark)
         """
@@ -683,7 +810,7 @@ class EncodingDetector:
     @classmethod
     def find_declared_encoding(
         cls,
-        markup: Union[bytes, str],
+        markup: Union[bytes, str, memoryview],
         is_html: bool = False,
         search_entire_document: bool = False,
     ) -> Optional[_Encoding]:
@@ -711,10 +838,12 @@ class EncodingDetector:
             xml_endpos = 1024
             html_endpos = max(2048, int(len(markup) * 0.05))
 
-        if isinstance(markup, bytes):
-            res = encoding_res[bytes]
-        else:
+        if isinstance(markup, str):
             res = encoding_res[str]
+        else:
+            # A bytestring, or a buffer such as a memoryview. Regular
+            # expressions can search a buffer without copying it.
+            res = encoding_res[bytes]
 
         xml_re = res["xml"]
         html_re = res["html"]
@@ -770,6 +899,13 @@ class UnicodeDammit:
     :param exclude_encodings: These encodings will not be considered,
        even if the sniffing code thinks they might make sense.
 
+    :param detection_window: If this is set, only this many bytes at
+       the start of the document are used to guess its encoding (see
+       `EncodingDetector`). Each proposed encoding is also tried out
+       on the start of the document before being used to decode the
+       whole thing, so that most wrong guesses are rejected without
+       allocating space for a full-size string.
+
     """
 
     def __init__(
@@ -781,11 +917,13 @@ class UnicodeDammit:
         exclude_encodings: Optional[_Encodings] = [],
         user_encodings: Optional[_Encodings] = None,
         override_encodings: Optional[_Encodings] = None,
+        detection_window: Optional[int] = None,
     ):
         self.smart_quotes_to = smart_quotes_to
         self.tried_encodings = []
         self.contains_replacement_characters = False
         self.is_html = is_html
+        self.detection_window = detection_window
         self.log = getLogger(__name__)
         self.detector = EncodingDetector(
             markup,
@@ -794,12 +932,15 @@ class UnicodeDammit:
             exclude_encodings,
             user_encodings,
             override_encodings,
+            detection_window,
         )
 
         # Short-circuit if the data is in Unicode to begin with.
         if isinstance(markup, str) or markup == b"":
             self.markup = markup
-            self.unicode_markup = str(markup)
+            # Don't call str() on an empty bytestring or memoryview;
+            # that would give its repr().
+            self.unicode_markup = markup if isinstance(markup, str) else ""
             self.original_encoding = None
             return
 
@@ -867,6 +1008,11 @@ class UnicodeDammit:
     #: The strategy used to handle Microsoft smart quotes.
     smart_quotes_to: Optional[str]
 
+    #: If this is set, each proposed encoding is tried out on this
+    #: many bytes at the start of the document before it's used to
+    #: decode the whole thing.
+    detection_window: Optional[int]
+
     #: The (encoding, error handling strategy) 2-tuples that were used to
     #: try and convert the markup to Unicode.
     tried_encodings: List[Tuple[_Encoding, str]]
@@ -956,6 +1102,8 @@ class UnicodeDammit:
         try:
             # print("Trying to convert document to %s (errors=%s)" % (
             #    proposed, errors))
+            if self.detection_window is not None and errors == "strict":
+                self._check_window(markup, proposed)
             u = self._to_unicode(markup, proposed, errors)
             self.unicode_markup = u
             self.original_encoding = proposed
@@ -976,6 +1124,23 @@ class UnicodeDammit:
         """
         return str(data, encoding, errors)
 
+    def _check_window(self, data: bytes, encoding: _Encoding) -> None:
+        """Make sure the start of a document can be decoded using a
+        proposed encoding.
+
+        `str` allocates space for the entire decoded document before
+        it starts, even if the very first byte turns out to be
+        invalid. Decoding just the first `UnicodeDammit.detection_window`
+        bytes first makes most wrong guesses very cheap.
+
+        :raise UnicodeDecodeError: If the start of ``data`` is not
+           valid in ``encoding``.
+        """
+        window = memoryview(data)[: self.detection_window]
+        # An incremental decoder won't complain about a multibyte
+        # character that's cut off at the end of the window.
+        codecs.getincrementaldecoder(encoding)().decode(window)
+
     @property
     def declared_html_encoding(self) -> Optional[_Encoding]:
         """If the markup is an HTML document, returns the encoding, if any,
@@ -9,6 +9,7 @@ from html.parser import HTMLParser
 import bs4
 from bs4 import BeautifulSoup, __version__
 from bs4.builder import builder_registry
+from bs4.element import Tag
 from typing import (
     Any,
     IO,
@@ -16,13 +17,15 @@ from typing import (
     Optional,
     Tuple,
     TYPE_CHECKING,
+    cast,
 )
 
 if TYPE_CHECKING:
-    from bs4._typing import _IncomingMarkup
+    from bs4._typing import _IncomingMarkup, _RawAttributeValues
 
 import pstats
 import random
+import re
 import tempfile
 import time
 import traceback
@@ -248,6 +251,478 @@ def benchmark_parsers(num_elements: int = 100000) -> None:
     print(("Raw html5lib parsed the markup in %.2fs." % (b - a)))
 
 
+def benchmark_memory(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Measure how much memory a parse tree uses."""
+    import tracemalloc
+
+    print(("Parse tree memory benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+
+    tracemalloc.start()
+    soup = BeautifulSoup(data, parser)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = sum(1 for _ in soup.descendants)
+    print(("%d nodes, %.1f bytes/node" % (nodes, float(used) / nodes)))
+
+
+def benchmark_strainer(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Measure how long it takes to check every element in a large
+    document against a `SoupStrainer`, with and without
+    `SoupStrainer.compile`.
+    """
+    from bs4.filter import SoupStrainer
+
+    print(("SoupStrainer matching benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    soup = BeautifulSoup(data, parser)
+    elements = list(soup.descendants)
+    print(("Parsed a large invalid HTML document (%d nodes)." % len(elements)))
+
+    strainers = [
+        ("name", SoupStrainer("b")),
+        ("list of names", SoupStrainer(["b", "i", "table"])),
+        ("regular expression", SoupStrainer(re.compile("^t"))),
+        ("name and attribute", SoupStrainer("p", id=True)),
+        ("string", SoupStrainer(string=re.compile("^ba"))),
+    ]
+    for label, strainer in strainers:
+        a = time.perf_counter()
+        for element in elements:
+            strainer.match(element)
+        b = time.perf_counter()
+        match = strainer.compile()
+        for element in elements:
+            match(element)
+        c = time.perf_counter()
+        print(
+            (
+                "%s: %.0fns/element interpreted, %.0fns/element compiled."
+                % (
+                    label,
+                    (b - a) * 1e9 / len(elements),
+                    (c - b) * 1e9 / len(elements),
+                )
+            )
+        )
+
+
+def benchmark_skipped_subtrees(
+    num_elements: int = 100000, parser: str = "html.parser"
+) -> None:
+    """Measure how much faster parsing with ``parse_only`` is when the
+    filter lets the tree builder skip the contents of rejected tags
+    (see `ElementFilter.allow_descendant_creation`).
+    """
+    from bs4.filter import ElementFilter, SoupStrainer
+
+    class SkipDivs(SoupStrainer):
+        def allow_descendant_creation(
+            self,
+            nsprefix: Optional[str],
+            name: str,
+            attrs: Optional["_RawAttributeValues"],
+        ) -> bool:
+            return name != "div"
+
+    print(("Skipped subtree benchmark on Beautiful Soup %s" % __version__))
+    # Skipping only works on balanced markup, so rdoc() won't do.
+    # Generate nine parts boilerplate to one part content.
+    chunks = []
+    for i in range(num_elements // 4):
+        block = '<p class="%s">%s <b>%s</b> <a href="/%s">%s</a></p>' % (
+            rword(),
+            rsentence(),
+            rword(),
+            rword(),
+            rsentence(2),
+        )
+        if i % 10 == 0:
+            chunks.append("<article>%s</article>" % block)
+        else:
+            chunks.append('<div id="d%d">%s</div>' % (i, block))
+    data = "<html><body>%s</body></html>" % "".join(chunks)
+    print(("Generated a large HTML document (%d bytes)." % len(data)))
+
+    filters: List[Tuple[str, ElementFilter]] = [
+        ("without skipping", SoupStrainer("article")),
+        ("with skipping", SkipDivs("article")),
+    ]
+    for label, filter in filters:
+        a = time.perf_counter()
+        soup = BeautifulSoup(data, parser, parse_only=filter)
+        b = time.perf_counter()
+        print(
+            (
+                "Parsed with parse_only %s in %.2fs (%d tags kept)."
+                % (label, b - a, len(soup.find_all(True)))
+            )
+        )
+
+
+def _count_tags(soup: BeautifulSoup) -> int:
+    """Used by `benchmark_batch` as the extraction function.
+
+    :meta private:
+    """
+    return len(soup.find_all(True))
+
+
+def benchmark_batch(
+    num_documents: int = 200,
+    num_elements: int = 2000,
+    parser: str = "html.parser",
+    workers: Optional[int] = None,
+) -> None:
+    """Compare parsing a batch of documents one at a time with
+    parsing them in parallel using `bs4.batch.parse_many`.
+    """
+    from bs4.batch import parse_many
+
+    print(("Batch parsing benchmark on Beautiful Soup %s" % __version__))
+    documents = [rdoc(num_elements) for i in range(num_documents)]
+    print(
+        (
+            "Generated %d invalid HTML documents (%d bytes in all)."
+            % (num_documents, sum(len(x) for x in documents))
+        )
+    )
+
+    a = time.perf_counter()
+    serial = [_count_tags(BeautifulSoup(doc, parser)) for doc in documents]
+    b = time.perf_counter()
+    print(("Serial loop: %.2fs." % (b - a)))
+
+    parallel = parse_many(documents, parser, extract=_count_tags, workers=workers)
+    c = time.perf_counter()
+    assert parallel == serial
+    print(("parse_many(workers=%s): %.2fs." % (workers, c - b)))
+
+
+def benchmark_pickle(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Compare pickling and unpickling a parse tree with the
+    alternative of converting it to markup and parsing it again.
+    """
+    import pickle
+
+    print(("Pickle benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    soup = BeautifulSoup(data, parser)
+    print(("Parsed a document with %d elements." % num_elements))
+
+    a = time.perf_counter()
+    markup = soup.decode()
+    BeautifulSoup(markup, parser)
+    b = time.perf_counter()
+    print(("Markup round trip: %.2fs, %d characters." % (b - a, len(markup))))
+
+    a = time.perf_counter()
+    pickled = pickle.dumps(soup, pickle.HIGHEST_PROTOCOL)
+    b = time.perf_counter()
+    loaded = pickle.loads(pickled)
+    c = time.perf_counter()
+    assert loaded.decode() == markup
+    print(
+        (
+            "Pickle round trip: %.2fs (dump %.2fs, load %.2fs), %d bytes."
+            % (c - a, b - a, c - b, len(pickled))
+        )
+    )
+
+
+def benchmark_encodings(
+    num_elements: int = 100000,
+    parser: str = "lxml",
+    encodings: Tuple[str, ...] = ("utf-16", "windows-1252"),
+) -> None:
+    """Compare giving a non-UTF-8 bytestring straight to a parser with
+    converting it to Unicode, encoding it as UTF-8 and parsing that.
+    """
+    from bs4.dammit import UnicodeDammit
+
+    print(("Encoding benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    for encoding in encodings:
+        markup = data.encode(encoding, "replace")
+        if encoding == "windows-1252":
+            # Declare the encoding, as a real document would.
+            markup = b'<meta charset="windows-1252">' + markup
+        print(("%s: %d bytes." % (encoding, len(markup))))
+
+        a = time.perf_counter()
+        direct = BeautifulSoup(markup, parser)
+        b = time.perf_counter()
+        utf8 = UnicodeDammit(markup, is_html=True).unicode_markup.encode("utf8")
+        round_trip = BeautifulSoup(utf8, parser, from_encoding="utf8")
+        c = time.perf_counter()
+        assert direct.decode() == round_trip.decode()
+        print(
+            (
+                " Parsed as %s: %.2fs. Decoded, re-encoded as UTF-8 and parsed: %.2fs."
+                % (direct.original_encoding, b - a, c - b)
+            )
+        )
+
+
+def _copy_with_append(tag: Tag) -> Tag:
+    """Copy a `Tag` the way `Tag.__deepcopy__` used to: by calling
+    ``__deepcopy__(recursive=False)`` on every element and appending
+    the copies to their new parents.
+    """
+    clone = tag.copy_self()
+    tag_stack = [clone]
+    for event, element in tag._event_stream(tag.descendants):
+        if event is Tag.END_ELEMENT_EVENT:
+            tag_stack.pop()
+        else:
+            descendant_clone = element.__deepcopy__({}, recursive=False)
+            tag_stack[-1].append(descendant_clone)
+            if event is Tag.START_ELEMENT_EVENT:
+                tag_stack.append(descendant_clone)
+    return clone
+
+
+def benchmark_copy(
+    num_elements: int = 20000, parser: str = "html.parser", iterations: int = 10
+) -> None:
+    """Compare copying a large `Tag` using `copy.copy` with the old
+    approach of copying it one element at a time.
+    """
+    import copy
+
+    print(("Copy benchmark on Beautiful Soup %s" % __version__))
+    soup = BeautifulSoup(rdoc(num_elements), parser)
+    tag = soup.html
+    assert tag is not None
+    num_copied = len(list(tag.descendants)) + 1
+    print(("Copying a tag containing %d elements." % num_copied))
+
+    a = time.perf_counter()
+    for i in range(iterations):
+        _copy_with_append(tag)
+    b = time.perf_counter()
+    for i in range(iterations):
+        copied = copy.copy(tag)
+    c = time.perf_counter()
+    assert copied.decode() == tag.decode()
+    print(("Element-by-element copy: %.4fs per copy." % ((b - a) / iterations)))
+    print(("copy.copy(): %.4fs per copy." % ((c - b) / iterations)))
+
+
+def benchmark_start_tag_cache(
+    num_elements: int = 20000, parser: str = "html.parser", iterations: int = 3
+) -> None:
+    """Compare rendering an attribute-heavy document several times,
+    with and without ``cache_start_tags``.
+    """
+    print(("Start tag cache benchmark on Beautiful Soup %s" % __version__))
+    tags = []
+    for i in range(num_elements):
+        tags.append(
+            '<a id="a%d" class="%s %s" href="/page?id=%d&amp;q=%s" title="%s"'
+            ' data-value="%d" rel="nofollow">%s</a>'
+            % (
+                i,
+                rword(5),
+                rword(5),
+                i,
+                rword(8),
+                rsentence(4),
+                random.randint(0, 1000),
+                rword(6),
+            )
+        )
+    data = "<div>%s</div>" % "".join(tags)
+    print(("Rendering %d tags with 7 attributes each." % num_elements))
+
+    for cache_start_tags in (False, True):
+        soup = BeautifulSoup(data, parser, cache_start_tags=cache_start_tags)
+        a = time.perf_counter()
+        for i in range(iterations):
+            soup.decode()
+            soup.decode(formatter="html")
+            soup.prettify()
+        b = time.perf_counter()
+        print(
+            (
+                " cache_start_tags=%s: %.2fs to render %d times each as"
+                " minimal, html and pretty-printed."
+                % (cache_start_tags, b - a, iterations)
+            )
+        )
+
+
+def benchmark_entity_substitution(
+    num_strings: int = 10000, iterations: int = 10
+) -> None:
+    """Time the standard formatters on text nodes like the ones found
+    in real documents: plain ASCII text, text containing ampersands
+    or angle brackets, and text containing non-ASCII characters.
+    """
+    from bs4.element import NavigableString
+
+    print(("Entity substitution benchmark on Beautiful Soup %s" % __version__))
+    kinds = {
+        "ASCII": lambda: rsentence(random.randint(1, 20)),
+        "ASCII with &<>": lambda: "%s & %s <%s>"
+        % (rsentence(random.randint(1, 8)), rword(), rword()),
+        "Non-ASCII": lambda: "%s caf\N{LATIN SMALL LETTER E WITH ACUTE} %s"
+        "\N{EM DASH}%s"
+        % (rsentence(random.randint(1, 8)), rword(), rsentence(3)),
+    }
+    soup = BeautifulSoup("", "html.parser")
+    for kind, make in kinds.items():
+        # Put the strings into a tag, so the formatter has to check
+        # whether they're inside a <script> or <style> tag.
+        tag = soup.new_tag("p")
+        for i in range(num_strings):
+            tag.append(NavigableString(make()))
+        strings = cast(List[NavigableString], tag.contents)
+        results = []
+        for formatter in ("minimal", "html", "html5"):
+            a = time.perf_counter()
+            for i in range(iterations):
+                for string in strings:
+                    string.output_ready(formatter)
+            b = time.perf_counter()
+            results.append(
+                "%s %.2fus" % (formatter, (b - a) * 1000000 / (iterations * num_strings))
+            )
+        print(("%s: %s per string." % (kind, ", ".join(results))))
+
+
+def benchmark_html5lib_adjacent_strings(
+    sizes: Tuple[int, ...] = (10000, 20000, 40000, 80000)
+) -> None:
+    """Time html5lib on markup like "a</a>a</a>a</a>...", where each
+    piece of text has to be combined with the one before it. If the
+    time per repetition goes up with the size of the document, the
+    tree builder has gone quadratic.
+    """
+    print(("html5lib adjacent string benchmark on Beautiful Soup %s" % __version__))
+    for size in sizes:
+        data = "a</a>" * size
+        a = time.perf_counter()
+        BeautifulSoup(data, "html5lib")
+        b = time.perf_counter()
+        print(
+            (
+                "%d repetitions: %.2fs (%.1fus per repetition)."
+                % (size, b - a, (b - a) * 1000000 / size)
+            )
+        )
+
+
+def benchmark_html5lib_misnested_tables(
+    sizes: Tuple[int, ...] = (100, 200, 400)
+) -> None:
+    """Time html5lib on deeply nested markup full of formatting tags
+    that are misnested with tables, which makes html5lib insert tags
+    into parts of the tree it has already built.
+
+    html5lib itself creates a number of tags proportional to the
+    square of the input size, so look at the time per tag.
+    """
+    print(("html5lib misnested table benchmark on Beautiful Soup %s" % __version__))
+    for size in sizes:
+        data = "<div>" * size + "<table><b>x<tr><td>y</b>z</table>" * size
+        a = time.perf_counter()
+        soup = BeautifulSoup(data, "html5lib")
+        b = time.perf_counter()
+        num_tags = len(soup.find_all(True))
+        print(
+            (
+                "%d repetitions: %.2fs for %d tags (%.1fus per tag)."
+                % (size, b - a, num_tags, (b - a) * 1000000 / num_tags)
+            )
+        )
+
+
+def _fragments(num_fragments: int) -> List[str]:
+    """Generate a lot of tiny HTML fragments, like the ones you'd get
+    from an API or an email body.
+    """
+    templates = [
+        "<p>%s</p>",
+        '<a href="/%s">link</a>',
+        "<b>%s</b> and <i>more</i>",
+        '<span class="label">%s</span><br>',
+    ]
+    return [random.choice(templates) % rword() for i in range(num_fragments)]
+
+
+def benchmark_session(num_fragments: int = 100000, parser: str = "html.parser") -> None:
+    """Compare calling the `BeautifulSoup` constructor for each of a
+    lot of tiny fragments with parsing them through a
+    `bs4.session.ParserSession`.
+    """
+    print(("Parser session benchmark on Beautiful Soup %s" % __version__))
+    fragments = _fragments(num_fragments)
+
+    a = time.perf_counter()
+    for fragment in fragments:
+        BeautifulSoup(fragment, parser)
+    b = time.perf_counter()
+    print(
+        (
+            "BeautifulSoup(): %.2fs (%.1fus per fragment)."
+            % (b - a, (b - a) * 1000000 / num_fragments)
+        )
+    )
+
+    session = BeautifulSoup.session(parser)
+    a = time.perf_counter()
+    for fragment in fragments:
+        session.parse(fragment)
+    b = time.perf_counter()
+    print(
+        (
+            "ParserSession.parse(): %.2fs (%.1fus per fragment)."
+            % (b - a, (b - a) * 1000000 / num_fragments)
+        )
+    )
+
+
+def benchmark_fragment(num_fragments: int = 100000, parser: str = "html.parser") -> None:
+    """Measure how much time `BeautifulSoup.fragment` and the
+    `BeautifulSoup` constructor spend on a tiny fragment, beyond the
+    time it takes to actually parse it.
+    """
+    print(("Fragment benchmark on Beautiful Soup %s" % __version__))
+    fragments = _fragments(num_fragments)
+
+    # The raw parse: the same BeautifulSoup object and tree builder
+    # are reset and used for every fragment.
+    soup = BeautifulSoup("", parser)
+    builder = soup.builder
+    a = time.perf_counter()
+    for fragment in fragments:
+        soup.markup = fragment
+        soup.reset()
+        builder.initialize_soup(soup)
+        soup._feed()
+    b = time.perf_counter()
+    raw = (b - a) * 1000000 / num_fragments
+    print(("Raw parse: %.1fus per fragment." % raw))
+
+    for description, method in (
+        ("BeautifulSoup()", BeautifulSoup),
+        ("BeautifulSoup.fragment()", BeautifulSoup.fragment),
+    ):
+        a = time.perf_counter()
+        for fragment in fragments:
+            method(fragment, parser)
+        b = time.perf_counter()
+        per_fragment = (b - a) * 1000000 / num_fragments
+        print(
+            (
+                "%s: %.1fus per fragment (%.1fus overhead)."
+                % (description, per_fragment, per_fragment - raw)
+            )
+        )
+
+
 def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     """Use Python's profiler on a randomly generated document."""
     filehandle = tempfile.NamedTemporaryFile()
@@ -3,8 +3,13 @@ from __future__ import annotations
 # Use of this source code is governed by the MIT license.
 __license__ = "MIT"
 
+import codecs
+from contextlib import contextmanager
+from operator import attrgetter
 import re
+from types import MappingProxyType
 import warnings
+import weakref
 
 from bs4.css import CSS
 from bs4._deprecation import (
@@ -17,6 +22,7 @@ from bs4.formatter import (
     HTMLFormatter,
     XMLFormatter,
 )
+from bs4._cache import query_key
 from bs4._warnings import AttributeResemblesVariableWarning
 
 from typing import (
@@ -24,6 +30,8 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    Hashable,
+    IO,
     Iterable,
     Iterator,
     List,
@@ -31,6 +39,7 @@ from typing import (
     Optional,
     Pattern,
     Set,
+    SupportsIndex,
     TYPE_CHECKING,
     Tuple,
     Type,
@@ -47,6 +56,8 @@ if TYPE_CHECKING:
     from bs4 import BeautifulSoup
     from bs4.builder import TreeBuilder
     from bs4.filter import ElementFilter
+    from bs4._cache import LRUCache
+    from bs4._index import TreeIndex
     from bs4.formatter import (
         _EntitySubstitutionFunction,
         _FormatterOrName,
@@ -60,6 +71,7 @@ if TYPE_CHECKING:
         _OneElement,
         _QueryResults,
         _RawOrProcessedAttributeValues,
+        _StartTagCache,
         _StrainableElement,
         _StrainableAttribute,
         _StrainableAttributes,
@@ -94,6 +106,19 @@ def __getattr__(name: str) -> Any:
 #: this encoding unless you specify otherwise.
 DEFAULT_OUTPUT_ENCODING: str = "utf-8"
 
+#: `Tag.iter_encode` and `Tag.write_to` gather up about this many
+#: characters of output before encoding them and passing them on.
+DEFAULT_OUTPUT_CHUNK_SIZE: int = 64 * 1024
+
+#: The `BeautifulSoup` objects that keep a search index or a cache
+#: for their trees, keyed by ``id()``. While this is empty, nothing
+#: needs to hear about changes to a tree, so `PageElement` doesn't
+#: have to walk up to the root of the tree every time it's modified.
+#: :meta private:
+_roots_with_caches: weakref.WeakValueDictionary[int, PageElement] = (
+    weakref.WeakValueDictionary()
+)
+
 #: A regular expression that can be used to split on whitespace.
 nonwhitespace_re: Pattern[str] = re.compile(r"\S+")
 
@@ -222,6 +247,110 @@ class AttributeValueList(List[str]):
     instantiated instead.
     """
 
+    # The `AttributeDict` this list is a value of. If the tag that
+    # owns the dictionary is part of a tree with a search index or a
+    # cache, changes to the list are reported back to the tree.
+    __slots__ = ("_owner",)
+    _owner: AttributeDict
+
+    def __setitem__(self, index: Any, value: Any) -> None:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().__setitem__(index, value)
+        else:
+            with self._reindexing():
+                super().__setitem__(index, value)
+
+    def __delitem__(self, index: Any) -> None:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().__delitem__(index)
+        else:
+            with self._reindexing():
+                super().__delitem__(index)
+
+    def append(self, value: str) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().append(value)
+        else:
+            with self._reindexing():
+                super().append(value)
+
+    def extend(self, values: Iterable[str]) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().extend(values)
+        else:
+            with self._reindexing():
+                super().extend(values)
+
+    def insert(self, index: SupportsIndex, value: str) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().insert(index, value)
+        else:
+            with self._reindexing():
+                super().insert(index, value)
+
+    def remove(self, value: str) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().remove(value)
+        else:
+            with self._reindexing():
+                super().remove(value)
+
+    def pop(self, *args: Any) -> str:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            return super().pop(*args)
+        with self._reindexing():
+            return super().pop(*args)
+
+    def clear(self) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().clear()
+        else:
+            with self._reindexing():
+                super().clear()
+
+    def sort(self, **kwargs: Any) -> None:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().sort(**kwargs)
+        else:
+            with self._reindexing():
+                super().sort(**kwargs)
+
+    def reverse(self) -> None:
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            super().reverse()
+        else:
+            with self._reindexing():
+                super().reverse()
+
+    def __iadd__(self, values: Iterable[str]) -> Self:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            return super().__iadd__(values)
+        with self._reindexing():
+            return super().__iadd__(values)
+
+    def __imul__(self, count: SupportsIndex) -> Self:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_owner", None) is None:
+            return super().__imul__(count)
+        with self._reindexing():
+            return super().__imul__(count)
+
+    def __getstate__(self) -> Optional[Dict[str, Any]]:
+        # A copy of this list doesn't belong to the dictionary.
+        return getattr(self, "__dict__", None) or None
+
+    @contextmanager
+    def _reindexing(self) -> Iterator[None]:
+        """Let the dictionary that holds this list know that the list
+        is about to change.
+        """
+        owner = self._owner
+        if getattr(owner, "_tag", None) is None:
+            yield
+            return
+        keys = [key for key, value in owner.items() if value is self]
+        with owner._reindexing(keys):
+            yield
+
 
 class AttributeDict(dict[Any,Any]):
     """Superclass for the dictionary used to hold a tag's
@@ -229,12 +358,120 @@ class AttributeDict(dict[Any,Any]):
     special logic.
     """
 
+    # The `Tag` that owns this dictionary. If that tag is part of a
+    # tree with a search index or a cache, changes to the dictionary
+    # are reported back to the tree.
+    __slots__ = ("_tag",)
+    _tag: Tag
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if isinstance(value, AttributeValueList):
+            value._owner = self
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            super().__setitem__(key, value)
+        else:
+            with self._reindexing((key,)):
+                super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            super().__delitem__(key)
+        else:
+            with self._reindexing((key,)):
+                super().__delitem__(key)
+
+    def pop(self, key: Any, *args: Any) -> Any:
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            return super().pop(key, *args)
+        with self._reindexing((key,)):
+            return super().pop(key, *args)
+
+    def popitem(self) -> Tuple[Any, Any]:
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            return super().popitem()
+        with self._reindexing(None):
+            return super().popitem()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return super().setdefault(key, default)
+        if isinstance(default, AttributeValueList):
+            default._owner = self
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            return super().setdefault(key, default)
+        with self._reindexing((key,)):
+            return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            super().update(*args, **kwargs)
+        else:
+            with self._reindexing(None):
+                super().update(*args, **kwargs)
+        self._claim_values()
+
+    def __ior__(self, other: Any) -> Self:  # type:ignore
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            super().__ior__(other)
+        else:
+            with self._reindexing(None):
+                super().__ior__(other)
+        self._claim_values()
+        return self
+
+    def clear(self) -> None:
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            super().clear()
+        else:
+            with self._reindexing(None):
+                super().clear()
+
+    def __getstate__(self) -> Optional[Dict[str, Any]]:
+        # A copy of this dictionary doesn't belong to the tag, and
+        # pickling the tag along with its attributes would pickle
+        # the whole tree.
+        return getattr(self, "__dict__", None) or None
+
+    def _claim_values(self) -> None:
+        """Make sure changes to any `AttributeValueList` values are
+        reported to this dictionary.
+        """
+        for value in self.values():
+            if isinstance(value, AttributeValueList):
+                value._owner = self
+
+    @contextmanager
+    def _reindexing(self, keys: Optional[Iterable[Any]]) -> Iterator[None]:
+        """Let the tree know that some of the attributes are about to
+        change, and keep its search index (if any) up to date.
+
+        :param keys: The attributes that will change, or None if it's
+            not known which ones will change.
+        """
+        tag = self._tag
+        index = tag._tree_modified()
+        if index is None:
+            yield
+            return
+        changing = [
+            key for key in index.INDEXED_ATTRIBUTES if keys is None or key in keys
+        ]
+        for key in changing:
+            index.attribute_changing(tag, key)
+        try:
+            yield
+        finally:
+            for key in changing:
+                index.attribute_changed(tag, key)
+
 
 class XMLAttributeDict(AttributeDict):
     """A dictionary for holding a Tag's attributes, which processes
     incoming values for consistency with the HTML spec.
     """
 
+    __slots__ = ()
+
     def __setitem__(self, key: str, value: Any) -> None:
         """Set an attribute value, possibly modifying it to comply with
         the XML spec.
@@ -259,7 +496,15 @@ class XMLAttributeDict(AttributeDict):
             # convert numeric values and booleans, which are the most common.
             value = str(value)
 
-        super().__setitem__(key, value)
+        elif isinstance(value, AttributeValueList):
+            value._owner = self
+
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            # Skip AttributeDict.__setitem__, which is only needed to
+            # keep the tree's index and caches up to date.
+            dict.__setitem__(self, key, value)
+        else:
+            super().__setitem__(key, value)
 
 
 class HTMLAttributeDict(AttributeDict):
@@ -273,6 +518,8 @@ class HTMLAttributeDict(AttributeDict):
     around boolean attributes that XML doesn't have.
     """
 
+    __slots__ = ()
+
     def __setitem__(self, key: str, value: Any) -> None:
         """Set an attribute value, possibly modifying it to comply
         with the HTML spec,
@@ -302,7 +549,12 @@ class HTMLAttributeDict(AttributeDict):
             # See note in XMLAttributeDict for the reasoning why we
             # only do this to numbers.
             value = str(value)
-        super().__setitem__(key, value)
+        elif isinstance(value, AttributeValueList):
+            value._owner = self
+        if not _roots_with_caches or getattr(self, "_tag", None) is None:
+            dict.__setitem__(self, key, value)
+        else:
+            super().__setitem__(key, value)
 
 
 class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
@@ -373,6 +625,21 @@ class PageElement(object):
     #: Only the `BeautifulSoup` object itself is hidden.
     hidden: bool = False
 
+    #: The search index for the tree rooted at this element. Only a
+    #: `BeautifulSoup` object ever has one.
+    #: :meta private:
+    _tree_index: Optional[TreeIndex] = None
+
+    #: The cache of search results for the tree rooted at this
+    #: element. Only a `BeautifulSoup` object ever has one.
+    #: :meta private:
+    _search_cache: Optional[LRUCache[Hashable, ResultSet[Any]]] = None
+
+    #: The cache of rendered start tags for the tree rooted at this
+    #: element. Only a `BeautifulSoup` object ever has one.
+    #: :meta private:
+    _start_tag_cache: Optional[_StartTagCache] = None
+
     def setup(
         self,
         parent: Optional[Tag] = None,
@@ -593,7 +860,11 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
+        index = None
         if self.parent is not None:
+            index = self.parent._tree_modified()
+            if not isinstance(self, Tag):
+                index = None
             if _self_index is None:
                 _self_index = self.parent.index(self)
             del self.parent.contents[_self_index]
@@ -630,8 +901,47 @@ class PageElement(object):
         ):
             self.next_sibling.previous_sibling = self.previous_sibling
         self.previous_sibling = self.next_sibling = None
+
+        if index is not None:
+            index.removed(self)
         return self
 
+    def _find_root(self) -> PageElement:
+        """Find the element at the root of this element's tree. This
+        is usually a `BeautifulSoup` object.
+        """
+        top = self
+        while top.parent is not None:
+            top = top.parent
+        return top
+
+    def _find_tree_index(self) -> Optional[TreeIndex]:
+        """Find the search index, if any, maintained by the
+        `BeautifulSoup` object at the root of this element's tree.
+        """
+        return self._find_root()._tree_index
+
+    def _tree_modified(self) -> Optional[TreeIndex]:
+        """Let the root of this element's tree know that the tree is
+        being modified.
+
+        :return: The search index for the tree, if any, so that the
+            caller can keep it up to date.
+        """
+        if not _roots_with_caches:
+            return None
+        top = self._find_root()
+        top._note_modification()
+        return top._tree_index
+
+    def _note_modification(self) -> None:
+        """Called on the root of a tree whenever the tree is modified.
+
+        `BeautifulSoup` uses this to invalidate cached search
+        results. Other elements don't need to do anything.
+        """
+        pass
+
     def decompose(self) -> None:
         """Recursively destroys this `PageElement` and its children.
 
@@ -1084,9 +1394,22 @@ class PageElement(object):
         limit: Optional[int],
         generator: Iterator[PageElement],
         _stacklevel: int = 3,
+        _index: Optional[TreeIndex] = None,
+        _cache_scope: Optional[str] = None,
         **kwargs: _StrainableAttribute,
     ) -> _QueryResults:
-        """Iterates over a generator looking for things that match."""
+        """Iterates over a generator looking for things that match.
+
+        :param _index: A `TreeIndex` covering every element that
+            ``generator`` would yield. If the index can narrow down
+            the search, the generator won't be used.
+        :param _cache_scope: A name for the set of elements
+            ``generator`` yields, relative to this element (e.g.
+            "descendants"). If this is provided, and the
+            `BeautifulSoup` object at the root of the tree has a
+            search cache, the results of the search may be served
+            from the cache.
+        """
 
         if string is None and "text" in kwargs:
             string = kwargs.pop("text")
@@ -1107,6 +1430,29 @@ class PageElement(object):
                 stacklevel=_stacklevel,
             )
 
+        cache = None
+        cache_key: Optional[Hashable] = None
+        if _cache_scope is not None and _roots_with_caches:
+            root = self._find_root()
+            cache = root._search_cache
+            if cache is not None:
+                query = query_key(name, attrs, string, limit, kwargs)
+                if query is not None:
+                    # The document's version number changes whenever
+                    # the tree is modified, so entries from before a
+                    # modification will never be used again.
+                    cache_key = (
+                        id(self),
+                        _cache_scope,
+                        query,
+                        cast("BeautifulSoup", root)._version,
+                    )
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        # Return a copy, so the caller can't modify
+                        # the cached list.
+                        return ResultSet(cached.source, cached)
+
         from bs4.filter import ElementFilter
 
         if isinstance(name, ElementFilter):
@@ -1114,12 +1460,20 @@ class PageElement(object):
         else:
             matcher = SoupStrainer(name, attrs, string, **kwargs)
 
+        if _index is not None and isinstance(matcher, SoupStrainer):
+            candidates = _index.search(matcher)
+            if candidates is not None:
+                # Only these tags could possibly match; there's no
+                # need to look at anything else.
+                generator = iter(candidates)
+
         result: Iterable[_OneElement]
+        results: Optional[_QueryResults] = None
         if string is None and not limit and not attrs and not kwargs:
             if name is True or name is None:
                 # Optimization to find all tags.
                 result = (element for element in generator if isinstance(element, Tag))
-                return ResultSet(matcher, result)
+                results = ResultSet(matcher, result)
             elif isinstance(name, str):
                 # Optimization to find all tags with a given name.
                 if name.count(":") == 1:
@@ -1134,13 +1488,18 @@ class PageElement(object):
                 for element in generator:
                     if not isinstance(element, Tag):
                         continue
-                    if element.name == name or (
-                        element.name == local_name
+                    if element._name == name or (
+                        element._name == local_name
                         and (prefix is None or element.prefix == prefix)
                     ):
                         result.append(element)
-                return ResultSet(matcher, result)
-        return matcher.find_all(generator, limit)
+                results = ResultSet(matcher, result)
+        if results is None:
+            results = matcher.find_all(generator, limit)
+        if cache is not None and cache_key is not None:
+            cache.put(cache_key, results)
+            return ResultSet(results.source, results)
+        return results
 
     # These generators can be used to navigate starting from both
     # NavigableStrings and Tags.
@@ -1300,7 +1659,6 @@ class NavigableString(str, PageElement):
             u = str.__new__(cls, value)
         else:
             u = str.__new__(cls, value, DEFAULT_OUTPUT_ENCODING)
-        u.hidden = False
         u.setup()
         return u
 
@@ -1566,6 +1924,114 @@ class RubyParenthesisString(NavigableString):
     """
 
 
+class TagProfile(object):
+    """Values that are the same for every `Tag` with a given name that
+    a `TreeBuilder` creates.
+
+    Asking the `TreeBuilder` about each new tag (can it be an empty-element
+    tag? does it use a special string container?) takes a surprising
+    amount of time when a document has thousands of tags. The answers
+    are calculated once per tag name, and cached on the `TreeBuilder`.
+    A `Tag` copies these values onto itself.
+    """
+
+    __slots__ = (
+        "known_xml",
+        "attribute_value_list_class",
+        "cdata_list_attributes",
+        "preserve_whitespace_tags",
+        "can_be_empty_element",
+        "interesting_string_types",
+    )
+
+    known_xml: Optional[bool]
+    attribute_value_list_class: Type[AttributeValueList]
+    cdata_list_attributes: Optional[Dict[str, Set[str]]]
+    preserve_whitespace_tags: Optional[Set[str]]
+    can_be_empty_element: Optional[bool]
+    interesting_string_types: Optional[Set[Type[NavigableString]]]
+
+    def __init__(
+        self,
+        known_xml: Optional[bool],
+        attribute_value_list_class: Type[AttributeValueList],
+        cdata_list_attributes: Optional[Dict[str, Set[str]]],
+        preserve_whitespace_tags: Optional[Set[str]],
+        can_be_empty_element: Optional[bool],
+        interesting_string_types: Optional[Set[Type[NavigableString]]],
+    ):
+        self.known_xml = known_xml
+        self.attribute_value_list_class = attribute_value_list_class
+        self.cdata_list_attributes = cdata_list_attributes
+        self.preserve_whitespace_tags = preserve_whitespace_tags
+        self.can_be_empty_element = can_be_empty_element
+        self.interesting_string_types = interesting_string_types
+
+    #: The `TreeBuilder` attributes a `TagProfile` is derived from.
+    #: If any of these are replaced, the cached profiles are thrown away.
+    BUILDER_ATTRIBUTES: Tuple[str, ...] = (
+        "is_xml",
+        "attribute_value_list_class",
+        "cdata_list_attributes",
+        "preserve_whitespace_tags",
+        "empty_element_tags",
+        "string_containers",
+    )
+
+    @classmethod
+    def for_builder(cls, builder: TreeBuilder, name: str) -> TagProfile:
+        """Find the `TagProfile` for tags with a given name created by
+        a `TreeBuilder`, creating and caching it if necessary.
+
+        `Tag.__init__` looks in ``builder._tag_profiles`` directly, and
+        only calls this method when there's a cache miss.
+        """
+        cache = getattr(builder, "_tag_profiles", None)
+        if cache is None:
+            cache = builder._tag_profiles = {}
+            builder._tag_profile_basis = cls._basis(builder)
+
+        profile = cache.get(name)
+        if profile is None:
+            string_containers = getattr(builder, "string_containers", None) or {}
+            container = string_containers.get(name)
+            if container is None:
+                interesting_string_types = Tag.MAIN_CONTENT_STRING_TYPES
+            else:
+                # This sort of tag uses a special string container
+                # subclass for most of its strings. We need to be able
+                # to look up the proper container subclass.
+                interesting_string_types = {container}
+            profile = cls(
+                builder.is_xml,
+                builder.attribute_value_list_class,
+                builder.cdata_list_attributes,
+                builder.preserve_whitespace_tags,
+                builder.can_be_empty_element(name),
+                interesting_string_types,
+            )
+            cache[name] = profile
+        return profile
+
+    @classmethod
+    def check_cache(cls, builder: TreeBuilder) -> None:
+        """Throw away a `TreeBuilder`'s cached profiles if any of the
+        attributes they were derived from have been replaced.
+
+        Called once per document, by `BeautifulSoup.reset`.
+        """
+        if getattr(builder, "_tag_profiles", None) is None:
+            return
+        old = getattr(builder, "_tag_profile_basis", None)
+        new = cls._basis(builder)
+        if old is None or any(a is not b for a, b in zip(old, new)):
+            builder._tag_profiles = None
+
+    @classmethod
+    def _basis(cls, builder: TreeBuilder) -> Tuple[Any, ...]:
+        return tuple(getattr(builder, name, None) for name in cls.BUILDER_ATTRIBUTES)
+
+
 class Tag(PageElement):
     """An HTML or XML tag that is part of a parse tree, along with its
     attributes, contents, and relationships to other parts of the tree.
@@ -1637,25 +2103,29 @@ class Tag(PageElement):
         # Tag.copy_self, and potentially BeautifulSoup.new_tag
         # as well.
     ):
+        parser_class: Optional[type[BeautifulSoup]]
         if parser is None:
-            self.parser_class = None
+            parser_class = None
         else:
             # We don't actually store the parser object: that lets extracted
             # chunks be garbage-collected.
-            self.parser_class = parser.__class__
+            parser_class = parser.__class__
         if name is None:
             raise ValueError("No value provided for new tag's name.")
-        self.name = name
-        self.namespace = namespace
-        self._namespaces = namespaces or {}
-        self.prefix = prefix
-        if (not builder or builder.store_line_numbers) and (
-            sourceline is not None or sourcepos is not None
-        ):
-            self.sourceline = sourceline
-            self.sourcepos = sourcepos
-        else:
+        self._name = name
+        # Most tags have no namespace, prefix, namespace mappings or
+        # source position. Rather than store None (or an empty
+        # dictionary) on every one of them, leave those attributes
+        # unset and let the class-level defaults stand in.
+        if namespace is not None:
+            self.namespace = namespace
+        if namespaces:
+            self._namespaces = namespaces
+        if prefix is not None:
+            self.prefix = prefix
+        if sourceline is not None:
             self.sourceline = sourceline
+        if sourcepos is not None:
             self.sourcepos = sourcepos
 
         attr_dict_class: type[AttributeDict]
@@ -1669,80 +2139,78 @@ class Tag(PageElement):
         else:
             attr_dict_class = builder.attribute_dict_class
             attribute_value_list_class = builder.attribute_value_list_class
-        self.attribute_value_list_class = attribute_value_list_class
 
         if attrs is None:
-            self.attrs = attr_dict_class()
+            self._attrs = attr_dict_class()
         else:
             if builder is not None and builder.cdata_list_attributes:
-                self.attrs = builder._replace_cdata_list_attribute_values(
-                    self.name, attrs
+                self._attrs = builder._replace_cdata_list_attribute_values(
+                    name, attrs
                 )
             else:
-                self.attrs = attr_dict_class()
+                self._attrs = attr_dict_class()
                 # Make sure that the values of any multi-valued
                 # attributes (e.g. when a Tag is copied) are stored in
                 # new lists.
                 for k, v in attrs.items():
                     if isinstance(v, list):
                         v = v.__class__(v)
-                    self.attrs[k] = v
+                    self._attrs[k] = v
+        if isinstance(self._attrs, AttributeDict):
+            self._attrs._tag = self
 
-        # If possible, determine ahead of time whether this tag is an
-        # XML tag.
-        if builder:
-            self.known_xml = builder.is_xml
-        else:
-            self.known_xml = is_xml
         self.contents: List[PageElement] = []
         self.setup(parent, previous)
-        self.hidden = False
 
+        self.parser_class = parser_class
         if builder is None:
             # In the absence of a TreeBuilder, use whatever values were
             # passed in here. They're probably None, unless this is a copy of some
-            # other tag.
-            self.can_be_empty_element = can_be_empty_element
+            # other tag. There's nothing to share, so don't bother
+            # creating a TagProfile.
+            self.known_xml = is_xml
+            self.attribute_value_list_class = attribute_value_list_class
             self.cdata_list_attributes = cdata_list_attributes
             self.preserve_whitespace_tags = preserve_whitespace_tags
+            self.can_be_empty_element = can_be_empty_element
             self.interesting_string_types = interesting_string_types
         else:
+            # Pick up the values that are the same for every tag with
+            # this name that this TreeBuilder creates: whether this is
+            # known to be an XML tag, the attributes that might need
+            # to be treated as lists, the names that might cause this
+            # tag to be treated as a whitespace-preserved tag, whether
+            # this might be an empty-element tag, and which string
+            # container classes are interesting.
+            #
+            # These are calculated once per tag name and cached on the
+            # TreeBuilder, so in the common case this is a single
+            # dictionary lookup.
+            # The TreeBuilder might not be a TreeBuilder subclass,
+            # in which case it won't have the cache until
+            # TagProfile.for_builder creates it.
+            profiles = getattr(builder, "_tag_profiles", None)
+            profile = None if profiles is None else profiles.get(name)
+            if profile is None:
+                profile = TagProfile.for_builder(builder, name)
+            self._use_profile(profile)
+
             # Set up any substitutions for this tag, such as the charset in a META tag.
-            self.attribute_value_list_class = builder.attribute_value_list_class
             builder.set_up_substitutions(self)
 
-            # Ask the TreeBuilder whether this tag might be an empty-element tag.
-            self.can_be_empty_element = builder.can_be_empty_element(name)
-
-            # Keep track of the list of attributes of this tag that
-            # might need to be treated as a list.
-            #
-            # For performance reasons, we store the whole data structure
-            # rather than asking the question of every tag. Asking would
-            # require building a new data structure every time, and
-            # (unlike can_be_empty_element), we almost never need
-            # to check this.
-            self.cdata_list_attributes = builder.cdata_list_attributes
-
-            # Keep track of the names that might cause this tag to be treated as a
-            # whitespace-preserved tag.
-            self.preserve_whitespace_tags = builder.preserve_whitespace_tags
-
-            if self.name in builder.string_containers:
-                # This sort of tag uses a special string container
-                # subclass for most of its strings. We need to be able
-                # to look up the proper container subclass.
-                self.interesting_string_types = {builder.string_containers[self.name]}
-            else:
-                self.interesting_string_types = self.MAIN_CONTENT_STRING_TYPES
-
     parser_class: Optional[type[BeautifulSoup]]
-    name: str
-    namespace: Optional[str]
-    prefix: Optional[str]
-    attrs: _AttributeValues
-    sourceline: Optional[int]
-    sourcepos: Optional[int]
+    _name: str
+    namespace: Optional[str] = None
+    prefix: Optional[str] = None
+    _attrs: _AttributeValues
+    sourceline: Optional[int] = None
+    sourcepos: Optional[int] = None
+
+    #: The namespace prefixes known when this tag was parsed. Only
+    #: set on tags that have some.
+    #: :meta private:
+    _namespaces: Mapping[str, str] = MappingProxyType({})
+
     known_xml: Optional[bool]
     contents: List[PageElement]
     hidden: bool
@@ -1755,32 +2223,217 @@ class Tag(PageElement):
     #: :meta private:
     parserClass = _deprecated_alias("parserClass", "parser_class", "4.0.0")
 
+    def _set_name(self, name: str) -> None:
+        """Rename this tag, keeping the search index (if any) up to
+        date.
+        """
+        index = self._tree_modified()
+        old_name = self.__dict__.get("_name")
+        self._name = name
+        if index is not None and old_name is not None:
+            index.renamed(self, old_name)
+
+    #: The name of this tag. Reading it is very common, so the getter
+    #: is implemented in C.
+    name: str = property(attrgetter("_name"), _set_name)  # type:ignore
+
+    def _set_attrs(self, attrs: _AttributeValues) -> None:
+        """Replace this tag's `Tag.attrs`, keeping the search index
+        (if any) up to date.
+        """
+        old = self.__dict__.get("_attrs")
+        if isinstance(old, AttributeDict) and getattr(old, "_tag", None) is self:
+            # Changes to the old dictionary no longer affect this tag.
+            del old._tag
+        if isinstance(attrs, AttributeDict):
+            attrs._tag = self
+            attrs._claim_values()
+        index = None
+        if old is not None:
+            index = self._tree_modified()
+        if index is None:
+            self._attrs = attrs
+            return
+
+        # Every indexed attribute may have changed.
+        for key in index.INDEXED_ATTRIBUTES:
+            index.attribute_changing(self, key)
+        self._attrs = attrs
+        for key in index.INDEXED_ATTRIBUTES:
+            index.attribute_changed(self, key)
+
+    #: A dictionary of this tag's attribute values. Reading it is
+    #: very common, so the getter is implemented in C.
+    attrs: _AttributeValues = property(  # type:ignore
+        attrgetter("_attrs"), _set_attrs
+    )
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Older versions of Beautiful Soup kept the name and
+        # attributes in ``name`` and ``attrs`` rather than ``_name``
+        # and ``_attrs``.
+        state = dict(state)
+        if "name" in state:
+            state["_name"] = state.pop("name")
+        if "attrs" in state:
+            state["_attrs"] = state.pop("attrs")
+        self.__dict__.update(state)
+        attrs = state.get("_attrs")
+        if isinstance(attrs, AttributeDict):
+            attrs._tag = self
+            attrs._claim_values()
+
+    def _use_profile(self, profile: TagProfile) -> None:
+        """Adopt the values that this `Tag` has in common with every
+        other `Tag` of the same name created by the same `TreeBuilder`.
+        """
+        self.known_xml = profile.known_xml
+        self.attribute_value_list_class = profile.attribute_value_list_class
+        self.cdata_list_attributes = profile.cdata_list_attributes
+        self.preserve_whitespace_tags = profile.preserve_whitespace_tags
+        self.can_be_empty_element = profile.can_be_empty_element
+        self.interesting_string_types = profile.interesting_string_types
+
     def __deepcopy__(self, memo: Dict[Any, Any], recursive: bool = True) -> Self:
         """A deepcopy of a Tag is a new Tag, unconnected to the parse tree.
         Its contents are a copy of the old Tag's contents.
         """
         clone = self.copy_self()
-
         if recursive:
-            # Clone this tag's descendants recursively, but without
-            # making any recursive function calls.
-            tag_stack: List[Tag] = [clone]
-            for event, element in self._event_stream(self.descendants):
-                if event is Tag.END_ELEMENT_EVENT:
-                    # Stop appending incoming Tags to the Tag that was
-                    # just closed.
-                    tag_stack.pop()
-                else:
-                    descendant_clone = element.__deepcopy__(memo, recursive=False)
-                    # Add to its parent's .contents
-                    tag_stack[-1].append(descendant_clone)
-
-                    if event is Tag.START_ELEMENT_EVENT:
-                        # Add the Tag itself to the stack so that its
-                        # children will be .appended to it.
-                        tag_stack.append(cast(Tag, descendant_clone))
+            self._copy_descendants(clone, memo)
         return clone
 
+    def _copy_descendants(self, clone: Tag, memo: Dict[Any, Any]) -> None:
+        """Copy this tag's descendants into ``clone``, an empty copy
+        of this tag.
+
+        This is done in a single pass over `Tag.descendants`, without
+        any recursive function calls. `Tag` and `NavigableString`
+        objects are created without going through their constructors,
+        and the copies are linked together directly rather than with
+        `Tag.append`. Objects of classes that define their own
+        constructor or copy logic are copied with
+        ``__deepcopy__(memo, recursive=False)``, as before.
+        """
+        if not self.contents:
+            return
+
+        # Values in common between many of the copied tags, keyed by
+        # the identities of the values.
+        profiles: Dict[Tuple[Any, ...], TagProfile] = {}
+        # Which classes can be copied directly.
+        fast_classes: Dict[type, bool] = {}
+
+        clones: Dict[int, Tag] = {id(self): clone}
+        # The copies go after anything copy_self() put into the clone.
+        previous = cast(PageElement, clone._last_descendant(accept_self=True))
+        copied: PageElement
+        for element in self.descendants:
+            cls = type(element)
+            fast = fast_classes.get(cls)
+            if fast is None:
+                if issubclass(cls, Tag):
+                    fast = (
+                        cls.__init__ is Tag.__init__
+                        and cls.copy_self is Tag.copy_self
+                        and cls.__deepcopy__ is Tag.__deepcopy__
+                    )
+                else:
+                    fast = (
+                        cls.__new__ is NavigableString.__new__
+                        and cls.__deepcopy__ is NavigableString.__deepcopy__
+                    )
+                fast_classes[cls] = fast
+
+            if isinstance(element, Tag):
+                if fast:
+                    tag = cls.__new__(cls)  # type:ignore
+                    tag._name = element._name
+                    # Like Tag.__init__, leave attributes that have
+                    # their default values unset.
+                    if element.namespace is not None:
+                        tag.namespace = element.namespace
+                    if element._namespaces:
+                        tag._namespaces = element._namespaces
+                    if element.prefix is not None:
+                        tag.prefix = element.prefix
+                    if element.sourceline is not None:
+                        tag.sourceline = element.sourceline
+                    if element.sourcepos is not None:
+                        tag.sourcepos = element.sourcepos
+                    if element.hidden:
+                        tag.hidden = element.hidden
+                    tag.parser_class = None
+                    tag.contents = []
+
+                    # This is what Tag.__init__ does with attributes
+                    # when there's no TreeBuilder.
+                    is_xml = element._is_xml
+                    attrs: AttributeDict
+                    if is_xml:
+                        attrs = XMLAttributeDict()
+                    else:
+                        attrs = HTMLAttributeDict()
+                    for k, v in element.attrs.items():
+                        if isinstance(v, list):
+                            v = v.__class__(v)
+                        attrs[k] = v
+                    attrs._tag = tag
+                    tag._attrs = attrs
+
+                    cdata_list_attributes = element.cdata_list_attributes
+                    preserve_whitespace_tags = element.preserve_whitespace_tags
+                    can_be_empty_element = element.can_be_empty_element
+                    interesting_string_types = element.interesting_string_types
+                    key = (
+                        is_xml,
+                        id(cdata_list_attributes),
+                        id(preserve_whitespace_tags),
+                        can_be_empty_element,
+                        id(interesting_string_types),
+                    )
+                    profile = profiles.get(key)
+                    if profile is None:
+                        profile = profiles[key] = TagProfile(
+                            is_xml,
+                            AttributeValueList,
+                            cdata_list_attributes,
+                            preserve_whitespace_tags,
+                            can_be_empty_element,
+                            interesting_string_types,
+                        )
+                    tag._use_profile(profile)
+                else:
+                    tag = element.__deepcopy__(memo, recursive=False)
+                clones[id(element)] = tag
+                copied = tag
+            elif fast:
+                copied = str.__new__(cls, element)  # type:ignore
+            else:
+                copied = element.__deepcopy__(memo, recursive=False)
+
+            parent = clones[id(element.parent)]
+            copied.parent = parent
+            copied.previous_element = previous
+            previous.next_element = copied
+            copied.next_sibling = None
+            siblings = parent.contents
+            if siblings:
+                last_sibling = siblings[-1]
+                last_sibling.next_sibling = copied
+                copied.previous_sibling = last_sibling
+            else:
+                copied.previous_sibling = None
+            siblings.append(copied)
+            previous = copied
+        previous.next_element = None
+
+        # If the copy is a BeautifulSoup object, its search index
+        # can't have seen any of this.
+        index = clone._tree_modified()
+        if index is not None:
+            index.invalidate()
+
     def copy_self(self) -> Self:
         """Create a new Tag just like this one, but with no
         contents and unattached to any parse tree.
@@ -2017,6 +2670,9 @@ class Tag(PageElement):
             )
         self.contents.insert(position, new_child)
 
+        index = self._tree_modified()
+        if index is not None and isinstance(new_child, Tag):
+            index.added(new_child)
         return [new_child]
 
     def unwrap(self) -> Self:
@@ -2168,7 +2824,7 @@ class Tag(PageElement):
         :param default: Use this value if the attribute is not present
             on this `Tag`.
         """
-        return self.attrs.get(key, default)
+        return self._attrs.get(key, default)
 
     def get_attribute_list(
         self, key: str, default: Optional[AttributeValueList] = None
@@ -2195,7 +2851,7 @@ class Tag(PageElement):
 
     def has_attr(self, key: str) -> bool:
         """Does this `Tag` have an attribute with the given name?"""
-        return key in self.attrs
+        return key in self._attrs
 
     def __hash__(self) -> int:
         return str(self).__hash__()
@@ -2203,7 +2859,7 @@ class Tag(PageElement):
     def __getitem__(self, key: str) -> _AttributeValue:
         """tag[key] returns the value of the 'key' attribute for the Tag,
         and throws an exception if it's not there."""
-        return self.attrs[key]
+        return self._attrs[key]
 
     def __iter__(self) -> Iterator[PageElement]:
         "Iterating over a Tag iterates over its contents."
@@ -2223,11 +2879,18 @@ class Tag(PageElement):
     def __setitem__(self, key: str, value: _AttributeValue) -> None:
         """Setting tag[key] sets the value of the 'key' attribute for the
         tag."""
-        self.attrs[key] = value
+        attrs = self._attrs
+        attrs[key] = value
+        if getattr(attrs, "_tag", None) is not self:
+            # The dictionary didn't report the change itself.
+            self._tree_modified()
 
     def __delitem__(self, key: str) -> None:
         "Deleting tag[key] deletes all 'key' attributes for the tag."
-        self.attrs.pop(key, None)
+        attrs = self._attrs
+        attrs.pop(key, None)
+        if getattr(attrs, "_tag", None) is not self:
+            self._tree_modified()
 
     def __call__(
         self,
@@ -2357,13 +3020,140 @@ class Tag(PageElement):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        pieces = []
+        return "".join(
+            self._iter_decode(indent_level, eventual_encoding, formatter, iterator)
+        )
+
+    def iter_encode(
+        self,
+        encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        chunk_size: int = DEFAULT_OUTPUT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Render this `Tag` and its contents as a series of
+        bytestrings.
+
+        Joined together, the bytestrings are the same as the output of
+        `Tag.encode`, but the whole document is never in memory at
+        once: it's rendered and encoded about ``chunk_size``
+        characters at a time.
+
+        :param encoding: The encoding to use when converting to
+           a bytestring.
+        :param indent_level: Passed into `Tag.decode`; use 0 to
+           pretty-print.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy, as in `Tag.encode`.
+        :param chunk_size: The approximate number of characters to
+            render before encoding them and yielding a bytestring.
+        """
+        # An incremental encoder handles encodings like UTF-16, which
+        # must only put a byte-order mark at the start of the output.
+        encoder = codecs.getincrementalencoder(encoding)(errors)
+        for text in self._iter_decode_chunks(
+            indent_level, encoding, formatter, chunk_size
+        ):
+            data = encoder.encode(text)
+            if data:
+                yield data
+        data = encoder.encode("", True)
+        if data:
+            yield data
+
+    def write_to(
+        self,
+        fp: IO[Any],
+        encoding: Optional[_Encoding] = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        chunk_size: int = DEFAULT_OUTPUT_CHUNK_SIZE,
+    ) -> None:
+        """Render this `Tag` and its contents into a file-like object,
+        a chunk at a time.
+
+        This uses much less memory than writing the output of
+        `Tag.encode` when the document is large.
+
+        :param fp: A file-like object with a ``write()`` method, such
+            as a file opened in binary mode or a socket's
+            ``makefile("wb")``.
+        :param encoding: The encoding to use when converting to
+            bytestrings. If this is None, ``fp`` is expected to accept
+            Unicode strings (it might be a file opened in text mode),
+            and no encoding is done; the output is the same as
+            `Tag.decode`.
+        :param indent_level: Passed into `Tag.decode`; use 0 to
+           pretty-print.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy, as in `Tag.encode`.
+        :param chunk_size: The approximate number of characters to
+            render before each call to ``fp.write()``.
+        """
+        chunks: Iterable[Union[str, bytes]]
+        if encoding is None:
+            # Like decode(), assume the text will eventually be
+            # encoded with the default encoding.
+            chunks = self._iter_decode_chunks(
+                indent_level, DEFAULT_OUTPUT_ENCODING, formatter, chunk_size
+            )
+        else:
+            chunks = self.iter_encode(
+                encoding, indent_level, formatter, errors, chunk_size
+            )
+        for chunk in chunks:
+            fp.write(chunk)
+
+    def _iter_decode_chunks(
+        self,
+        indent_level: Optional[int],
+        eventual_encoding: Optional[_Encoding],
+        formatter: _FormatterOrName,
+        chunk_size: int,
+    ) -> Iterator[str]:
+        """Gather the output of `Tag._iter_decode` into strings of
+        at least ``chunk_size`` characters (except for the last one).
+        """
+        pieces: List[str] = []
+        size = 0
+        for piece in self._iter_decode(indent_level, eventual_encoding, formatter):
+            pieces.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(pieces)
+                pieces = []
+                size = 0
+        if pieces:
+            yield "".join(pieces)
+
+    def _iter_decode(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: Optional[_Encoding] = DEFAULT_OUTPUT_ENCODING,
+        formatter: _FormatterOrName = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Render this `Tag` and its contents as a series of strings
+        which, joined together, make up the output of `Tag.decode`.
+
+        The arguments are the same as for `Tag.decode`.
+        """
         # First off, turn a non-Formatter `formatter` into a Formatter
         # object. This will stop the lookup from happening over and
         # over again.
         if not isinstance(formatter, Formatter):
             formatter = self.formatter_for_name(formatter)
 
+        # If the document keeps a cache of rendered start tags, use it.
+        start_tags: Optional[_StartTagCache] = None
+        root = self._find_root()
+        if root._start_tag_cache is not None:
+            start_tags = cast("BeautifulSoup", root)._current_start_tag_cache()
+
         if indent_level is True:
             indent_level = 0
 
@@ -2378,7 +3168,37 @@ class Tag(PageElement):
         for event, element in self._event_stream(iterator):
             if event in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
                 element = cast(Tag, element)
-                piece = element._format_tag(eventual_encoding, formatter, opening=True)
+                if start_tags is None:
+                    piece = element._format_tag(
+                        eventual_encoding, formatter, opening=True
+                    )
+                else:
+                    key = (id(element), id(formatter), eventual_encoding)
+                    cached = start_tags.get(key)
+                    # Renaming a tag or changing its attributes
+                    # directly doesn't change the document's version,
+                    # so check that the tag looks the way it did when
+                    # the start tag was rendered. The Formatter is
+                    # also stored, so its id can't be reused by some
+                    # other Formatter.
+                    state = (element._name, element.prefix, element.hidden)
+                    if (
+                        cached is not None
+                        and cached[0] is formatter
+                        and cached[1] == element._attrs
+                        and cached[2] == state
+                    ):
+                        piece = cached[3]
+                    else:
+                        piece = element._format_tag(
+                            eventual_encoding, formatter, opening=True
+                        )
+                        start_tags[key] = (
+                            formatter,
+                            element._copy_attributes(),
+                            state,
+                            piece,
+                        )
             elif event is Tag.END_ELEMENT_EVENT:
                 element = cast(Tag, element)
                 piece = element._format_tag(eventual_encoding, formatter, opening=False)
@@ -2437,8 +3257,7 @@ class Tag(PageElement):
                         )
                 if event == Tag.START_ELEMENT_EVENT:
                     indent_level += 1
-            pieces.append(piece)
-        return "".join(pieces)
+            yield piece
 
     class _TreeTraversalEvent(object):
         """An internal class representing an event in the process
@@ -2525,6 +3344,15 @@ class Tag(PageElement):
 
         return space_before + s + space_after
 
+    def _copy_attributes(self) -> Dict[str, Any]:
+        """Copy this tag's attributes, including any lists of values,
+        which might be modified in place.
+        """
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self._attrs.items()
+        }
+
     def _format_tag(
         self, eventual_encoding: str, formatter: Formatter, opening: bool
     ) -> str:
@@ -2550,23 +3378,24 @@ class Tag(PageElement):
         if opening:
             attributes = formatter.attributes(self)
             attrs = []
+            attribute_value = formatter.attribute_value
+            quoted_attribute_value = formatter.quoted_attribute_value
             for key, val in attributes:
                 if val is None:
-                    decoded = key
-                else:
-                    if isinstance(val, list) or isinstance(val, tuple):
-                        val = " ".join(val)
-                    elif not isinstance(val, str):
-                        val = str(val)
-                    elif (
-                        isinstance(val, AttributeValueWithCharsetSubstitution)
-                        and eventual_encoding is not None
+                    attrs.append(key)
+                    continue
+                if isinstance(val, str):
+                    if eventual_encoding is not None and isinstance(
+                        val, AttributeValueWithCharsetSubstitution
                     ):
                         val = val.substitute_encoding(eventual_encoding)
-
-                    text = formatter.attribute_value(val)
-                    decoded = str(key) + "=" + formatter.quoted_attribute_value(text)
-                attrs.append(decoded)
+                elif isinstance(val, (list, tuple)):
+                    val = " ".join(val)
+                else:
+                    val = str(val)
+                attrs.append(
+                    str(key) + "=" + quoted_attribute_value(attribute_value(val))
+                )
             if attrs:
                 attribute_string = " " + " ".join(attrs)
 
@@ -2581,7 +3410,7 @@ class Tag(PageElement):
             "<"
             + closing_slash
             + prefix
-            + self.name
+            + self._name
             + attribute_string
             + void_element_closing_slash
             + ">"
@@ -2595,7 +3424,7 @@ class Tag(PageElement):
         """
         return indent_level is not None and (
             not self.preserve_whitespace_tags
-            or self.name not in self.preserve_whitespace_tags
+            or self._name not in self.preserve_whitespace_tags
         )
 
     def prettify(
@@ -2738,10 +3567,22 @@ class Tag(PageElement):
         :kwargs: Additional filters on attribute values.
         """
         generator = self.descendants
+        index = self._tree_index
+        scope = "descendants"
         if not recursive:
             generator = self.children
+            index = None
+            scope = "children"
         return self._find_all(
-            name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
+            name,
+            attrs,
+            string,
+            limit,
+            generator,
+            _stacklevel=_stacklevel + 1,
+            _index=index,
+            _cache_scope=scope,
+            **kwargs,
         )
 
     findAll = _deprecated_function_alias("findAll", "find_all", "4.0.0")
@@ -2821,10 +3662,16 @@ class Tag(PageElement):
         """
         return self.css.select(selector, namespaces, limit, **kwargs)
 
+    # The object returned by Tag.css, once it's been created.
+    _css: Optional[CSS] = None
+
     @property
     def css(self) -> CSS:
         """Return an interface to the CSS selector API."""
-        return CSS(self)
+        css = self._css
+        if css is None:
+            css = self._css = CSS(self)
+        return css
 
     # Old names for backwards compatibility
     @_deprecated("children", "4.0.0")
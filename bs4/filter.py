@@ -1,16 +1,20 @@
 from __future__ import annotations
 from collections import defaultdict
+from functools import partial
+import operator
 import re
 from typing import (
     Any,
     Callable,
     cast,
     Dict,
+    FrozenSet,
     Iterator,
     Iterable,
     List,
     Optional,
     Sequence,
+    Set,
     Type,
     Union,
 )
@@ -105,19 +109,34 @@ class ElementFilter(object):
             return True
         return self.match_function(element)
 
+    def compile(self) -> _PageElementMatchFunction:
+        """Turn this `ElementFilter` into a function that takes a
+        `PageElement` and returns `True` if it matches.
+
+        The returned function must give the same answers as
+        `ElementFilter.match`, but subclasses may do some work ahead
+        of time to make it faster. `ElementFilter.filter` (and so
+        every find_*() method) calls this once per search, rather than
+        calling `ElementFilter.match` over and over.
+
+        The base implementation just returns `ElementFilter.match`.
+        """
+        return self.match
+
     def filter(self, generator: Iterator[PageElement]) -> Iterator[_OneElement]:
         """The most generic search method offered by Beautiful Soup.
 
         Acts like Python's built-in `filter`, using
         `ElementFilter.match` as the filtering function.
         """
+        match = self.compile()
         while True:
             try:
                 i = next(generator)
             except StopIteration:
                 break
             if i:
-                if self.match(i):
+                if match(i):
                     yield cast("_OneElement", i)
 
     def find(self, generator: Iterator[PageElement]) -> _AtMostOneElement:
@@ -181,6 +200,36 @@ class ElementFilter(object):
         """
         return True
 
+    def allow_descendant_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> bool:
+        """Called when `ElementFilter.allow_tag_creation` has rejected a
+        tag, to see whether anything inside that tag might be allowed.
+
+        Normally the contents of a rejected tag are considered one by
+        one, as though the tag weren't there. If this method returns
+        False, the tree builder skips everything up to the tag's
+        closing tag instead, without creating any objects or even
+        looking at attribute values. That can make parsing much
+        faster when large parts of a document are irrelevant.
+
+        Skipping relies on the parser closing every tag it opens, so
+        it only happens with tree builders that do (see
+        `TreeBuilder.closes_every_tag`), like the lxml ones. With
+        ``html.parser``, which doesn't fix up unbalanced markup, this
+        method isn't called, and the contents of a rejected tag are
+        always considered one by one; otherwise a tag that was never
+        closed would take the rest of the document with it.
+
+        By default, the contents of rejected tags are never skipped.
+        To change this, subclass `ElementFilter`, or pass
+        ``skip_contents_of`` into the `SoupStrainer` constructor.
+
+        :param name: The name of the rejected tag.
+        :param attrs: The attributes of the rejected tag.
+        """
+        return True
+
 
 class MatchRule(object):
     """Each MatchRule encapsulates the logic behind a single argument
@@ -286,7 +335,7 @@ class TagNameMatchRule(MatchRule):
     function: Optional[_TagMatchFunction]
 
     def matches_tag(self, tag: Tag) -> bool:
-        base_value = self._base_match(tag.name)
+        base_value = self._base_match(tag._name)
         if base_value is not None:
             return base_value
 
@@ -332,6 +381,13 @@ class SoupStrainer(ElementFilter):
     :param string: One or more restrictions on the strings found in a
       document.
 
+    :param skip_contents_of: The names of tags whose contents can't
+      contain anything this `SoupStrainer` is looking for. When the
+      `SoupStrainer` is used as ``parse_only`` and rejects one of these
+      tags, everything inside it is skipped without being looked at
+      (see `ElementFilter.allow_descendant_creation`). For example,
+      ``SoupStrainer("a", skip_contents_of=["head", "script"])``.
+
     :param kwargs: A dictionary that maps attribute names to restrictions
       on tags that use those attributes. These restrictions are additive to
       any specified in ``attrs``.
@@ -341,12 +397,14 @@ class SoupStrainer(ElementFilter):
     name_rules: List[TagNameMatchRule]
     attribute_rules: Dict[str, List[AttributeValueMatchRule]]
     string_rules: List[StringMatchRule]
+    skip_contents_of: FrozenSet[str] = frozenset()
 
     def __init__(
         self,
         name: Optional[_StrainableElement] = None,
         attrs: Dict[str, _StrainableAttribute] = {},
         string: Optional[_StrainableString] = None,
+        skip_contents_of: Optional[Union[str, Iterable[str]]] = None,
         **kwargs: _StrainableAttribute,
     ):
         if string is None and "text" in kwargs:
@@ -389,6 +447,12 @@ class SoupStrainer(ElementFilter):
             List[StringMatchRule], list(self._make_match_rules(string, StringMatchRule))
         )
 
+        if skip_contents_of is None:
+            skip_contents_of = ()
+        elif isinstance(skip_contents_of, str):
+            skip_contents_of = (skip_contents_of,)
+        self.skip_contents_of = frozenset(skip_contents_of)
+
         #: DEPRECATED 4.13.0: You shouldn't need to check this under
         #: any name (.string or .text), and if you do, you're probably
         #: not taking into account all of the types of values this
@@ -430,6 +494,22 @@ class SoupStrainer(ElementFilter):
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} name={self.name_rules} attrs={self.attribute_rules} string={self.string_rules}>"
 
+    def allow_descendant_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+    ) -> bool:
+        """Skip the contents of a rejected tag if its name is in
+        ``skip_contents_of``.
+
+        :param name: The name of the rejected tag.
+        :param attrs: The attributes of the rejected tag.
+        """
+        skip = self.skip_contents_of
+        if not skip:
+            return True
+        if name in skip:
+            return False
+        return not (nsprefix and f"{nsprefix}:{name}" in skip)
+
     @classmethod
     def _make_match_rules(
         cls,
@@ -498,7 +578,7 @@ class SoupStrainer(ElementFilter):
             not tag.prefix
             and len(self.name_rules) == 1
             and self.name_rules[0].string is not None
-            and tag.name != self.name_rules[0].string
+            and tag._name != self.name_rules[0].string
         ):
             return False
 
@@ -507,7 +587,7 @@ class SoupStrainer(ElementFilter):
         # the tag.
         prefixed_name = None
         if tag.prefix:
-            prefixed_name = f"{tag.prefix}:{tag.name}"
+            prefixed_name = f"{tag.prefix}:{tag._name}"
         if self.name_rules:
             name_matches = False
             for rule in self.name_rules:
@@ -542,6 +622,274 @@ class SoupStrainer(ElementFilter):
                 return False
         return True
 
+    def compile(self) -> _PageElementMatchFunction:
+        """Turn the rules of this `SoupStrainer` into a single function
+        that takes a `PageElement` and returns `True` if it matches,
+        exactly as `SoupStrainer.match` would.
+
+        `SoupStrainer.match` has to interpret this object's rules
+        from scratch for every element it looks at. The compiled
+        function does that work once: exact-string rules are
+        gathered into a set, the checks for each attribute are
+        prepared ahead of time, and checks that can't possibly
+        succeed are skipped entirely.
+
+        The compiled function reflects the rules as they are when
+        this method is called. If you change `SoupStrainer.name_rules`,
+        `SoupStrainer.attribute_rules` or `SoupStrainer.string_rules`
+        afterwards, call this method again.
+        """
+        cls = type(self)
+        for method in ("match", "matches_tag", "_attribute_match",
+                       "matches_any_string_rule"):
+            if getattr(cls, method) is not getattr(SoupStrainer, method):
+                # A subclass has changed the matching logic, so we
+                # can't compile it.
+                return self.match
+
+        match_string: Optional[Callable[[Optional[str]], bool]] = None
+        if self.string_rules:
+            match_string = self._compile_rules(self.string_rules)
+
+        if not self.name_rules and not self.attribute_rules:
+            # Only a NavigableString can match.
+            if match_string is None:
+                return lambda element: False
+            _match_string = match_string
+
+            def match_navigable_string(element: PageElement) -> bool:
+                return not isinstance(element, Tag) and _match_string(
+                    cast(NavigableString, element)
+                )
+
+            return match_navigable_string
+
+        if (
+            not self.attribute_rules
+            and match_string is None
+            and all(rule.string is not None for rule in self.name_rules)
+        ):
+            # The most common case: the search is for one or more
+            # specific tag names, and nothing else.
+            names = frozenset(cast(str, rule.string) for rule in self.name_rules)
+
+            def match_tag_names(element: PageElement) -> bool:
+                if not isinstance(element, Tag):
+                    return False
+                if element._name in names:
+                    return True
+                prefix = element.prefix
+                return bool(prefix) and f"{prefix}:{element._name}" in names
+
+            return match_tag_names
+
+        match_name = self._compile_name_rules()
+        attribute_checks = [
+            self._compile_attribute_rules(attr, rules)
+            for attr, rules in self.attribute_rules.items()
+        ]
+
+        if not attribute_checks and match_string is None and match_name is not None:
+            _match_name = match_name
+
+            def match_tag_name(element: PageElement) -> bool:
+                return isinstance(element, Tag) and _match_name(element)
+
+            return match_tag_name
+
+        def match_tag(element: PageElement) -> bool:
+            if not isinstance(element, Tag):
+                return False
+            if match_name is not None and not match_name(element):
+                return False
+            for check in attribute_checks:
+                if not check(element):
+                    return False
+            if match_string is not None:
+                _str = element.string
+                if _str is None or not match_string(_str):
+                    return False
+            return True
+
+        return match_tag
+
+    @classmethod
+    def _compile_rules(
+        cls, rules: Sequence[MatchRule]
+    ) -> Callable[[Optional[str]], bool]:
+        """Build a function that checks a string against a list of
+        `MatchRule` objects, returning `True` if any of them match.
+        """
+        if any(rule.function is not None for rule in rules):
+            # A function may have side effects, so the rules need to
+            # be checked one at a time, in order.
+            matchers = [rule.matches_string for rule in rules]
+
+            def match_in_order(string: Optional[str]) -> bool:
+                for matcher in matchers:
+                    if matcher(string):
+                        return True
+                return False
+
+            return match_in_order
+
+        present = set(rule.present for rule in rules if rule.present is not None)
+        if True in present:
+            if False in present:
+                return lambda string: True
+            # Nothing else can match None, and this matches
+            # everything else.
+            return lambda string: string is not None
+        match_none = False in present
+
+        strings = frozenset(
+            cast(str, rule.string) for rule in rules if rule.string is not None
+        )
+        searches = tuple(
+            cast(_RegularExpressionProtocol, rule.pattern).search
+            for rule in rules
+            if rule.pattern is not None
+        )
+        if not searches and not match_none:
+            if len(strings) == 1:
+                # A C-level equality check is the fastest option.
+                return partial(operator.eq, next(iter(strings)))
+
+            def match_strings(string: Optional[str]) -> bool:
+                try:
+                    return string in strings
+                except TypeError:
+                    # An unhashable value can't be equal to any of
+                    # the strings.
+                    return False
+
+            return match_strings
+
+        def match_any(string: Optional[str]) -> bool:
+            if string is None:
+                return match_none
+            try:
+                if string in strings:
+                    return True
+            except TypeError:
+                pass
+            for search in searches:
+                if search(string) is not None:
+                    return True
+            return False
+
+        return match_any
+
+    def _compile_name_rules(self) -> Optional[Callable[[Tag], bool]]:
+        """Build a function that checks a `Tag` against this
+        `SoupStrainer`'s name rules.
+
+        :return: A function, or None if no check is necessary.
+        """
+        rules = self.name_rules
+        if not rules:
+            return None
+        if any(rule.function is not None for rule in rules):
+            # A function is called with the Tag itself, and possibly
+            # again with its prefixed name, so fall back to checking
+            # the rules one at a time.
+            def match_rules_in_order(tag: Tag) -> bool:
+                prefixed_name = None
+                if tag.prefix:
+                    prefixed_name = f"{tag.prefix}:{tag._name}"
+                for rule in rules:
+                    if rule.matches_tag(tag) or (
+                        prefixed_name is not None and rule.matches_string(prefixed_name)
+                    ):
+                        return True
+                return False
+
+            return match_rules_in_order
+
+        if any(rule.present is True for rule in rules):
+            # Every tag has a name.
+            return None
+
+        match = self._compile_rules(rules)
+
+        def match_name(tag: Tag) -> bool:
+            if match(tag._name):
+                return True
+            prefix = tag.prefix
+            return bool(prefix) and match(f"{prefix}:{tag._name}")
+
+        return match_name
+
+    def _compile_attribute_rules(
+        self, attr: str, rules: List[AttributeValueMatchRule]
+    ) -> Callable[[Tag], bool]:
+        """Build a function that checks a `Tag` against the rules for
+        one of its attributes.
+        """
+        if any(rule.function is not None for rule in rules):
+            # Keep the original order of function calls.
+            def match_rules_in_order(tag: Tag) -> bool:
+                return self._attribute_match(tag.get(attr, None), rules)
+
+            return match_rules_in_order
+
+        match = self._compile_rules(rules)
+
+        def match_attribute(tag: Tag) -> bool:
+            value = tag._attrs.get(attr)
+            if not isinstance(value, list):
+                return match(value)
+            for item in value:
+                if match(item):
+                    return True
+            if len(value) > 1:
+                # Try again, treating the attribute value as a
+                # single string.
+                return match(" ".join(value))
+            return False
+
+        return match_attribute
+
+    def _indexable_tag_names(self) -> Optional[Set[str]]:
+        """If this `SoupStrainer` can only match tags with certain
+        names, find those names, so that a `TreeIndex` can be used to
+        look up the tags instead of checking every element in a tree.
+
+        :return: A set of tag names, or None if this `SoupStrainer`
+            might match a tag with any name (or a string).
+        """
+        if not self.name_rules:
+            return None
+        names = set()
+        for rule in self.name_rules:
+            if rule.string is None:
+                return None
+            names.add(rule.string)
+            if ":" in rule.string:
+                # This might be a prefixed name, like "ns:tag". If so,
+                # it will match a tag whose local name is "tag".
+                names.add(rule.string.split(":", 1)[1])
+        return names
+
+    def _indexable_attribute_values(self, attribute: str) -> Optional[Set[str]]:
+        """If this `SoupStrainer` can only match tags that have
+        certain values for an attribute, find those values, so that a
+        `TreeIndex` can be used to look up the tags.
+
+        :return: A set of attribute values, or None if this
+            `SoupStrainer` might match a tag with any value for the
+            attribute (or no value at all).
+        """
+        rules = self.attribute_rules.get(attribute)
+        if not rules:
+            return None
+        values = set()
+        for rule in rules:
+            if rule.string is None:
+                return None
+            values.add(rule.string)
+        return values
+
     def _attribute_match(
         self,
         attr_value: Optional[_AttributeValue],
@@ -1,10 +1,25 @@
 from __future__ import annotations
-from typing import Callable, Dict, Iterable, Optional, Set, Tuple, TYPE_CHECKING, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Type,
+    Union,
+)
 from typing_extensions import TypeAlias
 from bs4.dammit import EntitySubstitution
 
 if TYPE_CHECKING:
     from bs4._typing import _AttributeValue
+    from bs4.element import NavigableString
+
+#: The NavigableString class, imported the first time it's needed.
+_NavigableString: Optional[Type[NavigableString]] = None
 
 
 class Formatter(EntitySubstitution):
@@ -63,6 +78,12 @@ class Formatter(EntitySubstitution):
     #: rendered this way.)
     empty_attributes_are_booleans: bool
 
+    #: If this is set to false by the constructor, then attributes
+    #: will be output in the order they were set (usually, the order
+    #: they appeared in the original document) instead of being
+    #: sorted alphabetically.
+    sort_attributes: bool
+
     def _default(
         self, language: str, value: Optional[Set[str]], kwarg: str
     ) -> Set[str]:
@@ -84,6 +105,7 @@ class Formatter(EntitySubstitution):
         cdata_containing_tags: Optional[Set[str]] = None,
         empty_attributes_are_booleans: bool = False,
         indent: int = 1,
+        sort_attributes: bool = True,
     ):
         r"""Constructor.
 
@@ -113,6 +135,10 @@ class Formatter(EntitySubstitution):
             level. If indent is a string (such as "\t"), that string
             is used to indent each level. The default behavior is to
             indent one space per level.
+        :param sort_attributes: If this is true (the default), a tag's
+            attributes will be sorted alphabetically when it's
+            output. Otherwise, they will be output in the order they
+            were set, which is faster.
 
         """
         self.language = language or self.HTML
@@ -122,6 +148,7 @@ class Formatter(EntitySubstitution):
             self.language, cdata_containing_tags, "cdata_containing_tags"
         )
         self.empty_attributes_are_booleans = empty_attributes_are_booleans
+        self.sort_attributes = sort_attributes
         if indent is None:
             indent = 0
         indent_str: str
@@ -146,10 +173,18 @@ class Formatter(EntitySubstitution):
         """
         if not self.entity_substitution:
             return ns
-        from .element import NavigableString
+        global _NavigableString
+        if _NavigableString is None:
+            # bs4.element imports this module, so this import can't
+            # happen at the top level. Importing it on every call
+            # would be slow.
+            from .element import NavigableString
+
+            _NavigableString = NavigableString
 
         if (
-            isinstance(ns, NavigableString)
+            self.cdata_containing_tags
+            and isinstance(ns, _NavigableString)
             and ns.parent is not None
             and ns.parent.name in self.cdata_containing_tags
         ):
@@ -175,19 +210,31 @@ class Formatter(EntitySubstitution):
         By default, attributes are sorted alphabetically. This makes
         behavior consistent between Python 2 and Python 3, and preserves
         backwards compatibility with older versions of Beautiful Soup.
+        If `sort_attributes` is False, they're left in the order
+        they were set.
 
         If `empty_attributes_are_booleans` is True, then
         attributes whose values are set to the empty string will be
         treated as boolean attributes.
         """
-        if tag.attrs is None:
+        attrs = tag.attrs
+        if not attrs:
             return []
 
-        items: Iterable[Tuple[str, _AttributeValue]] = list(tag.attrs.items())
-        return sorted(
-            (k, (None if self.empty_attributes_are_booleans and v == "" else v))
-            for k, v in items
-        )
+        if not self.sort_attributes and not self.empty_attributes_are_booleans:
+            # The attributes can be used as-is.
+            return attrs.items()
+
+        items: List[Tuple[str, Optional[_AttributeValue]]]
+        if self.empty_attributes_are_booleans:
+            items = [(k, (None if v == "" else v)) for k, v in attrs.items()]
+        else:
+            items = list(attrs.items())
+        if self.sort_attributes and len(items) > 1:
+            # No two attributes have the same name, so this sorts
+            # on the names alone.
+            items.sort()
+        return items
 
 
 class HTMLFormatter(Formatter):
@@ -202,6 +249,7 @@ class HTMLFormatter(Formatter):
         cdata_containing_tags: Optional[Set[str]] = None,
         empty_attributes_are_booleans: bool = False,
         indent: int = 1,
+        sort_attributes: bool = True,
     ):
         super(HTMLFormatter, self).__init__(
             self.HTML,
@@ -209,6 +257,7 @@ class HTMLFormatter(Formatter):
             void_element_close_prefix,
             cdata_containing_tags,
             empty_attributes_are_booleans,
+            sort_attributes=sort_attributes,
         )
 
 
@@ -224,6 +273,7 @@ class XMLFormatter(Formatter):
         cdata_containing_tags: Optional[Set[str]] = None,
         empty_attributes_are_booleans: bool = False,
         indent: int = 1,
+        sort_attributes: bool = True,
     ):
         super(XMLFormatter, self).__init__(
             self.XML,
@@ -231,6 +281,7 @@ class XMLFormatter(Formatter):
             void_element_close_prefix,
             cdata_containing_tags,
             empty_attributes_are_booleans,
+            sort_attributes=sort_attributes,
         )
 
 
@@ -0,0 +1,348 @@
+"""Parse a document a chunk at a time, as the chunks become available.
+
+Acquire an `IncrementalParser` through `BeautifulSoup.incremental`::
+
+ parser = BeautifulSoup.incremental(features="lxml")
+ for chunk in response.iter_content(65536):
+     parser.feed(chunk)
+ soup = parser.close()
+
+If the tree builder drives a push parser (lxml and html.parser both
+do), each chunk is parsed as soon as it's fed in, so you never need
+to hold the entire raw document in memory alongside the parse tree.
+
+If you only care about certain tags, use `BeautifulSoup.iterparse`
+instead. Each matching tag is removed from the tree as soon as it's
+closed, so the tree never grows much bigger than a single match::
+
+ for item in BeautifulSoup.iterparse(fh, "item", features="xml"):
+     print(item.title.string)
+
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections import deque
+from typing import (
+    Any,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4.dammit import EncodingDetector
+from bs4.element import Tag
+from bs4.exceptions import ParserRejectedMarkup
+from bs4.filter import ElementFilter
+
+if TYPE_CHECKING:
+    from soupsieve import SoupSieve
+    from bs4 import BeautifulSoup
+    from bs4._typing import (
+        _Encoding,
+        _Encodings,
+        _RawMarkup,
+    )
+
+
+class IncrementalParser(object):
+    """Feed a document into a `BeautifulSoup` object a chunk at a time.
+
+    You don't need to instantiate this class yourself; instead, use
+    `BeautifulSoup.incremental`.
+
+    If the `TreeBuilder` doesn't support incremental parsing (html5lib
+    doesn't), the chunks are collected and the whole document is
+    parsed when `IncrementalParser.close` is called.
+
+    :param soup: An empty `BeautifulSoup` object which will become the
+        parse tree.
+    :param from_encoding: The user asked to try this encoding.
+    :param exclude_encodings: The user asked _not_ to try any of
+        these encodings.
+    :param match: An `ElementFilter` (such as a `SoupStrainer`) or a
+        CSS selector. If this is present, every tag that matches it
+        is removed from the tree as soon as the tag is closed, and
+        made available through `IncrementalParser.read_tags`.
+    """
+
+    #: When bytestring chunks are fed in, nothing is parsed until this
+    #: many bytes have arrived (or the document is closed). The first
+    #: bytes of the document are used to figure out its encoding.
+    ENCODING_SNIFF_SIZE: int = 4096
+
+    #: The object that will contain the parse tree. You can look
+    #: at the partial parse tree while the document is being fed in,
+    #: but don't modify it.
+    soup: BeautifulSoup
+
+    from_encoding: Optional[_Encoding]
+    exclude_encodings: Optional[_Encodings]
+    match: Optional[Union[ElementFilter, str]]
+
+    _matched: Deque[Tag]
+    _selector: Optional[SoupSieve]
+
+    _pending: List[_RawMarkup]
+    _pending_size: int
+    _markup_type: Optional[Type[_RawMarkup]]
+    _started: bool
+    _closed: bool
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+        match: Optional[Union[ElementFilter, str]] = None,
+    ):
+        self.soup = soup
+        self.from_encoding = from_encoding
+        self.exclude_encodings = exclude_encodings
+        if match is not None and not isinstance(match, (ElementFilter, str)):
+            raise TypeError(
+                f"match must be an ElementFilter or a CSS selector, not {match!r}."
+            )
+        self.match = match
+        self._matched = deque()
+        self._selector = None
+        self._pending = []
+        self._pending_size = 0
+        self._markup_type = None
+        self._started = False
+        self._closed = False
+
+        builder = soup.builder
+        if builder.supports_incremental_feed:
+            soup.reset()
+            builder.initialize_soup(soup)
+            builder.reset()
+            if match is not None:
+                soup._tag_closed_handler = self._tag_closed
+
+    @property
+    def closed(self) -> bool:
+        """Has `IncrementalParser.close` been called?"""
+        return self._closed
+
+    def feed(self, data: _RawMarkup) -> None:
+        """Parse the next chunk of the document.
+
+        :param data: A bytestring or a Unicode string. The chunks of a
+           single document must all be of the same type.
+        """
+        if self._closed:
+            raise ValueError("Cannot feed data to an IncrementalParser that has been closed.")
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        if not isinstance(data, (bytes, str)):
+            raise TypeError(
+                f"Incoming markup is of an invalid type: {data!r}. Markup must be a string or a bytestring."
+            )
+        if self._markup_type is None:
+            self._markup_type = type(data)
+        elif not isinstance(data, self._markup_type):
+            raise TypeError(
+                "Cannot mix Unicode strings and bytestrings in a single document."
+            )
+
+        if self._started:
+            self.soup.builder.feed_incremental(data)
+            return
+
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self.soup.builder.supports_incremental_feed and (
+            isinstance(data, str) or self._pending_size >= self.ENCODING_SNIFF_SIZE
+        ):
+            self._start()
+
+    def close(self) -> BeautifulSoup:
+        """Signal the end of the document and finish the parse tree.
+
+        :return: The completed `BeautifulSoup` object.
+        """
+        if self._closed:
+            return self.soup
+        self._closed = True
+
+        soup = self.soup
+        builder = soup.builder
+        if not builder.supports_incremental_feed:
+            # Parse the whole document the normal way.
+            self.soup = type(soup)(
+                self._join_pending(),
+                builder=builder,
+                parse_only=soup.parse_only,
+                replacer=soup.replacer,
+                from_encoding=self.from_encoding,
+                exclude_encodings=self.exclude_encodings,
+                element_classes=soup.element_classes,
+            )
+            self._pending = []
+            if self.match is not None:
+                # Act as though the matching tags had been removed
+                # as they were closed.
+                closed = [
+                    element
+                    for event, element in self.soup._event_stream(
+                        self.soup.descendants
+                    )
+                    if event in (Tag.END_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT)
+                ]
+                for tag in closed:
+                    if self._matches(tag):
+                        self._detach(tag)
+            return self.soup
+
+        if not self._started:
+            self._start()
+        builder.close_incremental()
+        soup._finish_feed()
+        soup._tag_closed_handler = None
+
+        # Remove the builder's circular reference to the soup.
+        builder.soup = None
+        return soup
+
+    def read_tags(self) -> Iterator[Tag]:
+        """Yield the tags that matched `IncrementalParser.match` and
+        have been removed from the tree since the last time this
+        method was called.
+        """
+        while self._matched:
+            yield self._matched.popleft()
+
+    def iterfeed(
+        self, source: Union[_RawMarkup, Any, Iterable[_RawMarkup]], chunk_size: int = 65536
+    ) -> Iterator[Tag]:
+        """Feed an entire document into this parser and close it,
+        yielding matching tags as soon as they're closed.
+
+        :param source: A string, a bytestring, an open filehandle, or
+            an iterable of strings or bytestrings.
+        :param chunk_size: When reading from a string or filehandle,
+            feed this much of it into the parser at a time.
+        """
+        for chunk in self._chunks(source, chunk_size):
+            self.feed(chunk)
+            yield from self.read_tags()
+        self.close()
+        yield from self.read_tags()
+
+    @classmethod
+    def _chunks(
+        cls, source: Union[_RawMarkup, Any, Iterable[_RawMarkup]], chunk_size: int
+    ) -> Iterator[_RawMarkup]:
+        """Split some kind of document source into chunks."""
+        if isinstance(source, (bytes, str)):
+            for i in range(0, len(source), chunk_size):
+                yield source[i : i + chunk_size]
+        elif hasattr(source, "read"):
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            yield from source
+
+    def _matches(self, tag: Tag) -> bool:
+        """Does a newly closed tag match `IncrementalParser.match`?"""
+        if isinstance(self.match, str):
+            if self._selector is None:
+                # Compile the selector the first time it's needed, so
+                # that any namespace prefixes defined on the root tag
+                # are in scope.
+                self._selector = self.soup.css.compile(self.match)
+            return self._selector.match(tag)
+        assert self.match is not None
+        return self.match.match(tag)
+
+    def _tag_closed(self, tag: Tag) -> None:
+        """Called by the `BeautifulSoup` object whenever a tag is closed
+        during parsing.
+        """
+        if tag is self.soup or not self._matches(tag):
+            return
+        previous_element = tag.previous_element
+        self._detach(tag)
+
+        # The next element to be parsed will be connected to whatever
+        # was parsed just before this tag, not to something inside
+        # the tag.
+        self.soup._most_recent_element = previous_element
+
+    def _detach(self, tag: Tag) -> None:
+        """Remove a matching tag from the tree and queue it up."""
+        parent = tag.parent
+        if parent is not None and parent.contents and parent.contents[-1] is tag:
+            # A tag that was just closed is normally the last child of
+            # its parent; no need to search for it.
+            tag.extract(_self_index=len(parent.contents) - 1)
+        else:
+            tag.extract()
+        self._matched.append(tag)
+
+    def _join_pending(self) -> _RawMarkup:
+        """Combine all the chunks that haven't been parsed yet."""
+        if self._markup_type is bytes:
+            return b"".join(self._pending)  # type:ignore
+        return "".join(self._pending)  # type:ignore
+
+    def _start(self) -> None:
+        """Choose an encoding and start up the underlying parser."""
+        markup = self._join_pending()
+        self._pending = []
+        self._pending_size = 0
+        self._started = True
+
+        soup = self.soup
+        encoding: Optional[_Encoding] = None
+        declared_encoding: Optional[_Encoding] = None
+        if isinstance(markup, bytes):
+            encoding, declared_encoding, markup = self._sniff_encoding(markup)
+        soup.original_encoding = encoding
+        soup.declared_html_encoding = declared_encoding
+        soup.contains_replacement_characters = False
+
+        soup.builder.start_incremental(encoding)
+        soup.builder.feed_incremental(markup)
+
+    def _sniff_encoding(
+        self, markup: bytes
+    ) -> Tuple[_Encoding, Optional[_Encoding], bytes]:
+        """Find the most likely encoding of a document, based on its
+        first few bytes.
+
+        Candidate encodings are proposed by `EncodingDetector`, in the
+        usual order. The first one that can decode the sample is chosen.
+
+        :return: A 3-tuple (encoding, declared encoding, sample with
+            any byte-order mark removed).
+        """
+        known_definite_encodings: List[_Encoding] = []
+        if self.from_encoding:
+            known_definite_encodings.append(self.from_encoding)
+        detector = EncodingDetector(
+            markup,
+            known_definite_encodings=known_definite_encodings,
+            is_html=not self.soup.builder.is_xml,
+            exclude_encodings=self.exclude_encodings,
+        )
+        for encoding in detector.encodings:
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(detector.markup)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            return encoding, detector.declared_encoding, detector.markup
+        raise ParserRejectedMarkup(
+            "Could not find an encoding that can decode the start of the document."
+        )
@@ -0,0 +1,172 @@
+"""Parse a lot of small documents with the same settings.
+
+Acquire a `ParserSession` through `BeautifulSoup.session`::
+
+ session = BeautifulSoup.session(features="html.parser")
+ for body in email_bodies:
+     soup = session.parse(body)
+     print(soup.get_text())
+
+Every call to the `BeautifulSoup` constructor looks up a tree builder
+class based on ``features``, creates a new tree builder, and (for
+html.parser) creates a new parser object. For a large document that
+doesn't matter, but when the documents are tiny fragments, that setup
+can take longer than the parsing itself. A `ParserSession` does the
+lookup once, and uses the same tree builder for every document. The
+tree builder also keeps the information it's cached about the tags it
+has seen, and the html.parser tree builder resets and reuses its
+parser instead of creating a new one.
+
+If the fragments are Unicode strings, `ParserSession.fragment` is
+faster still, because it skips the checks the `BeautifulSoup`
+constructor makes for common beginner mistakes.
+`BeautifulSoup.fragment` does the same thing without the need to keep
+a session around.
+
+A `ParserSession` parses one document at a time. Don't share one
+between threads.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4.builder import TreeBuilder
+from bs4.builder._htmlparser import HTMLParserTreeBuilder
+from bs4.exceptions import ParserRejectedMarkup
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4._typing import (
+        _Encoding,
+        _Encodings,
+        _IncomingMarkup,
+    )
+
+
+class ParserSession(object):
+    """Parse any number of documents, one after another, with the same
+    tree builder and settings.
+
+    You don't need to instantiate this class yourself; instead, use
+    `BeautifulSoup.session`.
+
+    :param soup: A `BeautifulSoup` object that was created with the
+        settings to use for every document. Its tree builder will be
+        used to parse every document.
+    """
+
+    #: The tree builder used to parse every document.
+    builder: TreeBuilder
+
+    _soup_class: Type[BeautifulSoup]
+    _soup_kwargs: Dict[str, Any]
+
+    #: True while this session is in the middle of parsing a document.
+    busy: bool = False
+
+    def __init__(self, soup: BeautifulSoup):
+        self._soup_class = type(soup)
+        self.builder = soup.builder
+        if isinstance(self.builder, HTMLParserTreeBuilder):
+            self.builder.reuse_parser = True
+
+        # These are the BeautifulSoup constructor arguments that
+        # apply to the document rather than to the tree builder.
+        self._soup_kwargs = dict(
+            parse_only=soup.parse_only,
+            replacer=soup.replacer,
+            element_classes=soup.element_classes,
+            index_tag_names=soup.index_tag_names,
+            index_attributes=soup.index_attributes,
+            search_cache_size=soup.search_cache_size,
+            cache_start_tags=soup.cache_start_tags,
+        )
+
+    def parse(
+        self,
+        markup: _IncomingMarkup,
+        from_encoding: Optional[_Encoding] = None,
+        exclude_encodings: Optional[_Encodings] = None,
+    ) -> BeautifulSoup:
+        """Parse a document.
+
+        :param markup: A string, bytestring or file-like object, as
+            for the `BeautifulSoup` constructor.
+        :param from_encoding: The encoding of this document, if it's a
+            bytestring and you know what it is.
+        :param exclude_encodings: Encodings known to be wrong for
+            this document.
+        :return: A brand new `BeautifulSoup` object.
+        """
+        self.busy = True
+        try:
+            return self._soup_class(
+                markup,
+                builder=self.builder,
+                from_encoding=from_encoding,
+                exclude_encodings=exclude_encodings,
+                **self._soup_kwargs,
+            )
+        finally:
+            # If the markup was rejected, the constructor won't have
+            # released the tree builder.
+            self.builder.soup = None
+            self.busy = False
+
+    def fragment(self, markup: str) -> BeautifulSoup:
+        """Parse a small piece of markup as quickly as possible.
+
+        Unlike `ParserSession.parse`, this doesn't check whether the
+        markup looks like a URL or a filename, and it only tries the
+        tree builder's first strategy for parsing a string. If that
+        doesn't work, or if ``markup`` isn't a string, this method
+        does the same thing as `ParserSession.parse`.
+
+        :param markup: A string to parse.
+        :return: A brand new `BeautifulSoup` object.
+        """
+        if not isinstance(markup, str):
+            return self.parse(markup)
+        self.busy = True
+        try:
+            return self._soup_class._parse_fragment(
+                markup, self.builder, self._soup_kwargs
+            )
+        except ParserRejectedMarkup:
+            pass
+        finally:
+            self.busy = False
+        return self.parse(markup)
+
+
+# The sessions used by BeautifulSoup.fragment, for each thread.
+_fragment_sessions = threading.local()
+
+
+def _session_for_fragments(
+    soup_class: Type[BeautifulSoup], features: Union[str, Sequence[str]]
+) -> ParserSession:
+    """Find or create this thread's `ParserSession` for parsing
+    fragments with the given features.
+    """
+    key: Tuple[Any, ...]
+    if isinstance(features, str):
+        key = (soup_class, features)
+    else:
+        key = (soup_class,) + tuple(features)
+    sessions = _fragment_sessions.__dict__
+    session = sessions.get(key)
+    if session is None:
+        session = sessions[key] = soup_class.session(features)
+    return session
@@ -0,0 +1,113 @@
+"""Tests of the parallel batch parsing API."""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.batch import parse_many
+from bs4.filter import SoupStrainer
+
+from . import SoupTest
+
+DOCUMENTS = ["<p>%d</p><b>bold %d</b>" % (i, i) for i in range(20)]
+
+
+def paragraph_text(soup):
+    return soup.p.string if soup.p else None
+
+
+def bold_count(soup):
+    return len(soup.find_all("b"))
+
+
+def fail_on_five(soup):
+    if soup.p.string == "5":
+        raise ValueError("five")
+    return soup.p.string
+
+
+class TestParseMany(SoupTest):
+    def test_results_in_order(self):
+        results = parse_many(
+            DOCUMENTS, "html.parser", extract=paragraph_text, workers=2
+        )
+        assert results == [str(i) for i in range(20)]
+
+    def test_serial(self):
+        results = parse_many(
+            iter(DOCUMENTS), "html.parser", extract=paragraph_text, workers=1
+        )
+        assert results == [str(i) for i in range(20)]
+
+    def test_bytes_and_constructor_arguments(self):
+        documents = [doc.encode("utf8") for doc in DOCUMENTS[:3]]
+        results = parse_many(
+            documents,
+            "html.parser",
+            parse_only=SoupStrainer("b"),
+            extract=paragraph_text,
+            workers=2,
+            chunksize=1,
+        )
+        assert results == [None, None, None]
+        assert parse_many(
+            documents,
+            "html.parser",
+            extract=bold_count,
+            workers=2,
+            index_tag_names=True,
+        ) == [1, 1, 1]
+
+    def test_no_extract_returns_soups(self):
+        [soup] = parse_many(DOCUMENTS[:1], "html.parser", workers=2)
+        assert isinstance(soup, BeautifulSoup)
+        assert soup.b.string == "bold 0"
+
+    def test_exception_is_raised(self):
+        with pytest.raises(ValueError):
+            parse_many(DOCUMENTS, "html.parser", extract=fail_on_five, workers=2)
+
+    def test_existing_executor(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            for i in range(2):
+                results = parse_many(
+                    DOCUMENTS, "html.parser", extract=paragraph_text, executor=pool
+                )
+                assert results == [str(i) for i in range(20)]
+
+        # Any Executor will do.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = parse_many(
+                DOCUMENTS, "html.parser", extract=lambda soup: soup.b, executor=pool
+            )
+            assert [b.string for b in results] == ["bold %d" % i for i in range(20)]
+
+    def test_chunk_size_with_existing_executor(self):
+        class RecordingExecutor(ThreadPoolExecutor):
+            def map(self, fn, *iterables, timeout=None, chunksize=1):
+                self.chunksize = chunksize
+                return super().map(fn, *iterables, timeout=timeout)
+
+        with RecordingExecutor(max_workers=1) as pool:
+            parse_many(
+                DOCUMENTS,
+                "html.parser",
+                extract=paragraph_text,
+                workers=5,
+                executor=pool,
+            )
+        # The chunk size comes from ``workers``, not from the
+        # executor's internals.
+        assert pool.chunksize == 1
+        with RecordingExecutor(max_workers=1) as pool:
+            parse_many(
+                DOCUMENTS,
+                "html.parser",
+                extract=paragraph_text,
+                workers=2,
+                executor=pool,
+            )
+        assert pool.chunksize == 2
+
+    def test_empty(self):
+        assert parse_many([], "html.parser", extract=paragraph_text, workers=2) == []
@@ -0,0 +1,370 @@
+"""Tests of the optional caches on BeautifulSoup objects."""
+
+import copy
+import gc
+import pickle
+import pytest
+import re
+
+from bs4 import BeautifulSoup
+from bs4.element import _roots_with_caches
+from bs4.filter import SoupStrainer
+from bs4.formatter import HTMLFormatter
+from bs4._cache import (
+    CacheInfo,
+    LRUCache,
+    query_key,
+)
+
+from . import (
+    LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
+    SoupTest,
+)
+
+DOCUMENT = (
+    '<div id="main"><p class="a">1</p><p class="b">2</p>'
+    '<ul><li>x</li><li class="a">y</li></ul></div>'
+)
+
+
+class TestLRUCache(object):
+    def test_least_recently_used_item_is_discarded(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_statistics(self):
+        cache = LRUCache(10)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("a")
+        assert cache.cache_info() == CacheInfo(hits=2, misses=1, maxsize=10, currsize=1)
+        cache.clear()
+        assert cache.cache_info() == CacheInfo(hits=0, misses=0, maxsize=10, currsize=0)
+
+    def test_maxsize_must_be_positive(self):
+        with pytest.raises(ValueError):
+            LRUCache(0)
+
+
+class TestQueryKey(object):
+    def test_equivalent_queries_have_the_same_key(self):
+        assert query_key("a", {"class": ["x", "y"]}) == query_key(
+            "a", {"class": ("x", "y")}
+        )
+        assert query_key({"a": 1, "b": 2}) == query_key({"b": 2, "a": 1})
+        assert query_key(re.compile("a")) == query_key(re.compile("a"))
+
+    def test_different_queries_have_different_keys(self):
+        assert query_key(True) != query_key(1)
+        assert query_key("a", None) != query_key(None, "a")
+        assert query_key(re.compile("a")) != query_key("a")
+
+    def test_uncacheable_queries(self):
+        assert query_key(lambda x: True) is None
+        assert query_key(["a", len]) is None
+        assert query_key(SoupStrainer("a")) is None
+        assert query_key({"class": object()}) is None
+
+
+class TestSearchCache(SoupTest):
+    def test_no_cache_by_default(self):
+        soup = self.soup(DOCUMENT)
+        assert soup._search_cache is None
+        assert soup.find_all("p") == soup.find_all("p")
+
+    def test_repeated_search_served_from_cache(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        cache = soup._search_cache
+        first = soup.find_all("p", class_="a")
+        assert cache.cache_info().misses == 1
+        second = soup.find_all("p", class_="a")
+        assert cache.cache_info().hits == 1
+        assert first == second
+        assert [p.string for p in first] == ["1"]
+        assert first.source is second.source
+
+        # Each caller gets their own list.
+        assert first is not second
+        second.append("garbage")
+        assert soup.find_all("p", class_="a") == first
+
+    def test_find_uses_cache(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        assert soup.find("li").string == "x"
+        assert soup.find("li").string == "x"
+        assert soup._search_cache.cache_info().hits == 1
+
+    def test_different_queries_cached_separately(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        ul = soup.ul
+        div = soup.div
+        soup._search_cache.clear()
+        assert len(soup.find_all("li")) == 2
+        assert len(soup.find_all("li", limit=1)) == 1
+        assert len(soup.find_all(class_="a")) == 2
+        assert len(ul.find_all(class_="a")) == 1
+        assert len(soup.find_all("li", recursive=False)) == 0
+        assert len(div.find_all(True, recursive=False)) == 3
+        assert len(div.find_all(True)) == 5
+        assert soup._search_cache.cache_info().hits == 0
+
+    def test_cache_is_bounded(self):
+        soup = self.soup(DOCUMENT, search_cache_size=2)
+        for name in ["p", "li", "ul", "p"]:
+            soup.find_all(name)
+        assert soup._search_cache.cache_info() == CacheInfo(
+            hits=0, misses=4, maxsize=2, currsize=2
+        )
+
+    def test_functions_are_not_cached(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        calls = []
+
+        def is_p(tag):
+            calls.append(tag)
+            return tag.name == "p"
+
+        soup.find_all(is_p)
+        soup.find_all(is_p)
+        soup.find_all(SoupStrainer("p"))
+        assert len(calls) == 12
+        assert len(soup._search_cache) == 0
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda soup: soup.ul.append(soup.new_tag("p")),
+            lambda soup: soup.ul.insert(0, soup.new_tag("p")),
+            lambda soup: soup.find("p").extract(),
+            lambda soup: soup.find("p").decompose(),
+            lambda soup: soup.find("p").replace_with(soup.new_tag("b")),
+            lambda soup: soup.li.insert_before(soup.new_tag("p", attrs={"class": "a"})),
+            lambda soup: soup.ul.clear(),
+            lambda soup: setattr(soup.li, "string", "changed"),
+            lambda soup: soup.li.__setitem__("class", "a"),
+            lambda soup: soup.find(class_="b").__setitem__("class", "a"),
+            lambda soup: soup.find(class_="a").__delitem__("class"),
+            lambda soup: soup.li.attrs.__setitem__("class", "a"),
+            lambda soup: soup.find(class_="a").attrs.pop("class"),
+            lambda soup: soup.find(class_="b").attrs.update({"class": "a"}),
+            lambda soup: soup.find(class_="b")["class"].append("a"),
+            lambda soup: soup.find(class_="a")["class"].remove("a"),
+            lambda soup: setattr(soup.li, "name", "p"),
+            lambda soup: setattr(soup.find("p"), "name", "li"),
+        ],
+    )
+    def test_modification_invalidates_cache(self, modify):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        plain = self.soup(DOCUMENT)
+        queries = [
+            (("p",), {}),
+            ((True,), dict(class_="a")),
+            (("li",), dict(string="x")),
+            ((), dict(string=re.compile("."))),
+        ]
+        for args, kwargs in queries:
+            soup.find_all(*args, **kwargs)
+        modify(soup)
+        modify(plain)
+        for args, kwargs in queries:
+            found = soup.find_all(*args, **kwargs)
+            expect = plain.find_all(*args, **kwargs)
+            assert [x.decode() if hasattr(x, "decode") else x for x in found] == [
+                x.decode() if hasattr(x, "decode") else x for x in expect
+            ]
+
+    def test_attribute_change_without_index(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        assert soup.find_all(id="z") == []
+        soup.li.attrs["id"] = "z"
+        assert soup.find_all(id="z") == [soup.li]
+
+    def test_only_documents_with_caches_are_notified(self):
+        plain = self.soup(DOCUMENT)
+        assert id(plain) not in _roots_with_caches
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        assert _roots_with_caches[id(soup)] is soup
+        key = id(soup)
+        del soup
+        gc.collect()
+        assert key not in _roots_with_caches
+
+        # A document with a cache is notified of modifications even
+        # if it wasn't tracked when the modified tag was created.
+        tag = plain.new_tag("p")
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        assert len(soup.find_all("p")) == 2
+        soup.ul.append(tag)
+        assert len(soup.find_all("p")) == 3
+
+    def test_search_while_parsing_incrementally(self):
+        parser = BeautifulSoup.incremental("html.parser", search_cache_size=10)
+        parser.feed("<p>1</p>")
+        assert len(parser.soup.find_all("p")) == 1
+        parser.feed("<p>2</p>")
+        assert len(parser.soup.find_all("p")) == 2
+        parser.close()
+
+    def test_copy_and_pickle(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        soup.find_all("p")
+        for clone in (copy.copy(soup), pickle.loads(pickle.dumps(soup))):
+            assert clone.search_cache_size == 10
+            assert len(clone._search_cache) == 0
+            assert [p.string for p in clone.find_all("p")] == ["1", "2"]
+            assert clone.find_all("p")[0] is clone.p
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_select_served_from_cache(self):
+        soup = self.soup(DOCUMENT, search_cache_size=10)
+        cache = soup._search_cache
+        first = soup.select("li.a")
+        second = soup.select("li.a")
+        assert first == second and first is not second
+        assert cache.cache_info().hits == 1
+
+        compiled = soup.css.compile("p")
+        soup.select(compiled)
+        soup.select(compiled)
+        assert cache.cache_info().hits == 2
+
+        # A selector run from a different starting point is cached
+        # separately.
+        assert soup.ul.select("p") == []
+        assert len(soup.select("p")) == 2
+
+        soup.ul.append(soup.new_tag("li", attrs={"class": "a"}))
+        assert len(soup.select("li.a")) == 2
+
+        soup.find("li", class_="a").name = "p"
+        assert len(soup.select("li.a")) == 1
+
+
+ATTRIBUTE_DOCUMENT = (
+    '<html><head><meta charset="utf-8"></head><body>'
+    '<div id="main" class="a b" data-x="&lt;&eacute;&gt;">'
+    '<p class="a" title="1">1</p><br><a href="/?a=1&amp;b=2" rel="nofollow">x</a>'
+    "</div></body></html>"
+)
+
+
+class TestStartTagCache(SoupTest):
+    def test_no_cache_by_default(self):
+        soup = self.soup(ATTRIBUTE_DOCUMENT)
+        assert soup._start_tag_cache is None
+        soup.decode()
+        assert soup._start_tag_cache is None
+
+    def test_output_is_unchanged(self):
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        plain = self.soup(ATTRIBUTE_DOCUMENT)
+        formatter = HTMLFormatter(indent=2)
+        for i in range(2):
+            assert soup.decode() == plain.decode()
+            assert soup.decode(formatter="html") == plain.decode(formatter="html")
+            assert soup.prettify() == plain.prettify()
+            assert soup.encode("latin-1") == plain.encode("latin-1")
+            assert soup.div.decode(formatter=formatter) == plain.div.decode(
+                formatter=formatter
+            )
+            assert soup.div.decode_contents() == plain.div.decode_contents()
+            assert b"".join(soup.iter_encode("utf-16")) == plain.encode("utf-16")
+
+    def test_rendering_again_uses_cache(self):
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        soup.decode()
+        cache = soup._start_tag_cache
+        assert len(cache) == len(soup.find_all(True))
+
+        # Tamper with the cache to show that it's being used.
+        key = (id(soup.p), id(soup.formatter_for_name("minimal")), "utf-8")
+        formatter, attrs, state, rendered = cache[key]
+        cache[key] = (formatter, attrs, state, "<P>")
+        assert "<P>1</p>" in soup.decode()
+
+        # A different formatter or encoding gets its own entry.
+        assert '<p class="a" title="1">' in soup.decode(formatter="html")
+        assert '<p class="a" title="1">' in soup.decode(eventual_encoding="latin-1")
+        assert '<meta charset="latin-1"/>' in soup.decode(eventual_encoding="latin-1")
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda soup: soup.p.__setitem__("title", "2"),
+            lambda soup: soup.p.__delitem__("title"),
+            lambda soup: soup.br.append("text"),
+            lambda soup: soup.p.insert_before(soup.new_tag("p", attrs={"x": "y"})),
+            lambda soup: soup.p.extract(),
+            lambda soup: soup.a.replace_with(soup.new_tag("a", href="/")),
+        ],
+    )
+    def test_modification_invalidates_cache(self, modify):
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        plain = self.soup(ATTRIBUTE_DOCUMENT)
+        soup.decode()
+        modify(soup)
+        modify(plain)
+        assert soup.decode() == plain.decode()
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda tag: setattr(tag, "name", "span"),
+            lambda tag: setattr(tag, "prefix", "ns"),
+            lambda tag: setattr(tag, "hidden", True),
+            lambda tag: tag.attrs.__setitem__("title", "2"),
+            lambda tag: tag.attrs.__setitem__("id", "new"),
+            lambda tag: tag.attrs.pop("title"),
+            lambda tag: tag["class"].append("b"),
+            lambda tag: tag["class"].__setitem__(0, "b"),
+            lambda tag: setattr(tag, "attrs", {"class": ["a"], "title": "3"}),
+        ],
+    )
+    def test_changes_to_tag_are_noticed(self, modify):
+        # These changes don't go through the document, but the
+        # cached start tag isn't used once the tag has changed.
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        plain = self.soup(ATTRIBUTE_DOCUMENT)
+        soup.decode()
+        modify(soup.p)
+        modify(plain.p)
+        assert soup.decode() == plain.decode()
+        assert soup.decode() == plain.decode()
+
+    def test_rendering_while_parsing_incrementally(self):
+        parser = BeautifulSoup.incremental("html.parser", cache_start_tags=True)
+        parser.feed('<p class="a">1</p>')
+        assert parser.soup.decode() == '<p class="a">1</p>'
+        parser.feed('<p class="b">2</p>')
+        assert parser.soup.decode() == '<p class="a">1</p><p class="b">2</p>'
+        parser.close()
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_empty_element_gets_contents(self):
+        soup = BeautifulSoup("<root><a/></root>", "xml", cache_start_tags=True)
+        assert "<a/>" in soup.decode()
+        soup.a.append("text")
+        assert "<a>text</a>" in soup.decode()
+
+    def test_extracted_tag_is_not_cached(self):
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        div = soup.div.extract()
+        assert div.decode() == self.soup(ATTRIBUTE_DOCUMENT).div.decode()
+        assert len(soup._start_tag_cache) == 0
+
+    def test_copy_and_pickle(self):
+        soup = self.soup(ATTRIBUTE_DOCUMENT, cache_start_tags=True)
+        soup.decode()
+        for clone in (copy.copy(soup), pickle.loads(pickle.dumps(soup))):
+            assert clone.cache_start_tags is True
+            assert clone._start_tag_cache == {}
+            assert clone.decode() == soup.decode()
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import pytest
 import types
 
@@ -5,6 +7,8 @@ from bs4 import (
     BeautifulSoup,
     ResultSet,
 )
+from bs4.css import CSS
+from bs4._cache import CacheInfo
 
 from typing import (
     Any,
@@ -16,6 +20,7 @@ from typing import (
 from packaging.version import Version
 
 from . import (
+    LXML_PRESENT,
     SoupTest,
     SOUP_SIEVE_PRESENT,
 )
@@ -534,3 +539,72 @@ class TestCSSSelectors(SoupTest):
         assert m(".foo#bar") == "\\.foo\\#bar"
         assert m("()[]{}") == "\\(\\)\\[\\]\\{\\}"
         assert m(".foo") == self._soup.css.escape(".foo")
+
+
+@pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+class TestCompiledSelectorCache(SoupTest):
+    def setup_method(self):
+        self.old_size = CSS.cache_info().maxsize
+        CSS.clear_cache()
+
+    def teardown_method(self):
+        CSS.set_cache_size(self.old_size)
+
+    def test_selector_compiled_once(self):
+        soup = self.soup("<p class='a'>1</p><p>2</p>")
+        assert len(soup.select("p.a")) == 1
+        assert soup.select_one("p.a").string == "1"
+        assert soup.p.css.match("p.a")
+        assert CSS.cache_info() == CacheInfo(hits=2, misses=1, maxsize=256, currsize=1)
+        assert soup.css.compile("p.a") is soup.css.compile("p.a")
+
+    def test_cache_is_shared_between_documents(self):
+        self.soup("<p>1</p>").select("p")
+        self.soup("<p>2</p>").select("p")
+        assert CSS.cache_info().hits == 1
+
+    def test_cache_key(self):
+        soup = self.soup("<p>1</p>")
+        soup.select("p")
+        soup.select("p", flags=0)
+        assert CSS.cache_info().hits == 1
+        soup.select("p", namespaces={"ns": "http://example.com/"})
+        soup.select("p", custom={":--x": "p"})
+        soup.select("P")
+        assert CSS.cache_info().misses == 4
+
+    def test_precompiled_selector_not_cached(self):
+        soup = self.soup("<p>1</p>")
+        compiled = soup.css.compile("p")
+        CSS.clear_cache()
+        assert soup.select(compiled) == [soup.p]
+        assert CSS.cache_info().currsize == 0
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_namespaces_from_document(self):
+        xml = '<root xmlns:a="http://a/"><a:x>1</a:x></root>'
+        other = '<root xmlns:a="http://b/"><a:x>2</a:x></root>'
+        assert BeautifulSoup(xml, "xml").select_one("a|x").string == "1"
+        assert BeautifulSoup(other, "xml").select_one("a|x").string == "2"
+
+    def test_set_cache_size(self):
+        soup = self.soup("<p>1</p>")
+        CSS.set_cache_size(1)
+        soup.select("p")
+        soup.select("b")
+        soup.select("p")
+        assert CSS.cache_info() == CacheInfo(hits=0, misses=3, maxsize=1, currsize=1)
+
+    def test_css_object_reused(self):
+        soup = self.soup("<p>1</p>")
+        assert soup.css is soup.css
+        assert soup.p.css is soup.p.css
+        assert soup.p.css.tag is soup.p
+
+        # The cached object doesn't get in the way of copying or
+        # pickling.
+        p = soup.p
+        assert copy.copy(p).css.tag is not p
+        clone = pickle.loads(pickle.dumps(p))
+        assert clone.css.tag is clone
+        assert pickle.loads(pickle.dumps(soup)).select("p")[0].string == "1"
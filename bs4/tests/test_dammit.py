@@ -12,6 +12,37 @@ from bs4.dammit import (
 
 
 class TestUnicodeDammit(object):
+    def test_memoryview(self):
+        data = "<p>Sacr\xe9 bleu!</p>".encode("utf-8")
+        dammit = UnicodeDammit(memoryview(data))
+        assert dammit.unicode_markup == "<p>Sacr\xe9 bleu!</p>"
+        assert dammit.original_encoding == "utf-8"
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+    @pytest.mark.parametrize("encoding", ["utf-8", "utf-16le", "euc-jp"])
+    def test_detection_window_multibyte_characters(self, chunk_size, encoding):
+        # A multibyte character cut off at the end of the window
+        # doesn't cause the encoding to be rejected.
+        data = "<p>Sacr\xe9 bleu! \u3042\u3044</p>".encode(encoding)
+        dammit = UnicodeDammit(data, [encoding], detection_window=chunk_size)
+        assert dammit.original_encoding == encoding
+        assert dammit.unicode_markup == str(data, encoding)
+
+    def test_detection_window_rejects_bad_guess_early(self):
+        # The document isn't UTF-8, and that becomes obvious near the
+        # start of the document.
+        data = "Sacr\xe9 bleu!".encode("latin-1") + b"a" * 100000
+        dammit = UnicodeDammit(data, ["utf-8"], detection_window=1024)
+        assert dammit.tried_encodings[0] == ("utf-8", "strict")
+        assert dammit.original_encoding == "windows-1252"
+        assert dammit.unicode_markup == str(data, "windows-1252")
+
+    @pytest.mark.parametrize("markup", [b"", memoryview(b"")])
+    def test_empty_bytes(self, markup):
+        dammit = UnicodeDammit(markup)
+        assert dammit.unicode_markup == ""
+        assert dammit.original_encoding is None
+
     """Standalone tests of UnicodeDammit."""
 
     def test_unicode_input(self):
@@ -279,6 +310,43 @@ class TestEncodingDetector(object):
         assert m(b" " + xml_bytes, search_entire_document=True) == "iso-8859-1"
         assert m(b"a" + xml_bytes, search_entire_document=True) is None
 
+    def test_detection_window(self):
+        meta = b'<meta charset="euc-jp">'
+        markup = b"<html>" + b" " * 10000 + meta + b" " * 300000
+
+        # By default, the first 5% of an HTML document is searched
+        # for a declared encoding.
+        detector = EncodingDetector(markup, is_html=True)
+        assert "euc-jp" in list(detector.encodings)
+
+        detector = EncodingDetector(markup, is_html=True, detection_window=1000)
+        assert "euc-jp" not in list(detector.encodings)
+        assert detector.declared_encoding is None
+
+        # The whole window is searched, even if that's more than 5% of
+        # the document.
+        markup = b"<html>" + b" " * 2500 + meta + b" " * 30000
+        assert "euc-jp" not in list(EncodingDetector(markup, is_html=True).encodings)
+        detector = EncodingDetector(markup, is_html=True, detection_window=4096)
+        assert "euc-jp" in list(detector.encodings)
+
+    def test_memoryview_is_not_copied(self):
+        data = bytearray(
+            b'\xef\xbb\xbf<html><head><meta charset="euc-jp"></head></html>'
+        )
+        view = memoryview(data)
+        stripped, encoding = EncodingDetector.strip_byte_order_mark(view)
+        assert encoding == "utf-8"
+        assert isinstance(stripped, memoryview)
+        assert stripped.obj is data
+        assert stripped.tobytes() == bytes(data[3:])
+
+        assert EncodingDetector.find_declared_encoding(view, is_html=True) == "euc-jp"
+
+        detector = EncodingDetector(view, is_html=True)
+        assert detector.markup.obj is data
+        assert list(detector.encodings)[:2] == ["utf-8", "euc-jp"]
+
 
 class TestEntitySubstitution(object):
     """Standalone tests of the EntitySubstitution class."""
@@ -338,6 +406,52 @@ class TestEntitySubstitution(object):
         markup = "fjords &sqcups; penguins"
         assert self.sub.substitute_html(data) == markup
 
+    @pytest.mark.parametrize(
+        "s",
+        [
+            "",
+            "plain ASCII text",
+            "AT&T <b> &amp; &nonesuch;",
+            "caf\u00e9 & cr\u00e8me",
+            # Two-character sequences that start with an ASCII
+            # character.
+            "a<\u20d2b =\u20e5 >\u20d2 <<\u20d2",
+            "&<\u20d2&",
+            # The first character of a two-character sequence, with
+            # and without the second.
+            "\u2267\u0338 \u2267 \u2267\u2267\u0338 \u2294\ufe00\u2294",
+            # Characters that aren't entities.
+            "\N{SNOWMAN}\u0338\u20d2 \U0001d511",
+        ],
+    )
+    def test_fast_paths_match_regular_expressions(self, s):
+        # Most strings don't go through the regular expressions, but
+        # the results are the same as if they had.
+        sub = self.sub
+        assert sub.substitute_xml(s) == sub.AMPERSAND_OR_BRACKET.sub(
+            sub._substitute_xml_entity, s
+        )
+        assert sub.substitute_html(s) == (
+            sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
+                sub._substitute_html_entity, s
+            )
+        )
+        entities_escaped = sub.ANY_ENTITY_RE.sub(sub._escape_entity_name, s)
+        assert sub.substitute_html5(s) == sub.CHARACTER_TO_HTML_ENTITY_RE.sub(
+            sub._substitute_html_entity, entities_escaped
+        )
+
+    def test_string_without_special_characters_is_returned_unchanged(self):
+        s = "Plain text, with 'quotes' and \"quotes\"."
+        for method in (
+            self.sub.substitute_xml,
+            self.sub.substitute_xml_containing_entities,
+            self.sub.substitute_html,
+            self.sub.substitute_html5,
+            self.sub.substitute_html5_raw,
+        ):
+            assert method(s) is s
+
     def test_xml_converstion_includes_no_quotes_if_make_quoted_attribute_is_false(self):
         s = 'Welcome to "my bar"'
         assert self.sub.substitute_xml(s, False) == s
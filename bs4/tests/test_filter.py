@@ -3,6 +3,7 @@ import re
 import warnings
 
 from . import (
+    LXML_PRESENT,
     SoupTest,
 )
 from typing import (
@@ -10,6 +11,7 @@ from typing import (
     Optional,
     Tuple,
 )
+from bs4 import BeautifulSoup
 from bs4.element import Tag
 from bs4.filter import (
     AttributeValueMatchRule,
@@ -139,6 +141,125 @@ class TestElementFilter(SoupTest):
         # ElementFilter matches everything.
         assert soup.find(filter).name == "deny"
 
+    def test_allow_descendant_creation(self):
+        # By default, the contents of a rejected tag are considered
+        # on their own merits.
+        filter = ElementFilter()
+        assert True is filter.allow_descendant_creation(None, "tag", {})
+
+        class MyFilter(ElementFilter):
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                return name == "allow"
+
+        soup = self.soup(
+            "<deny><allow>1</allow></deny><allow>2</allow>", parse_only=MyFilter()
+        )
+        assert "<allow>1</allow><allow>2</allow>" == soup.decode()
+
+
+class SkippingFilter(ElementFilter):
+    """Allows <allow> tags. Skips the contents of <skip> tags, and looks
+    inside any other tag.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        self.seen.append(name)
+        return name == "allow"
+
+    def allow_descendant_creation(self, nsprefix, name, attrs):
+        return name != "skip"
+
+
+class TestSkippingRejectedTags(SoupTest):
+    """Test what happens when an ElementFilter says the contents of a
+    rejected tag should be skipped.
+    """
+
+    # Only tree builders that close every tag can skip, so most of
+    # these tests use lxml.
+    needs_lxml = pytest.mark.skipif(not LXML_PRESENT, reason="lxml is not installed")
+
+    @needs_lxml
+    def test_contents_are_skipped(self):
+        markup = (
+            "<div><skip a='b'><allow>1</allow>text<!--comment-->"
+            "<skip><allow>2</allow></skip><allow>3</allow></skip>"
+            "<allow>4</allow><other><allow>5</allow></other></div>"
+        )
+        filter = SkippingFilter()
+        soup = BeautifulSoup(markup, "lxml", parse_only=filter)
+        assert "<allow>4</allow><allow>5</allow>" == soup.decode()
+
+        # The filter was never even consulted about the tags inside
+        # the skipped <skip> tag.
+        assert filter.seen.count("allow") == 2
+        assert filter.seen.count("skip") == 1
+
+    @needs_lxml
+    def test_unclosed_tag_is_skipped(self):
+        # The parser closes the <skip> tag when its parent is closed,
+        # so skipping stops there.
+        markup = "<div><skip><allow>1</allow></div><allow>2</allow>"
+        soup = BeautifulSoup(markup, "lxml", parse_only=SkippingFilter())
+        assert soup.decode().endswith("<allow>2</allow>")
+        assert "1" not in soup.decode()
+
+    @needs_lxml
+    def test_self_closing_tag_is_skipped(self):
+        markup = "<skip/><allow>1</allow><skip><skip/></skip><allow>2</allow>"
+        soup = BeautifulSoup(markup, "lxml", parse_only=SkippingFilter())
+        assert "<allow>1</allow><allow>2</allow>" == soup.decode()
+
+    @needs_lxml
+    def test_empty_element_tag_does_not_start_skipping(self):
+        # An empty-element tag like <br> may never be closed, so it
+        # can't start a skip.
+        class BRFilter(ElementFilter):
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                return name == "allow"
+
+            def allow_descendant_creation(self, nsprefix, name, attrs):
+                return name != "br"
+
+        markup = "<allow>1</allow><br><allow>2</allow>"
+        soup = BeautifulSoup(markup, "lxml", parse_only=BRFilter())
+        assert "<allow>1</allow><allow>2</allow>" == soup.decode()
+
+    @needs_lxml
+    def test_namespaced_tags_are_skipped(self):
+        markup = (
+            '<root xmlns:a="http://a/"><a:skip><a:skip xmlns:b="http://b/">'
+            "<b:allow/></a:skip><skip/></a:skip><allow>1</allow>"
+            "<a:allow>2</a:allow></root>"
+        )
+        soup = BeautifulSoup(markup, "xml", parse_only=SkippingFilter())
+        assert "<allow>1</allow><a:allow>2</a:allow>" == soup.decode().split(
+            "\n", 1
+        )[1]
+
+    @needs_lxml
+    def test_skipping_stops_when_the_document_is_reset(self):
+        soup = BeautifulSoup("<skip>", "lxml", parse_only=SkippingFilter())
+        soup._skip_depth = 1
+        soup.reset()
+        assert 0 == soup._skip_depth
+
+    def test_html_parser_does_not_skip(self):
+        # html.parser doesn't close tags that aren't closed in the
+        # markup, so skipping the contents of an unclosed tag would
+        # lose the rest of the document. The contents of rejected tags
+        # are considered one by one instead.
+        filter = SkippingFilter()
+        markup = "<skip><allow>1</allow><div><allow>2</allow>"
+        soup = BeautifulSoup(markup, "html.parser", parse_only=filter)
+        assert False is soup.builder.closes_every_tag
+        assert "<allow>1</allow><allow>2</allow>" == soup.decode()
+        assert filter.seen.count("allow") == 2
+
 
 class TestMatchRule(SoupTest):
     def _tuple(
@@ -460,6 +581,8 @@ class TestSoupStrainer(SoupTest):
         tag = Tag(prefix=prefix, name=name, attrs=attrs)
         if string:
             tag.string = string
+        # The compiled version of the strainer must always agree.
+        assert strainer.compile()(tag) == strainer.matches_tag(tag)
         return strainer.matches_tag(tag) and strainer.allow_tag_creation(
             prefix, name, attrs
         )
@@ -576,6 +699,41 @@ class TestSoupStrainer(SoupTest):
             string=["Wrong string", "Also wrong", re.compile("string")],
         ).matches_tag(tag)
 
+    def test_skip_contents_of(self):
+        strainer = SoupStrainer("a", skip_contents_of=["head", "x:skip"])
+        assert strainer.skip_contents_of == frozenset(["head", "x:skip"])
+        assert False is strainer.allow_descendant_creation(None, "head", {})
+        assert False is strainer.allow_descendant_creation("x", "skip", {})
+        assert True is strainer.allow_descendant_creation(None, "skip", {})
+        assert True is strainer.allow_descendant_creation(None, "body", {})
+
+        assert SoupStrainer(skip_contents_of="head").skip_contents_of == {"head"}
+
+        # By default, nothing is skipped, and the argument isn't
+        # mistaken for an attribute restriction.
+        strainer = SoupStrainer("a")
+        assert strainer.skip_contents_of == frozenset()
+        assert True is strainer.allow_descendant_creation(None, "head", {})
+        assert "skip_contents_of" not in SoupStrainer(
+            skip_contents_of="head"
+        ).attribute_rules
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml is not installed")
+    def test_parse_only_skip_contents_of(self):
+        markup = (
+            "<html><head><template><a>1</a></template></head>"
+            "<body><a>2</a><div><a>3</a></div></body></html>"
+        )
+        strainer = SoupStrainer("a", skip_contents_of="head")
+        soup = BeautifulSoup(markup, "lxml", parse_only=strainer)
+        assert "<a>2</a><a>3</a>" == soup.decode()
+        assert 0 == soup._skip_depth
+
+        # html.parser can't skip, but gets the same answer when the
+        # markup is balanced.
+        soup = BeautifulSoup(markup, "html.parser", parse_only=strainer)
+        assert "<a>1</a><a>2</a><a>3</a>" == soup.decode()
+
     def test_allowing_tag_implies_allowing_its_contents(self):
         markup = "<a><b>one string<div>another string</div></b></a>"
 
@@ -655,3 +813,117 @@ and they lived at the bottom of a well.</p>
         )
         string_soup = self.soup(html_doc, parse_only=only_short_strings)
         assert "\n\n\nElsie,\nLacie and\nTillie\n...\n" == string_soup.decode()
+
+
+class TestSoupStrainerCompile(SoupTest):
+    MARKUP = (
+        '<doc xmlns:ns="http://example.com/">'
+        '<a id="1" class="main big">one</a>'
+        '<b class="main">two<i>three</i></b>'
+        "<ns:a data='x'>four</ns:a>"
+        '<c id="">five</c><d class="">six</d>'
+        "text<!--comment--></doc>"
+    )
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(),
+            dict(name="a"),
+            dict(name="ns:a"),
+            dict(name=["b", "c", "nonexistent"]),
+            dict(name=re.compile("^[ab]$")),
+            dict(name=["c", re.compile("^n")]),
+            dict(name=True),
+            dict(name=False),
+            dict(name=[True, False]),
+            dict(class_="main"),
+            dict(class_="main big"),
+            dict(class_=["big", "small"]),
+            dict(class_=re.compile("^b")),
+            dict(class_=""),
+            dict(class_=True),
+            dict(id=False),
+            dict(id=[False, "1"]),
+            dict(id=None),
+            dict(name="a", id="1"),
+            dict(name="a", data=True),
+            dict(attrs={"class": ["main"], "id": "1"}),
+            dict(name="b", string="two"),
+            dict(name=re.compile("."), string=re.compile("^t")),
+            dict(string="two"),
+            dict(string=["text", "four"]),
+            dict(string=re.compile("o")),
+            dict(string=True),
+        ],
+    )
+    def test_compiled_strainer_agrees_with_match(self, kwargs):
+        for features in ("html.parser", "xml"):
+            try:
+                soup = self.soup(self.MARKUP, features=features)
+            except Exception:
+                continue
+            strainer = SoupStrainer(**kwargs)
+            compiled = strainer.compile()
+            for element in soup.descendants:
+                assert compiled(element) == strainer.match(element), element
+
+    def test_compiled_functions_called_in_order(self):
+        calls = []
+
+        def f1(value):
+            calls.append(("f1", value))
+            return False
+
+        def f2(value):
+            calls.append(("f2", value))
+            return value == "b"
+
+        soup = self.soup('<a class="x">text</a><b class="y"></b>')
+        strainer = SoupStrainer(name=[f1, "c", f2])
+        compiled = strainer.compile()
+        assert compiled(soup.a) is False
+        assert compiled(soup.b) is False
+        expect = calls[:]
+        calls[:] = []
+        assert strainer.match(soup.a) is False
+        assert strainer.match(soup.b) is False
+        assert calls == expect
+
+        calls[:] = []
+        strainer = SoupStrainer(class_=[f1, "y", f2])
+        compiled = strainer.compile()
+        assert [compiled(t) for t in (soup.a, soup.b)] == [False, True]
+        assert calls == [("f1", "x"), ("f2", "x"), ("f1", "y")]
+
+    def test_compile_respects_subclass(self):
+        class OnlyB(SoupStrainer):
+            def matches_tag(self, tag):
+                return tag.name == "b"
+
+        soup = self.soup("<a>1</a><b>2</b>")
+        strainer = OnlyB("a")
+        assert strainer.compile() == strainer.match
+        assert [tag.name for tag in soup.find_all(strainer)] == ["b"]
+
+    def test_compile_reflects_rules_at_compile_time(self):
+        soup = self.soup("<a>1</a><b>2</b>")
+        strainer = SoupStrainer("a")
+        compiled = strainer.compile()
+        strainer.name_rules = [TagNameMatchRule(string="b")]
+        assert compiled(soup.a) is True
+        assert strainer.compile()(soup.a) is False
+        assert strainer.compile()(soup.b) is True
+
+    def test_find_all_uses_compiled_strainer(self):
+        compiled_calls = []
+
+        class Counting(SoupStrainer):
+            def compile(self):
+                compiled_calls.append(self)
+                return super().compile()
+
+        soup = self.soup("<a>1</a><b>2</b><a>3</a>")
+        strainer = Counting("a")
+        assert [x.string for x in soup.find_all(strainer)] == ["1", "3"]
+        assert compiled_calls == [strainer]
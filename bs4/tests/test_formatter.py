@@ -49,6 +49,28 @@ class TestFormatter(SoupTest):
         assert formatter.called_with == soup.p
         assert '<p aval="2" cval="1"></p>' == decoded
 
+    def test_sort_attributes_option(self):
+        markup = '<p cval="1" bval="" aval="2"></p>'
+        soup = self.soup(markup)
+        for cls in (Formatter, HTMLFormatter, XMLFormatter):
+            assert cls().sort_attributes is True
+            formatter = cls(sort_attributes=False)
+            assert formatter.sort_attributes is False
+            assert list(formatter.attributes(soup.p)) == [
+                ("cval", "1"),
+                ("bval", ""),
+                ("aval", "2"),
+            ]
+            assert soup.p.decode(formatter=formatter) == markup
+
+        # The option works alongside empty_attributes_are_booleans.
+        formatter = HTMLFormatter(
+            sort_attributes=False, empty_attributes_are_booleans=True
+        )
+        assert soup.p.decode(formatter=formatter) == '<p cval="1" bval aval="2"></p>'
+        formatter = HTMLFormatter(empty_attributes_are_booleans=True)
+        assert soup.p.decode(formatter=formatter) == '<p aval="2" bval cval="1"></p>'
+
     def test_empty_attributes_are_booleans(self):
         # Test the behavior of empty_attributes_are_booleans as well
         # as which Formatters have it enabled.
@@ -131,6 +153,23 @@ class TestFormatter(SoupTest):
         assert HTMLFormatter.REGISTRY["html5"].substitute(s) == expect_html5
         assert HTMLFormatter.REGISTRY["html5-4.12"].substitute(s) == expect_html
 
+    def test_cdata_containing_tags_not_substituted(self):
+        soup = self.soup("<script>a < b && c</script><p>a &lt; b</p>")
+        script = soup.script.string
+        p = soup.p.string
+        for name in ("minimal", "html", "html5"):
+            formatter = HTMLFormatter.REGISTRY[name]
+            assert formatter.substitute(script) == "a < b && c"
+            assert formatter.substitute(p) == "a &lt; b"
+
+        # XML has no CDATA-containing tags.
+        assert XMLFormatter.REGISTRY["minimal"].substitute(script) == (
+            "a &lt; b &amp;&amp; c"
+        )
+
+        # A string that isn't part of a tree is always substituted.
+        assert HTMLFormatter.REGISTRY["minimal"].substitute("a < b") == "a &lt; b"
+
     def test_entity_round_trip(self):
         # This is more an explanatory test and a way to avoid regressions than a test of functionality.
 
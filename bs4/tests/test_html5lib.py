@@ -4,6 +4,7 @@ import pytest
 import warnings
 
 from bs4 import BeautifulSoup
+from bs4.element import NavigableString
 from bs4.filter import SoupStrainer
 from . import (
     HTML5LIB_PRESENT,
@@ -262,3 +263,47 @@ class TestHTML5LibBuilder(HTML5TreeBuilderSmokeTest):
         # Since the html5lib parser doesn't support parse_only, this standard
         # smoke-test test can't be run.
         pass
+
+    def test_adjacent_strings_are_combined(self):
+        # html5lib sends each "a" as a separate string, and they all
+        # end up in the same tag.
+        soup = self.soup("a</a>" * 100 + "<b>b</b>" + "c</a>" * 3 + "<!--d-->e</a>e")
+        body = soup.body
+        assert ["a" * 100, "<b>b</b>", "ccc", "d", "ee"] == [
+            str(x) for x in body.contents
+        ]
+        assert [body.b, body.b.string] == list(body.contents[0].next_elements)[:2]
+        assert soup._most_recent_element is body.contents[-1]
+        self.linkage_validator(soup)
+
+    def test_foster_parenting_into_earlier_element(self):
+        # The second <b> tag is created and given a child after the
+        # first <table> has been parsed, so it has to be linked into
+        # the middle of the document.
+        markup = "<div>" + "<table><b>x<tr><td>y</b>z</table>" * 2 + "</div>"
+        soup = self.soup(markup)
+        assert (
+            "<div><b>x</b><table><tbody><tr><td>yz</td></tr></tbody></table>"
+            "<b><b>x</b></b><table><tbody><tr><td>yz</td></tr></tbody></table></div>"
+            == soup.div.decode()
+        )
+        self.linkage_validator(soup)
+        inner_b = soup.find_all("b")[2]
+        assert inner_b.previous_element is inner_b.parent
+        assert inner_b.next_element == "x"
+        assert inner_b.next_element.next_element.name == "table"
+
+    def test_misnested_markup_mixed_with_well_formed_markup(self):
+        # html5lib has to move some of this document around, and
+        # the rest of it goes straight onto the end of the tree.
+        markup = "<p>a <b>b</b>\n <i>c<p>d</i>e</p><table>f<tr><td>g</table>h <!--i-->\n<pre>\nj</pre>"
+        soup = self.soup(markup)
+        assert (
+            "<body><p>a <b>b</b>\n <i>c</i></p><p><i>d</i>e</p>f<table><tbody><tr><td>g</td></tr></tbody></table>h <!--i-->\n<pre>j</pre></body>"
+            == soup.body.decode()
+        )
+        self.linkage_validator(soup)
+        assert soup._most_recent_element is soup.pre.string
+        assert soup.next_element is soup.html
+        assert soup.html.previous_element is soup
+        assert all(type(x) is NavigableString for x in soup.body.strings)
@@ -0,0 +1,274 @@
+"""Tests of the incremental (chunk-at-a-time) parsing API."""
+
+import io
+import pytest
+import warnings
+
+from bs4 import (
+    BeautifulSoup,
+    XMLParsedAsHTMLWarning,
+)
+from bs4.filter import SoupStrainer
+from bs4.incremental import IncrementalParser
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
+    SoupTest,
+)
+
+FEATURES = ["html.parser"]
+if LXML_PRESENT:
+    FEATURES.extend(["lxml", "lxml-xml"])
+if HTML5LIB_PRESENT:
+    FEATURES.append("html5lib")
+
+DOCUMENT = (
+    '<html><head><meta charset="utf-8"><title>Caf\N{LATIN SMALL LETTER E WITH ACUTE}</title></head>'
+    '<body><p class="a b">Hello &amp; goodbye<br>\N{SNOWMAN}</p>'
+    "<table><tr><td>1</td><td>2</td></tr></table><!--comment--></body></html>"
+)
+
+
+def feed_in_chunks(parser, markup, size):
+    for i in range(0, len(markup), size):
+        parser.feed(markup[i : i + size])
+    return parser.close()
+
+
+class TestIncrementalParser(SoupTest):
+    @pytest.mark.parametrize("features", FEATURES)
+    @pytest.mark.parametrize("size", [1, 7, 100000])
+    def test_bytes_in_chunks_match_one_shot_parse(self, features, size):
+        markup = DOCUMENT.encode("utf8")
+        expect = BeautifulSoup(markup, features)
+        parser = BeautifulSoup.incremental(features=features)
+        assert isinstance(parser, IncrementalParser)
+        soup = feed_in_chunks(parser, markup, size)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding == expect.original_encoding
+        assert parser.closed
+        self.linkage_validator(soup)
+
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_unicode_in_chunks_match_one_shot_parse(self, features):
+        expect = BeautifulSoup(DOCUMENT, features)
+        soup = feed_in_chunks(BeautifulSoup.incremental(features), DOCUMENT, 5)
+        assert soup.decode() == expect.decode()
+        assert soup.original_encoding is None
+
+    def test_tree_is_built_as_chunks_arrive(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.feed("<ul><li>one</li>")
+        assert parser.soup.li.string == "one"
+        parser.feed("<li>two</li></ul>")
+        assert [x.string for x in parser.soup.find_all("li")] == ["one", "two"]
+        parser.close()
+
+    def test_bytes_are_buffered_until_encoding_is_known(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.ENCODING_SNIFF_SIZE = 10
+        parser.feed(b"<p>")
+        assert parser.soup.p is None
+        parser.feed(b"text</p><b>")
+        assert parser.soup.p.string == "text"
+        soup = parser.close()
+        assert soup.decode() == "<p>text</p><b></b>"
+
+    def test_multibyte_character_split_across_chunks(self):
+        snowman = "\N{SNOWMAN}".encode("utf8")
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.ENCODING_SNIFF_SIZE = 1
+        parser.feed(b"<p>" + snowman[:1])
+        parser.feed(snowman[1:2])
+        parser.feed(snowman[2:] + b"</p>")
+        soup = parser.close()
+        assert soup.p.string == "\N{SNOWMAN}"
+        assert soup.contains_replacement_characters is False
+
+    def test_encoding_detected_from_sample(self):
+        markup = "<p>\N{LATIN SMALL LETTER E WITH ACUTE}t\N{LATIN SMALL LETTER E WITH ACUTE}</p>"
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.feed(markup.encode("windows-1252"))
+        soup = parser.close()
+        assert soup.original_encoding == "windows-1252"
+        assert soup.p.string == "\N{LATIN SMALL LETTER E WITH ACUTE}t\N{LATIN SMALL LETTER E WITH ACUTE}"
+
+    def test_declared_encoding(self):
+        markup = '<meta charset="iso-8859-8"><p>\N{HEBREW LETTER ALEF}</p>'.encode(
+            "iso-8859-8"
+        )
+        soup = feed_in_chunks(BeautifulSoup.incremental("html.parser"), markup, 3)
+        assert soup.original_encoding == "iso-8859-8"
+        assert soup.declared_html_encoding == "iso-8859-8"
+        assert soup.p.string == "\N{HEBREW LETTER ALEF}"
+
+    def test_from_encoding(self):
+        markup = "<p>\N{HEBREW LETTER ALEF}</p>".encode("iso-8859-8")
+        parser = BeautifulSoup.incremental("html.parser", from_encoding="iso-8859-8")
+        parser.feed(markup)
+        soup = parser.close()
+        assert soup.original_encoding == "iso-8859-8"
+        assert soup.p.string == "\N{HEBREW LETTER ALEF}"
+
+    def test_byte_order_mark_is_removed(self):
+        markup = "\N{BYTE ORDER MARK}<p>\N{SNOWMAN}</p>".encode("utf-16le")
+        soup = feed_in_chunks(BeautifulSoup.incremental("html.parser"), markup, 3)
+        assert soup.original_encoding == "utf-16le"
+        assert soup.decode() == "<p>\N{SNOWMAN}</p>"
+
+    def test_undecodable_bytes_after_sample_are_replaced(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.ENCODING_SNIFF_SIZE = 1
+        parser.feed("<p>\N{SNOWMAN}".encode("utf8"))
+        parser.feed(b"\xff</p>")
+        soup = parser.close()
+        assert soup.original_encoding == "utf-8"
+        assert soup.p.string == "\N{SNOWMAN}\N{REPLACEMENT CHARACTER}"
+        assert soup.contains_replacement_characters is True
+
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_empty_document(self, features):
+        soup = BeautifulSoup.incremental(features).close()
+        assert soup.decode() == BeautifulSoup("", features).decode()
+
+    def test_parse_only(self):
+        strainer = SoupStrainer("b")
+        parser = BeautifulSoup.incremental("html.parser", parse_only=strainer)
+        soup = feed_in_chunks(parser, b"<a>1</a><b>2</b><c>3</c><b>4</b>", 4)
+        assert soup.decode() == "<b>2</b><b>4</b>"
+
+    def test_feed_after_close(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        soup = parser.close()
+        assert parser.close() is soup
+        with pytest.raises(ValueError):
+            parser.feed(b"<p>")
+
+    def test_chunk_types_cannot_be_mixed(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.feed(b"<p>")
+        with pytest.raises(TypeError):
+            parser.feed("</p>")
+        with pytest.raises(TypeError):
+            parser.feed(1)
+
+    def test_bytearray_and_memoryview_chunks(self):
+        parser = BeautifulSoup.incremental("html.parser")
+        parser.feed(bytearray(b"<p>a"))
+        parser.feed(memoryview(b"b</p>"))
+        assert parser.close().p.string == "ab"
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_xml_parsed_as_html_warning(self):
+        parser = BeautifulSoup.incremental("lxml")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            parser.feed('<?xml version="1.0"?><root/>')
+        [warning] = w
+        assert isinstance(warning.message, XMLParsedAsHTMLWarning)
+        assert warning.filename == __file__
+        parser.close()
+
+    @pytest.mark.skipif(not HTML5LIB_PRESENT, reason="html5lib not installed")
+    def test_unsupported_builder_parses_at_close(self):
+        parser = BeautifulSoup.incremental("html5lib")
+        assert not parser.soup.builder.supports_incremental_feed
+        parser.feed(b"<p>one")
+        assert parser.soup.p is None
+        soup = parser.close()
+        assert soup is parser.soup
+        assert soup.p.string == "one"
+
+
+ITEMS = (
+    b"<rss><channel><title>Feed</title>"
+    + b"".join(
+        b"<item><title>%d</title><link>http://example.com/%d</link></item>" % (i, i)
+        for i in range(20)
+    )
+    + b"</channel></rss>"
+)
+
+
+class TestIterparse(SoupTest):
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_matching_tags_yielded_and_detached(self, features):
+        seen = []
+        for item in BeautifulSoup.iterparse(
+            ITEMS, SoupStrainer("item"), features=features, chunk_size=16
+        ):
+            assert item.name == "item"
+            assert item.parent is None
+            assert item.previous_element is None
+            assert item._last_descendant().next_element is None
+            assert item.next_sibling is None and item.previous_sibling is None
+            seen.append(item.title.string)
+        assert seen == [str(i) for i in range(20)]
+
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_remaining_tree_is_consistent(self, features):
+        parser = BeautifulSoup.incremental(features, match=SoupStrainer("item"))
+        parser.feed(ITEMS)
+        soup = parser.close()
+        assert len(list(parser.read_tags())) == 20
+        assert list(parser.read_tags()) == []
+        assert soup.find("item") is None
+        assert soup.channel.title.string == "Feed"
+        self.linkage_validator(soup)
+
+    def test_tags_available_as_soon_as_closed(self):
+        parser = BeautifulSoup.incremental("html.parser", match=SoupStrainer("tr"))
+        parser.feed("<table><tr><td>1</td></tr><tr><td>")
+        [tr] = parser.read_tags()
+        assert tr.td.string == "1"
+        assert list(parser.read_tags()) == []
+        parser.feed("2</td></tr></table>")
+        [tr] = parser.read_tags()
+        assert tr.td.string == "2"
+        soup = parser.close()
+        assert soup.decode() == "<table></table>"
+
+    def test_elements_parsed_after_a_match_are_linked_correctly(self):
+        parser = BeautifulSoup.incremental("html.parser", match=SoupStrainer("b"))
+        parser.feed("<p>before<b>bold</b>after<i>italic</i></p>")
+        soup = parser.close()
+        assert soup.decode() == "<p>beforeafter<i>italic</i></p>"
+        before = soup.p.contents[0]
+        assert before.next_element == "after"
+        assert before.next_element.previous_element is before
+        self.linkage_validator(soup)
+
+    def test_nested_matches(self):
+        markup = "<div id='outer'><div id='inner'></div></div>"
+        ids = [
+            tag["id"]
+            for tag in BeautifulSoup.iterparse(markup, SoupStrainer("div"), "html.parser")
+        ]
+        assert ids == ["inner", "outer"]
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_css_selector(self):
+        markup = "<ul><li class='x'>1</li><li>2</li><li class='x'>3</li></ul>"
+        strings = [
+            tag.string
+            for tag in BeautifulSoup.iterparse(markup, "ul > li.x", "html.parser")
+        ]
+        assert strings == ["1", "3"]
+
+    def test_filehandle_and_iterable_sources(self):
+        markup = b"<p>1</p><p>2</p>"
+        expect = ["1", "2"]
+        for source in (io.BytesIO(markup), [markup[:5], markup[5:]]):
+            found = [
+                p.string
+                for p in BeautifulSoup.iterparse(
+                    source, SoupStrainer("p"), "html.parser", chunk_size=3
+                )
+            ]
+            assert found == expect
+
+    def test_invalid_match(self):
+        with pytest.raises(TypeError):
+            BeautifulSoup.incremental("html.parser", match=1)
@@ -0,0 +1,448 @@
+"""Tests of the optional search index on BeautifulSoup objects."""
+
+import copy
+import pickle
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.element import AttributeValueList
+from bs4.filter import SoupReplacer, SoupStrainer
+from bs4._index import TreeIndex
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+    SoupTest,
+)
+
+FEATURES = ["html.parser"]
+if LXML_PRESENT:
+    FEATURES.append("lxml")
+if HTML5LIB_PRESENT:
+    FEATURES.append("html5lib")
+
+DOCUMENT = (
+    "<html><head><title>t</title></head><body>"
+    '<table><tr><td id="1">1</td><td>2</td></tr>'
+    '<tr><td class="x">3</td><td><a href="a">4</a></td></tr></table>'
+    "<p><b>bold</b><a>no href</a></p><p>another <b>bold</b></p>"
+    "</body></html>"
+)
+
+
+class TestTreeIndex(SoupTest):
+    def assert_consistent(self, soup):
+        """Make sure the index gives the same answers as a full traversal."""
+        names = set(tag.name for tag in soup.find_all(True))
+        index = soup._tree_index
+        for name in names:
+            expect = [x for x in soup.descendants if x.name == name]
+            assert index.tags_named([name]) == expect
+            assert soup.find_all(name) == expect
+
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_results_match_unindexed_search(self, features):
+        indexed = BeautifulSoup(DOCUMENT, features, index_tag_names=True)
+        plain = BeautifulSoup(DOCUMENT, features)
+        assert isinstance(indexed._tree_index, TreeIndex)
+        assert plain._tree_index is None
+        for args, kwargs in [
+            (("td",), {}),
+            (("a",), dict(href=True)),
+            ((["b", "td"],), {}),
+            (("td",), dict(class_="x")),
+            (("b",), dict(string="bold")),
+            (("nosuchtag",), {}),
+            ((SoupStrainer("p"),), {}),
+        ]:
+            assert indexed.find_all(*args, **kwargs) == plain.find_all(*args, **kwargs)
+        assert indexed.find("td", id="1").string == "1"
+        assert indexed.find_all("td", limit=2) == plain.find_all("td", limit=2)
+        self.assert_consistent(indexed)
+
+    def test_index_is_used(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        first_b = soup.b
+        # Remove a tag from the index without touching the tree. A
+        # search that uses the index won't find it.
+        soup._tree_index.removed(first_b)
+        assert len(soup.find_all("b")) == 1
+        # Searches that can't use the index still find it.
+        assert len(soup.find_all(lambda tag: tag.name == "b")) == 2
+        assert len(soup.body.find_all("b")) == 2
+        assert len(soup.find_all("b", recursive=False)) == 0
+
+    def test_search_from_subtag_does_not_use_index(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        assert [x.string for x in soup.p.find_all("b")] == ["bold"]
+
+    def test_append_at_end(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        new_p = soup.new_tag("p")
+        new_p.append(soup.new_tag("b"))
+        soup.body.append(new_p)
+        assert not soup._tree_index._stale
+        assert soup.find_all("p")[-1] is new_p
+        self.assert_consistent(soup)
+
+    def test_insert_in_middle(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        new_b = soup.new_tag("b")
+        soup.table.insert_before(new_b)
+        assert soup._tree_index._stale
+        assert soup.find_all("b")[0] is new_b
+        assert not soup._tree_index._stale
+        self.assert_consistent(soup)
+
+    def test_extract_and_decompose(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        tr = soup.tr.extract()
+        assert not soup._tree_index._stale
+        assert [x.string for x in soup.find_all("td")] == ["3", "4"]
+        soup.p.decompose()
+        assert len(soup.find_all("b")) == 1
+        assert soup.find_all("a") == [soup.table.a]
+        # The extracted tag is no longer part of an indexed tree.
+        assert tr._find_tree_index() is None
+        self.assert_consistent(soup)
+
+    def test_other_modifications(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        soup.find("td", id="1").replace_with(soup.new_tag("th"))
+        soup.a.wrap(soup.new_tag("i"))
+        soup.p.unwrap()
+        soup.find_all("tr")[1].clear()
+        soup.title.string = "new title"
+        self.assert_consistent(soup)
+
+    def test_move_within_tree(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        soup.body.append(soup.table)
+        self.assert_consistent(soup)
+        soup.head.append(soup.find_all("p")[1])
+        self.assert_consistent(soup)
+
+    def test_renamed_tag(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        soup.title.name = "h1"
+        assert soup.find_all("title") == []
+        assert [x.string for x in soup.find_all("h1")] == ["t"]
+        assert not soup._tree_index._stale
+        self.assert_consistent(soup)
+
+    def test_renamed_tag_keeps_document_order(self):
+        soup = self.soup("<b>1</b><b>2</b><i>3</i><b>4</b>", index_tag_names=True)
+        soup.find_all("b")[1].name = "i"
+        assert [x.string for x in soup.find_all("b")] == ["1", "4"]
+        assert [x.string for x in soup.find_all("i")] == ["2", "3"]
+        soup.b.name = "i"
+        assert [x.string for x in soup.find_all("i")] == ["1", "2", "3"]
+        self.assert_consistent(soup)
+
+    def test_extract_renamed_tag(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        title = soup.title
+        title.name = "h1"
+        title.extract()
+        assert not soup._tree_index._stale
+        assert soup.find_all("title") == []
+        assert soup.find_all("h1") == []
+        self.assert_consistent(soup)
+
+    def test_rename_before_indexing(self):
+        # A tag can be renamed while it's being created, before it's
+        # added to the index.
+        replacer = SoupReplacer("b", "i")
+        soup = self.soup("<p><b>1</b></p>", index_tag_names=True, replacer=replacer)
+        assert soup.find_all("b") == []
+        assert len(soup.find_all("i")) == 1
+        self.assert_consistent(soup)
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_prefixed_names(self):
+        markup = '<root xmlns:ns="http://example.com/"><ns:tag>1</ns:tag><tag>2</tag></root>'
+        soup = BeautifulSoup(markup, "xml", index_tag_names=True)
+        plain = BeautifulSoup(markup, "xml")
+        assert soup.find_all("ns:tag") == plain.find_all("ns:tag")
+        assert [x.string for x in soup.find_all("ns:tag")] == ["1"]
+        assert soup.find_all("tag") == plain.find_all("tag")
+
+    def test_copy_and_pickle(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True)
+        for clone in (copy.copy(soup), pickle.loads(pickle.dumps(soup))):
+            assert clone._tree_index is not None
+            assert clone._tree_index is not soup._tree_index
+            assert clone.find_all("td") == soup.find_all("td")
+            self.assert_consistent(clone)
+
+    def test_indexable_tag_names(self):
+        assert SoupStrainer("a")._indexable_tag_names() == {"a"}
+        assert SoupStrainer(["a", "b"])._indexable_tag_names() == {"a", "b"}
+        assert SoupStrainer("ns:a")._indexable_tag_names() == {"ns:a", "a"}
+        assert SoupStrainer(href=True)._indexable_tag_names() is None
+        assert SoupStrainer(["a", lambda x: True])._indexable_tag_names() is None
+        assert SoupStrainer(string="a")._indexable_tag_names() is None
+
+
+class TestAttributeIndex(SoupTest):
+    def assert_consistent(self, soup):
+        """Make sure the attribute index gives the same answers as a
+        full traversal.
+        """
+        index = soup._tree_index
+        for attribute in index.INDEXED_ATTRIBUTES:
+            values = set()
+            for tag in soup.find_all(True):
+                value = tag.get(attribute)
+                if isinstance(value, list):
+                    values.update(value)
+                    values.add(" ".join(value))
+                elif value is not None:
+                    values.add(value)
+            for value in values:
+                strainer = SoupStrainer(attrs={attribute: value})
+                expect = list(strainer.filter(soup.descendants))
+                assert index.tags_with_attribute(attribute, [value]) == expect
+                assert soup.find_all(attrs={attribute: value}) == expect
+
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_results_match_unindexed_search(self, features):
+        indexed = BeautifulSoup(DOCUMENT, features, index_attributes=True)
+        plain = BeautifulSoup(DOCUMENT, features)
+        assert indexed._tree_index.attributes
+        assert not indexed._tree_index.tag_names
+        for args, kwargs in [
+            ((), dict(id="1")),
+            (("td",), dict(id="1")),
+            (("td",), dict(class_="x")),
+            ((), dict(class_="x")),
+            ((), dict(attrs={"class": "x"})),
+            ((), dict(id=["1", "nosuchid"])),
+            ((), dict(id="nosuchid")),
+            ((), dict(id=True)),
+        ]:
+            assert indexed.find_all(*args, **kwargs) == plain.find_all(*args, **kwargs)
+        self.assert_consistent(indexed)
+
+    def test_get_element_by_id(self):
+        for index_attributes in (True, False):
+            soup = self.soup(DOCUMENT, index_attributes=index_attributes)
+            assert soup.get_element_by_id("1").string == "1"
+            assert soup.get_element_by_id("nosuchid") is None
+
+    def test_index_is_used(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        td = soup.get_element_by_id("1")
+        soup._tree_index.removed(td)
+        assert soup.get_element_by_id("1") is None
+        assert soup.body.find(id="1") is td
+
+    def test_multi_valued_attribute(self):
+        soup = self.soup(
+            '<p class="a b">1</p><p class="b">2</p><p class="a b c">3</p>',
+            index_attributes=True,
+        )
+        assert [x.string for x in soup.find_all(class_="b")] == ["1", "2", "3"]
+        assert [x.string for x in soup.find_all(class_="a b")] == ["1"]
+        assert [x.string for x in soup.find_all(class_=["c", "a"])] == ["1", "3"]
+        self.assert_consistent(soup)
+
+    def test_attribute_changes(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        td = soup.get_element_by_id("1")
+        td["id"] = "new"
+        assert soup.get_element_by_id("1") is None
+        assert soup.get_element_by_id("new") is td
+
+        del td["id"]
+        assert soup.get_element_by_id("new") is None
+
+        td.attrs["id"] = "direct"
+        assert soup.get_element_by_id("direct") is td
+        td.attrs.pop("id")
+        assert soup.get_element_by_id("direct") is None
+        td.attrs.update({"id": "updated", "class": ["y", "z"]})
+        assert soup.get_element_by_id("updated") is td
+        assert soup.find(class_="z") is td
+
+        td["class"] = "x"
+        assert soup.find_all(class_="x")[0] is td
+        assert not soup._tree_index._stale
+        self.assert_consistent(soup)
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda attrs: attrs.__setitem__("id", "new"),
+            lambda attrs: attrs.__delitem__("id"),
+            lambda attrs: attrs.pop("id"),
+            lambda attrs: attrs.popitem(),
+            lambda attrs: attrs.setdefault("class", ["new"]),
+            lambda attrs: attrs.setdefault("id", "ignored"),
+            lambda attrs: attrs.update(id="new"),
+            lambda attrs: attrs.__ior__({"id": "new", "class": "y"}),
+            lambda attrs: attrs.clear(),
+        ],
+    )
+    def test_every_mutator_is_tracked(self, modify):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        plain = self.soup(DOCUMENT)
+        modify(soup.get_element_by_id("1").attrs)
+        modify(plain.get_element_by_id("1").attrs)
+        assert not soup._tree_index._stale
+        for value in ("1", "new", "ignored"):
+            assert soup.find_all(id=value) == plain.find_all(id=value)
+        for value in ("x", "y", "new"):
+            assert soup.find_all(class_=value) == plain.find_all(class_=value)
+        self.assert_consistent(soup)
+
+    def test_attrs_replaced(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        td = soup.get_element_by_id("1")
+        old_attrs = td.attrs
+        td.attrs = type(old_attrs)(id="replaced")
+        assert soup.get_element_by_id("1") is None
+        assert soup.get_element_by_id("replaced") is td
+
+        # The old dictionary isn't part of the tree anymore; the new
+        # one is.
+        old_attrs["id"] = "old"
+        assert soup.get_element_by_id("old") is None
+        td.attrs["id"] = "changed"
+        assert soup.get_element_by_id("changed") is td
+
+        # A plain dictionary is indexed when it replaces the old one,
+        # but changes to it aren't tracked.
+        td.attrs = {"class": ["z"]}
+        assert soup.find(class_="z") is td
+        assert soup.get_element_by_id("changed") is None
+        self.assert_consistent(soup)
+
+    def test_copied_attrs_not_tracked(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        td = soup.get_element_by_id("1")
+        for attrs in (copy.copy(td.attrs), pickle.loads(pickle.dumps(td.attrs))):
+            assert attrs == td.attrs
+            assert type(attrs) is type(td.attrs)
+            assert getattr(attrs, "_tag", None) is None
+            attrs["id"] = "copy"
+            assert soup.get_element_by_id("copy") is None
+            assert soup.get_element_by_id("1") is td
+
+        td = soup.find(class_="x")
+        for values in (copy.copy(td["class"]), pickle.loads(pickle.dumps(td["class"]))):
+            assert values == td["class"]
+            assert getattr(values, "_owner", None) is None
+            values.append("copy")
+            assert soup.find(class_="copy") is None
+
+    def test_one_notification_per_change(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        td = soup.get_element_by_id("1")
+        version = soup._version
+        td["id"] = "new"
+        assert soup._version == version + 1
+        del td["id"]
+        assert soup._version == version + 2
+
+    def test_attributes_of_inserted_tags(self):
+        soup = self.soup(DOCUMENT, index_attributes=True)
+        new_tag = soup.new_tag("div", id="new")
+        soup.body.append(new_tag)
+        assert soup.get_element_by_id("new") is new_tag
+        new_tag["id"] = "changed"
+        assert soup.get_element_by_id("changed") is new_tag
+
+        new_tag.extract()
+        assert soup.get_element_by_id("changed") is None
+        # Once the tag is out of the tree, changing its attributes
+        # doesn't affect the index.
+        new_tag["id"] = "1"
+        assert soup.get_element_by_id("1") is not new_tag
+        self.assert_consistent(soup)
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda values: values.append("c"),
+            lambda values: values.extend(["c", "d"]),
+            lambda values: values.insert(0, "c"),
+            lambda values: values.remove("a"),
+            lambda values: values.pop(),
+            lambda values: values.clear(),
+            lambda values: values.sort(reverse=True),
+            lambda values: values.reverse(),
+            lambda values: values.__setitem__(0, "c"),
+            lambda values: values.__setitem__(slice(0, 1), ["c", "d"]),
+            lambda values: values.__delitem__(0),
+            lambda values: values.__iadd__(["c"]),
+            lambda values: values.__imul__(2),
+        ],
+    )
+    def test_multi_valued_attribute_modified_in_place(self, modify):
+        markup = '<p class="a b">1</p><p class="b">2</p>'
+        soup = self.soup(markup, index_attributes=True)
+        plain = self.soup(markup)
+        modify(soup.p["class"])
+        modify(plain.p["class"])
+        assert not soup._tree_index._stale
+        for value in ("a", "b", "c", "d", "a b", "b a", "c a b"):
+            assert soup.find_all(class_=value) == plain.find_all(class_=value)
+        self.assert_consistent(soup)
+
+    def test_multi_valued_attribute_added_later(self):
+        soup = self.soup('<p>1</p><p class="b">2</p>', index_attributes=True)
+        p = soup.p
+        p["class"] = p.get_attribute_list("class")
+        p["class"].append("b")
+        assert soup.find_all(class_="b") == [p, soup.find_all("p")[1]]
+        p.attrs.update({"class": AttributeValueList(["c"])})
+        p["class"].append("d")
+        assert soup.find_all(class_="d") == [p]
+        self.assert_consistent(soup)
+
+    def test_multi_valued_attribute_removed_from_tree(self):
+        soup = self.soup('<p class="a b">1</p><p class="b">2</p>', index_attributes=True)
+        p = soup.p
+        classes = p["class"]
+        p.extract()
+        classes.remove("b")
+        assert [x.string for x in soup.find_all(class_="b")] == ["2"]
+
+        # A list that's no longer a value of the dictionary doesn't
+        # affect the tag.
+        other = soup.p
+        other_classes = other["class"]
+        other["class"] = "c"
+        other_classes.append("d")
+        assert soup.find_all(class_="d") == []
+        assert soup.find_all(class_="c") == [other]
+        self.assert_consistent(soup)
+
+    def test_document_order(self):
+        soup = self.soup('<a id="x">1</a><b>2</b><c>3</c>', index_attributes=True)
+        soup.c["id"] = "x"
+        soup.b["id"] = "x"
+        assert [x.string for x in soup.find_all(id="x")] == ["1", "2", "3"]
+        soup.a["id"] = "y"
+        assert soup.get_element_by_id("x") is soup.b
+
+    def test_both_indexes(self):
+        soup = self.soup(DOCUMENT, index_tag_names=True, index_attributes=True)
+        plain = self.soup(DOCUMENT)
+        assert soup.find_all("td", class_="x") == plain.find_all("td", class_="x")
+        assert soup.find_all("a", id="1") == []
+        for clone in (copy.copy(soup), pickle.loads(pickle.dumps(soup))):
+            assert clone._tree_index.tag_names and clone._tree_index.attributes
+            assert clone.get_element_by_id("1").string == "1"
+
+    def test_indexable_attribute_values(self):
+        assert SoupStrainer(id="a")._indexable_attribute_values("id") == {"a"}
+        assert SoupStrainer(id=["a", "b"])._indexable_attribute_values("id") == {
+            "a",
+            "b",
+        }
+        assert SoupStrainer(class_="a")._indexable_attribute_values("class") == {"a"}
+        assert SoupStrainer("a")._indexable_attribute_values("id") is None
+        assert SoupStrainer(id=True)._indexable_attribute_values("id") is None
+        assert SoupStrainer(id=["a", True])._indexable_attribute_values("id") is None
@@ -77,6 +77,54 @@ class TestLXMLTreeBuilder(HTMLTreeBuilderSmokeTest):
         assert None is soup.p.sourceline
         assert None is soup.p.sourcepos
 
+    @pytest.mark.parametrize(
+        "encoding,bom",
+        [
+            ("utf-8", b"\xef\xbb\xbf"),
+            ("utf-16le", b"\xff\xfe"),
+            ("utf-16be", b"\xfe\xff"),
+            ("utf-32le", b"\xff\xfe\x00\x00"),
+        ],
+    )
+    def test_byte_order_mark_markup_is_not_copied(self, encoding, bom):
+        # lxml is given the original bytestring and the encoding
+        # implied by its byte-order mark. It's not converted to
+        # Unicode and back, and the byte-order mark isn't stripped by
+        # making a copy.
+        markup = bom + "<p>Caf\xe9 \N{SNOWMAN}</p>".encode(encoding)
+        builder = self.default_builder()
+        [(prepared, detected, declared, replaced), *rest] = builder.prepare_markup(
+            markup
+        )
+        assert prepared is markup
+        assert detected == encoding
+
+        soup = self.soup(markup)
+        assert soup.original_encoding == encoding
+        assert soup.p.string == "Caf\xe9 \N{SNOWMAN}"
+
+    def test_byte_order_mark_stripped_for_other_encodings(self):
+        markup = b"\xef\xbb\xbf<p>Caf\xc3\xa9</p>"
+        builder = self.default_builder()
+        [(prepared, encoding, declared, replaced)] = list(
+            builder.prepare_markup(markup, "windows-1252")
+        )[:1]
+        assert encoding == "windows-1252"
+        assert bytes(prepared) == markup[3:]
+        soup = self.soup(markup, from_encoding="windows-1252")
+        assert soup.p.string == "Caf\xc3\xa9"
+
+    def test_declared_encoding_markup_is_not_copied(self):
+        markup = '<meta charset="windows-1252"><p>Caf\xe9</p>'.encode(
+            "windows-1252"
+        )
+        builder = self.default_builder()
+        for prepared, encoding, declared, replaced in builder.prepare_markup(markup):
+            assert prepared is markup
+        soup = self.soup(markup)
+        assert soup.original_encoding == "windows-1252"
+        assert soup.p.string == "Caf\xe9"
+
 
 @pytest.mark.skipif(
     not LXML_PRESENT,
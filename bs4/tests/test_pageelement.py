@@ -1,6 +1,7 @@
 """Tests of the bs4.element.PageElement class"""
 
 import copy
+import io
 import pickle
 import pytest
 import sys
@@ -10,9 +11,12 @@ from bs4 import BeautifulSoup
 from bs4.element import (
     AttributeValueList,
     Comment,
+    NavigableString,
+    Tag,
 )
 from bs4.filter import SoupStrainer
 from . import (
+    LXML_PRESENT,
     SoupTest,
 )
 
@@ -61,6 +65,80 @@ class TestEncoding(SoupTest):
         encoded = soup.encode()
         assert limit == encoded.count(b"<span>")
 
+    def test_iter_encode(self):
+        html = "<div>" + "<b>\N{SNOWMAN}</b>" * 100 + '<br/><a href="x">y</a></div>'
+        soup = self.soup(html)
+        chunks = list(soup.div.iter_encode(chunk_size=50))
+        assert len(chunks) > 1
+        assert all(len(chunk) < 100 for chunk in chunks)
+        assert b"".join(chunks) == soup.div.encode()
+
+        # Error handling works the same way as in encode().
+        assert b"".join(soup.iter_encode("ascii")) == soup.encode("ascii")
+        with pytest.raises(UnicodeEncodeError):
+            list(soup.iter_encode("ascii", errors="strict"))
+
+    def test_iter_encode_stateful_encoding(self):
+        # A UTF-16 byte-order mark only shows up at the start of
+        # the output, not the start of each chunk.
+        soup = self.soup("<p>\N{SNOWMAN}</p>" * 100)
+        chunks = list(soup.iter_encode("utf-16", chunk_size=10))
+        assert len(chunks) > 1
+        assert b"".join(chunks) == soup.encode("utf-16")
+
+    def test_iter_encode_pretty_print(self):
+        soup = self.soup("<div><p>a</p><pre> b </pre></div>")
+        assert b"".join(soup.iter_encode(indent_level=0, chunk_size=1)) == (
+            soup.prettify("utf8")
+        )
+
+    def test_write_to(self):
+        soup = self.soup("<p>\N{SNOWMAN}</p>" * 100)
+        fp = io.BytesIO()
+        soup.write_to(fp, chunk_size=10)
+        assert fp.getvalue() == soup.encode()
+
+        fp = io.BytesIO()
+        soup.p.write_to(fp, "latin-1", formatter="html")
+        assert fp.getvalue() == b"<p>&#9731;</p>"
+
+        # With no encoding, Unicode strings are written.
+        fp = io.StringIO()
+        soup.write_to(fp, None, chunk_size=10)
+        assert fp.getvalue() == soup.decode()
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_write_to_xml_document(self):
+        soup = BeautifulSoup("<root><a>\N{SNOWMAN}</a></root>", "xml")
+        fp = io.BytesIO()
+        soup.write_to(fp, "utf-16")
+        assert fp.getvalue() == soup.encode("utf-16")
+        assert fp.getvalue().decode("utf-16").startswith(
+            '<?xml version="1.0" encoding="utf-16"?>'
+        )
+
+        # With no encoding, the output is the same as decode().
+        fp = io.StringIO()
+        soup.write_to(fp, None)
+        assert fp.getvalue() == soup.decode()
+        assert fp.getvalue().startswith('<?xml version="1.0" encoding="utf-8"?>')
+
+    def test_write_to_text_substitutes_meta_charset(self):
+        soup = self.soup(
+            '<html><head><meta charset="ISO-8859-1"></head><body>x</body></html>'
+        )
+        fp = io.StringIO()
+        soup.write_to(fp, None)
+        assert fp.getvalue() == soup.decode()
+        assert '<meta charset="utf-8"/>' in fp.getvalue()
+
+    def test_write_to_deeply_nested_document(self):
+        limit = sys.getrecursionlimit() + 1
+        soup = self.soup("<span>" * limit)
+        fp = io.BytesIO()
+        soup.write_to(fp)
+        assert fp.getvalue() == soup.encode()
+
     def test_deprecated_renderContents(self):
         html = "<b>\N{SNOWMAN}</b>"
         soup = self.soup(html)
@@ -349,6 +427,83 @@ class TestPersistence(SoupTest):
         loaded = pickle.loads(dumped)
         assert loaded.decode() == soup.decode()
 
+    def test_pickle_does_not_reparse(self):
+        # The parse tree is pickled as a flat structure, not as
+        # markup, so unpickling it doesn't involve the parser.
+        state = self.tree.__getstate__()
+        assert state["markup"] is None
+        assert state["contents"] == []
+        loaded = pickle.loads(pickle.dumps(self.tree))
+        assert loaded.decode() == self.tree.decode()
+        self.linkage_validator(loaded)
+        assert loaded._most_recent_element is loaded.find_all(string=True)[-1]
+
+    def test_pickle_preserves_element_details(self):
+        html = (
+            '<!DOCTYPE html><html><body><!--comment-->'
+            '<p class="a b" id="x" data-v="1">text<br/></p>'
+            "<script>var x = 1 < 2;</script><pre>  keep  </pre>"
+            "</body></html>"
+        )
+        soup = self.soup(html)
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert loaded.decode() == soup.decode()
+        assert [type(x) for x in loaded.descendants] == [
+            type(x) for x in soup.descendants
+        ]
+        assert loaded.p["class"] == ["a", "b"]
+        assert isinstance(loaded.p["class"], AttributeValueList)
+        assert type(loaded.p.attrs) is type(soup.p.attrs)
+        assert loaded.p.sourceline == soup.p.sourceline
+        assert loaded.p.sourcepos == soup.p.sourcepos
+        assert loaded.p.parser_class is BeautifulSoup
+        assert loaded.br.is_empty_element
+        assert loaded.pre.preserve_whitespace_tags == soup.pre.preserve_whitespace_tags
+
+        # The unpickled tree can be modified like any other tree.
+        loaded.p.append(loaded.new_tag("b"))
+        loaded.p["id"] = "y"
+        assert loaded.find(id="y").b is not None
+        self.linkage_validator(loaded)
+
+    def test_pickle_indexed_tree(self):
+        soup = self.soup(
+            '<div id="a"><p class="c">1</p><p class="c">2</p></div>',
+            index_attributes=True,
+        )
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert type(loaded.p) is type(soup.p)
+        assert loaded.decode() == soup.decode()
+        assert loaded.get_element_by_id("a") is loaded.div
+        assert loaded.find_all(class_="c") == soup.find_all(class_="c")
+        loaded.p["class"] = "d"
+        assert len(loaded.find_all(class_="c")) == 1
+
+    def test_unpickle_markup_state(self):
+        # Older versions of Beautiful Soup pickled a tree as its
+        # markup. That state can still be loaded.
+        state = self.tree.__getstate__()
+        del state["_structure"]
+        state["markup"] = self.tree.decode()
+        loaded = BeautifulSoup.__new__(BeautifulSoup)
+        loaded.__setstate__(state)
+        assert loaded.decode() == self.tree.decode()
+
+    def test_unpickle_tag_with_old_attribute_state(self):
+        # Older versions of Beautiful Soup kept a tag's name and
+        # attributes in "name" and "attrs" rather than "_name" and
+        # "_attrs".
+        tag = self.soup('<a href="x">y</a>').a
+        state = dict(tag.__dict__)
+        state["name"] = state.pop("_name")
+        state["attrs"] = state.pop("_attrs")
+        loaded = Tag.__new__(Tag)
+        loaded.__setstate__(state)
+        assert loaded.name == "a"
+        assert loaded.attrs == {"href": "x"}
+        assert loaded["href"] == "x"
+        assert loaded.attrs._tag is loaded
+
     def test_copy_navigablestring_is_not_attached_to_tree(self):
         html = "<b>Foo<a></a></b><b>Bar</b>"
         soup = self.soup(html)
@@ -403,6 +558,80 @@ class TestPersistence(SoupTest):
         assert "a b c".split() == div_copy["class"]
         assert isinstance(div_copy["class"], AttributeValueList)
 
+    def test_copy_is_fully_linked(self):
+        html = "<div><p>a<b>b</b>c</p><!--d--><p><i>e</i></p></div>f"
+        soup = self.soup(html)
+        for original in (soup, soup.div, soup.p):
+            clone = copy.copy(original)
+            assert clone.decode() == original.decode()
+            self.linkage_validator(clone)
+            assert [type(x) for x in clone.descendants] == [
+                type(x) for x in original.descendants
+            ]
+            assert not any(
+                x is y for x, y in zip(clone.descendants, original.descendants)
+            )
+
+    def test_copy_matches_copy_self(self):
+        # Descendants are copied without going through the Tag
+        # constructor, but they end up the same as if they'd been
+        # created with copy_self().
+        html = '<div><pre class="a"> x </pre><br/><p id="y">z</p></div>'
+        soup = self.soup(html)
+        clone = copy.copy(soup.div)
+        for original, copied in zip(soup.div.descendants, clone.descendants):
+            if original.name is None:
+                continue
+            expect = original.copy_self()
+            assert type(copied) is type(expect)
+            assert type(copied.attrs) is type(expect.attrs)
+            assert copied.attrs == expect.attrs
+            for attr in (
+                "parser_class",
+                "known_xml",
+                "can_be_empty_element",
+                "cdata_list_attributes",
+                "preserve_whitespace_tags",
+                "interesting_string_types",
+                "sourceline",
+                "sourcepos",
+                "_namespaces",
+            ):
+                assert getattr(copied, attr) == getattr(expect, attr)
+
+    def test_copy_uses_subclass_copy_logic(self):
+        class MyTag(Tag):
+            def copy_self(self):
+                clone = super().copy_self()
+                clone.copied_from = self
+                return clone
+
+        class MyString(NavigableString):
+            def __deepcopy__(self, memo, recursive=False):
+                clone = super().__deepcopy__(memo, recursive)
+                clone.copied_from = self
+                return clone
+
+        soup = self.soup(
+            "<div><p>a<b>b</b></p></div>",
+            element_classes={Tag: MyTag, NavigableString: MyString},
+        )
+        clone = copy.copy(soup.div)
+        assert clone.p.copied_from is soup.p
+        assert clone.b.string.copied_from is soup.b.string
+        self.linkage_validator(clone)
+
+    def test_copy_indexed_soup(self):
+        soup = self.soup(
+            '<div id="a"><p class="c">1</p></div>', index_attributes=True
+        )
+        clone = copy.copy(soup)
+        assert clone.get_element_by_id("a") is clone.div
+        assert clone.find_all(class_="c") == [clone.p]
+        clone.p["class"] = "d"
+        assert clone.find_all(class_="c") == []
+        assert soup.find_all(class_="c") == [soup.p]
+
 
 class TestEquality(SoupTest):
 
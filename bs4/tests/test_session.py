@@ -0,0 +1,185 @@
+"""Tests of ParserSession, which parses many documents with one tree builder."""
+
+import pickle
+import pytest
+import threading
+import warnings
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.exceptions import ParserRejectedMarkup
+from bs4.filter import SoupStrainer
+from bs4.session import (
+    ParserSession,
+    _session_for_fragments,
+)
+
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+    SoupTest,
+)
+
+FEATURES = ["html.parser"]
+if LXML_PRESENT:
+    FEATURES.extend(["lxml", "lxml-xml"])
+if HTML5LIB_PRESENT:
+    FEATURES.append("html5lib")
+
+FRAGMENTS = [
+    '<p class="a b">Hello &amp; goodbye<br></p>',
+    "<b>unclosed <i>tags",
+    "<script>if (a < b) {</script>",
+    "plain text",
+    "<table><tr><td>1</td></tr></table><!--comment-->",
+]
+
+
+class TestParserSession(SoupTest):
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_same_results_as_constructor(self, features):
+        session = BeautifulSoup.session(features)
+        assert isinstance(session, ParserSession)
+        for fragment in FRAGMENTS * 2:
+            soup = session.parse(fragment)
+            expect = BeautifulSoup(fragment, features)
+            assert soup.decode() == expect.decode()
+            assert soup.builder is session.builder
+            self.linkage_validator(soup)
+
+    def test_htmlparser_reuses_parser(self):
+        session = BeautifulSoup.session("html.parser")
+        assert session.builder.reuse_parser is True
+        session.parse("<p>a</p>")
+        parser = session.builder._idle_parser
+        assert parser is not None
+
+        # The parser doesn't keep the last document alive.
+        assert not hasattr(parser, "soup")
+
+        # An unfinished document doesn't affect the next one.
+        session.parse("<br><script>if (a < b")
+        assert session.builder._idle_parser is parser
+        markup = "</br><p>b</p>"
+        soup = session.parse(markup)
+        assert BeautifulSoup(markup, "html.parser").decode() == soup.decode()
+
+        # A builder that isn't used through a session makes a new
+        # parser every time.
+        builder = HTMLParserTreeBuilder()
+        BeautifulSoup("<p>a</p>", builder=builder)
+        assert builder._idle_parser is None
+
+    def test_document_settings_apply_to_every_document(self):
+        session = BeautifulSoup.session(
+            "html.parser",
+            parse_only=SoupStrainer("b"),
+            index_tag_names=True,
+        )
+        for i in range(2):
+            soup = session.parse("<p>a <b>b</b></p><b>c</b>")
+            assert "<b>b</b><b>c</b>" == soup.decode()
+            assert soup._tree_index is not None
+
+    def test_builder_settings(self):
+        session = BeautifulSoup.session("html.parser", multi_valued_attributes=None)
+        soup = session.parse('<p class="a b">')
+        assert "a b" == soup.p["class"]
+
+    def test_bytestring(self):
+        session = BeautifulSoup.session("html.parser")
+        soup = session.parse("<p>caf\xe9</p>".encode("latin-1"), from_encoding="latin-1")
+        assert "caf\xe9" == soup.p.string
+        assert "latin-1" == soup.original_encoding
+
+    def test_pickle(self):
+        session = BeautifulSoup.session("html.parser")
+        soup = session.parse("<p>a</p>")
+        session.parse("<p>b</p>")
+        copy = pickle.loads(pickle.dumps(soup))
+        assert "<p>a</p>" == copy.decode()
+
+
+class TestFragment(SoupTest):
+    @pytest.mark.parametrize("features", FEATURES)
+    def test_same_results_as_constructor(self, features):
+        session = BeautifulSoup.session(features)
+        for fragment in FRAGMENTS * 2:
+            expect = BeautifulSoup(fragment, features).decode()
+            assert session.fragment(fragment).decode() == expect
+            soup = BeautifulSoup.fragment(fragment, features)
+            assert soup.decode() == expect
+            assert soup.builder.soup is None
+            self.linkage_validator(soup)
+
+    def test_session_settings(self):
+        session = BeautifulSoup.session("html.parser", parse_only=SoupStrainer("b"))
+        assert "<b>b</b>" == session.fragment("<p>a <b>b</b></p>").decode()
+
+    def test_no_beginner_warnings(self):
+        with warnings.catch_warnings(record=True) as w:
+            soup = BeautifulSoup.fragment("http://www.example.com/", "html.parser")
+        assert [] == w
+        assert "http://www.example.com/" == soup.decode()
+
+    def test_bytestring_goes_through_constructor(self):
+        soup = BeautifulSoup.fragment("<p>caf\xe9</p>".encode("utf8"), "html.parser")
+        assert "caf\xe9" == soup.p.string
+        assert "utf-8" == soup.original_encoding
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml seems not to be present")
+    def test_rejected_markup_goes_through_constructor(self):
+        # lxml won't parse a Unicode string with an encoding
+        # declaration, so the constructor's second strategy is used.
+        markup = '<?xml version="1.0" encoding="utf-8"?><a>b</a>'
+        soup = BeautifulSoup.fragment(markup, "xml")
+        assert "b" == soup.a.string
+
+    def test_builder_reused(self):
+        soup1 = BeautifulSoup.fragment("<p>a</p>", "html.parser")
+        soup2 = BeautifulSoup.fragment("<p>b</p>", ["html.parser"])
+        assert soup1.builder is soup2.builder
+        assert soup1.builder._idle_parser is not None
+
+        # Each thread has its own tree builder.
+        builders = []
+        thread = threading.Thread(
+            target=lambda: builders.append(
+                BeautifulSoup.fragment("<p>d</p>", "html.parser").builder
+            )
+        )
+        thread.start()
+        thread.join()
+        assert builders[0] is not soup1.builder
+
+    def test_busy_builder(self):
+        session = _session_for_fragments(BeautifulSoup, "html.parser")
+        session.busy = True
+        try:
+            soup = BeautifulSoup.fragment("<p>a</p>", "html.parser")
+        finally:
+            session.busy = False
+        assert "<p>a</p>" == soup.decode()
+        assert soup.builder is not session.builder
+
+    def test_rejected_markup_releases_builder(self):
+        # This markup is rejected by html.parser no matter which
+        # strategy is used.
+        session = _session_for_fragments(BeautifulSoup, "html.parser")
+        with pytest.raises(ParserRejectedMarkup):
+            BeautifulSoup.fragment("<![n\x00", "html.parser")
+        assert session.busy is False
+        assert session.builder.soup is None
+
+        # The next fragment still goes through the session.
+        soup = BeautifulSoup.fragment("<p>a</p>", "html.parser")
+        assert soup.builder is session.builder
+        assert "<p>a</p>" == soup.decode()
+
+    def test_subclass(self):
+        class MySoup(BeautifulSoup):
+            pass
+
+        soup = MySoup.fragment("<p>a</p>", "html.parser")
+        assert isinstance(soup, MySoup)
+        assert "<p>a</p>" == soup.decode()
@@ -2,6 +2,7 @@
 """Tests of Beautiful Soup as a whole."""
 
 import logging
+import mmap
 import pickle
 import pytest
 from typing import Iterable
@@ -51,11 +52,61 @@ class TestConstructor(SoupTest):
         soup = self.soup(data)
         assert "foo\0bar" == soup.h1.string
 
+    def test_encoding_detection_window(self):
+        data = (
+            b"<html>" + b" " * 5000 + b'<meta charset="euc-jp"><p>\xa4\xa2</p>'
+        ) + b" " * 100000
+        soup = self.soup(data)
+        assert soup.original_encoding == "euc-jp"
+
+        soup = self.soup(data, encoding_detection_window=1024)
+        assert soup.builder.encoding_detection_window == 1024
+        assert soup.original_encoding != "euc-jp"
+
     def test_exclude_encodings(self):
         utf8_data = "Räksmörgås".encode("utf-8")
         soup = self.soup(utf8_data, exclude_encodings=["utf-8"])
         assert "windows-1252" == soup.original_encoding
 
+    def test_buffer_input(self, tmp_path):
+        data = "<!-- x --><p>Sacr\xe9 bleu!</p>".encode("utf-8")
+        expect = self.soup(data).decode()
+        path = tmp_path / "document.html"
+        path.write_bytes(data)
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            for markup in (mapped, memoryview(data), bytearray(data)):
+                soup = self.soup(markup)
+                assert soup.decode() == expect
+                assert soup.original_encoding == "utf-8"
+            # No references to the mapped file are kept around.
+            mapped.close()
+
+    @pytest.mark.parametrize("chunk_size", [4, 1024])
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml seems not to be present")
+    def test_lxml_buffer_input(self, chunk_size):
+        # lxml is given the buffer one chunk at a time.
+        from bs4.builder import LXMLTreeBuilder, LXMLTreeBuilderForXML
+
+        data = "<p>Sacr\xe9 bleu!<br/></p>".encode("utf-8")
+        for builder_class in (LXMLTreeBuilder, LXMLTreeBuilderForXML):
+            builder = builder_class()
+            assert builder.supports_buffer_markup
+            builder.BUFFER_CHUNK_SIZE = chunk_size
+            soup = BeautifulSoup(memoryview(data), builder=builder)
+            assert soup.decode() == BeautifulSoup(data, builder=builder).decode()
+            assert soup.p.contents[0] == "Sacr\xe9 bleu!"
+
+    def test_buffer_copied_for_builder_that_needs_bytes(self):
+        class Builder(TreeBuilder):
+            def feed(self, markup):
+                self.fed = markup
+
+        builder = Builder()
+        BeautifulSoup(memoryview(b"<p>"), builder=builder)
+        assert builder.fed == b"<p>"
+        assert isinstance(builder.fed, bytes)
+
     def test_custom_builder_class(self):
         # Verify that you can pass in a custom Builder class and
         # it'll be instantiated with the appropriate keyword arguments.
@@ -1,7 +1,10 @@
 import warnings
 from bs4.element import (
+    AttributeValueList,
     Comment,
     NavigableString,
+    Script,
+    Tag,
 )
 from . import SoupTest
 
@@ -76,6 +79,51 @@ class TestTag(SoupTest):
         markup = '<b a="1" z="5" m="3" f="2" y="4"></b>'
         self.assertSoupEquals(markup, '<b a="1" f="2" m="3" y="4" z="5"></b>')
 
+    def test_default_attributes_not_stored_on_tag(self):
+        # Attributes that usually have their default values aren't
+        # stored on each Tag, to save memory.
+        soup = self.soup("<p>text</p>")
+        p = soup.p
+        for attr in ("namespace", "prefix", "hidden", "_namespaces"):
+            assert attr not in vars(p)
+        assert p.namespace is None
+        assert p.prefix is None
+        assert p.hidden is False
+        assert p._namespaces == {}
+        assert "hidden" not in vars(p.string)
+        assert p.string.hidden is False
+
+        # The BeautifulSoup object has its own namespace dictionary,
+        # which is replaced when the object is reset.
+        namespaces = soup._namespaces
+        assert isinstance(namespaces, dict)
+        assert soup.hidden is True
+        soup.reset()
+        assert soup._namespaces == {}
+        assert soup._namespaces is not namespaces
+
+    def test_non_default_attributes_survive_copy(self):
+        tag = Tag(
+            name="a",
+            namespace="ns",
+            prefix="x",
+            sourceline=1,
+            sourcepos=2,
+            namespaces={"x": "ns"},
+        )
+        tag.hidden = True
+        # Copying a parent copies its children in a single pass, which
+        # is a different code path from copying the tag itself.
+        parent = Tag(name="div")
+        parent.append(tag)
+        copied_child = parent.__copy__().contents[0]
+        for clone in (tag.copy_self(), tag.__copy__(), copied_child):
+            assert clone.namespace == "ns"
+            assert clone.prefix == "x"
+            assert (clone.sourceline, clone.sourcepos) == (1, 2)
+            assert clone._namespaces == {"x": "ns"}
+            assert clone.hidden is True
+
     def test_string(self):
         # A Tag that contains only a text node makes that node
         # available as .string.
@@ -239,3 +287,49 @@ class TestMultiValuedAttributes(SoupTest):
         soup = self.soup('<div id="1"><span id="2">a string</span></div>')
         soup.span.hidden = True
         assert '<div id="1">a string</div>' == str(soup.div)
+
+
+class TestTagProfile(SoupTest):
+    """Test the per-tag-name TagProfile cache."""
+
+    def test_profiles_are_cached_per_tag_name(self):
+        soup = self.soup("<p>1</p><br/><p>2</p><script>x</script>")
+        builder = soup.builder
+        p1, p2 = soup.find_all("p")
+        assert set(builder._tag_profiles) >= set(["p", "br", "script"])
+        assert builder._tag_profiles["br"].can_be_empty_element is True
+        assert builder._tag_profiles["p"].can_be_empty_element is False
+        assert p1.interesting_string_types is p2.interesting_string_types
+        assert soup.script.interesting_string_types == set([Script])
+        assert soup.script.string.__class__ is Script
+
+    def test_profile_reused_by_next_document(self):
+        soup = self.soup("<p>1</p>")
+        profile = soup.builder._tag_profiles["p"]
+        soup = self.soup("<p>2</p>", builder=soup.builder)
+        assert soup.builder._tag_profiles["p"] is profile
+
+    def test_cache_thrown_away_when_builder_changes(self):
+        soup = self.soup("<p>1</p><br/>")
+        builder = soup.builder
+        profile = builder._tag_profiles["br"]
+        builder.empty_element_tags = set(["p"])
+        soup = self.soup("<p></p><br></br>", builder=builder)
+        assert builder._tag_profiles["br"] is not profile
+        assert soup.p.can_be_empty_element is True
+        assert soup.br.can_be_empty_element is False
+        assert soup.decode() == "<p/><br></br>"
+
+    def test_new_tag_uses_profile(self):
+        soup = self.soup("<br/>")
+        tag = soup.new_tag("br")
+        assert tag.can_be_empty_element is True
+        assert tag.known_xml is False
+
+    def test_tag_without_builder(self):
+        tag = Tag(name="pre", is_xml=False, can_be_empty_element=False)
+        assert tag.known_xml is False
+        assert tag.can_be_empty_element is False
+        assert tag.attribute_value_list_class is AttributeValueList
+        assert tag.cdata_list_attributes is None
+        assert tag.interesting_string_types is None